@@ -1,52 +1,55 @@
-from playwright.sync_api import sync_playwright
 from pathlib import Path
-import json, re, requests, time
-from bs4 import BeautifulSoup
-import urllib.parse
-from datetime import datetime, timedelta
-import random
+from html.parser import HTMLParser
+import json
+import re
+import unicodedata
+from urllib.parse import urljoin
+
+from pipeline import Site, run_site
 
 AUTHOR = "patrick-lagace"
 OUTPUT_DIR = Path("~/Desktop/chroniques_lagace_complet").expanduser()
-OUTPUT_DIR.mkdir(exist_ok=True)
+BASE_URL = "https://www.lapresse.ca/auteurs/{slug}"
+FEED_CUTOFF = "2000-01-01"  # date la plus ancienne cherchée dans les flux des sections
 
-# Set pour éviter les doublons
-unique_articles = set()
-scraped_urls = set()
+def fold(text):
+    """Minuscules sans accents : « Lagacé » → « lagace »."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
 
-def clean_filename(text):
-    """Nettoie le texte pour créer un nom de fichier valide"""
-    cleaned = re.sub(r'[^\w\s-]', '_', text)
-    cleaned = re.sub(r'\s+', '_', cleaned)
-    return cleaned[:60].strip('_')
+def names_author(text, author):
+    """Vrai si `text` contient chacun des mots du nom `author`."""
+    text = fold(text)
+    return all(word in text for word in fold(author).split())
 
-def extract_article_content(soup):
-    """Extrait le contenu principal de l'article"""
-    content_selectors = [
-        "article p",
-        ".article-content p",
-        ".story-content p",
-        ".content p",
-        "div[data-module='ArticleBody'] p",
-        ".text-content p",
-        ".entry-content p",
-        ".post-content p",
-        ".article-body p"
-    ]
-    
-    texte = ""
-    for selector in content_selectors:
-        paragraphs = soup.select(selector)
-        if paragraphs:
-            texte = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-            break
-    
-    return texte
+# Mots d'une signature de rédaction, d'agence ou de média plutôt que d'une personne
+ORGANIZATION_WORDS = {
+    "presse", "lapresse", "redaction", "equipe", "agence", "afp", "reuters", "press", "canadienne",
+    "collaboration", "collaborateurs", "journal", "staff", "newsroom", "inc", "media", "medias",
+}
+
+def personal_names(text):
+    """Noms de personnes d'une signature (« A / B », « A et B ») ; [] si l'un n'en est pas un.
+
+    Un nom de personne : deux à quatre mots, sans chiffre ni mot de rédaction
+    ou d'agence. « La Presse », « La Presse Canadienne » ou une URL n'en sont pas.
+    """
+    names = [n.strip() for n in re.split(r"\s*(?:/|,|;|\bet\b|\band\b)\s*", text or "") if n.strip()]
+    for name in names:
+        words = fold(name).replace("-", " ").split()
+        if ("://" in name or any(c.isdigit() for c in name) or not 2 <= len(words) <= 4
+                or ORGANIZATION_WORDS & set(words)):
+            return []
+    return names
+
+def url_names_author(url, author):
+    """Vrai si l'URL contient le nom de famille de `author` (ex. /patrick-lagace/)."""
+    return fold(author).split()[-1] in url.lower()
 
-def is_lagace_article(soup, url):
-    """Vérifie si l'article est bien de Patrick Lagacé"""
+def is_author_article(soup, url, author):
+    """Vérifie si l'article est bien de `author`"""
     # Vérifier dans l'URL
-    if "patrick-lagace" in url.lower() or "lagace" in url.lower():
+    if url_names_author(url, author):
         return True
     
     # Vérifier dans les métadonnées auteur
@@ -65,7 +68,7 @@ def is_lagace_article(soup, url):
         author_elem = soup.select_one(selector)
         if author_elem:
             author_text = author_elem.get_text(strip=True) if hasattr(author_elem, 'get_text') else author_elem.get('content', '')
-            if "patrick" in author_text.lower() and "lagac" in author_text.lower():
+            if names_author(author_text, author):
                 return True
     
     # Vérifier dans le JSON-LD
@@ -77,84 +80,105 @@ def is_lagace_article(soup, url):
                 author_name = data["author"]
                 if isinstance(author_name, dict):
                     author_name = author_name.get("name", "")
-                if "patrick" in str(author_name).lower() and "lagac" in str(author_name).lower():
+                if names_author(str(author_name), author):
                     return True
         except:
             pass
     
     return False
 
-def scrape_archives():
-    """Scrape les archives de manière systématique"""
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-        
-        # Configuration des headers
-        page.set_extra_http_headers({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        # 1. Page auteur principale - avec pagination systématique
-        print("🔍 Scraping page auteur avec pagination...")
-        base_url = f"https://www.lapresse.ca/auteurs/{AUTHOR}"
-        
-        page_num = 1
-        while page_num <= 50:  # Limiter à 50 pages max
-            try:
-                if page_num == 1:
-                    url = base_url
-                else:
-                    url = f"{base_url}?page={page_num}"
-                
-                print(f"📄 Page {page_num}: {url}")
-                page.goto(url, timeout=30000)
-                page.wait_for_timeout(2000)
-                
-                # Extraire tous les liens d'articles sur cette page
-                articles_found = extract_article_links(page)
-                
-                if articles_found == 0:
-                    print(f"❌ Aucun article trouvé sur la page {page_num}, arrêt")
-                    break
-                
-                page_num += 1
-                time.sleep(1)  # Pause entre les pages
-                
-            except Exception as e:
-                print(f"❌ Erreur page {page_num}: {e}")
-                break
-        
-        # 2. Section chroniques si elle existe
-        print("\n🔍 Scraping section chroniques...")
-        chroniques_urls = [
-            "https://www.lapresse.ca/debats/chroniques",
-            "https://www.lapresse.ca/actualites/chroniques",
-            "https://www.lapresse.ca/chroniques"
-        ]
-        
-        for chronique_url in chroniques_urls:
-            try:
-                page.goto(chronique_url, timeout=30000)
-                page.wait_for_timeout(2000)
-                
-                # Scroll pour charger plus de contenu
-                for i in range(10):
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    page.wait_for_timeout(1000)
-                
-                extract_article_links(page, filter_lagace=True)
-                
-            except Exception as e:
-                print(f"❌ Erreur section chroniques {chronique_url}: {e}")
-        
-        browser.close()
+class AuthorSniffer(HTMLParser):
+    """Décide de l'auteur pendant la lecture du HTML, sans attendre la fin de la page.
+
+    `verdict` passe à True dès qu'une signature, `meta[name=author]` ou l'auteur
+    JSON-LD nomme `author`. Une méta ou un JSON-LD nommant une autre personne
+    n'est qu'un indice (texte coécrit, auteur invité) : `verdict` ne passe à
+    False qu'au premier paragraphe de `<article>` atteint sans signature
+    nommant `author`. Un nom de média ou de rédaction (« La Presse ») ne
+    décide rien. Sans verdict en fin de lecture, `is_author_article` tranche
+    sur la page entière.
+    """
+
+    BYLINE_CLASSES = ("author", "byline")
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
 
-def extract_article_links(page, filter_lagace=False):
+    def __init__(self, author):
+        super().__init__(convert_charrefs=True)
+        self.author = author
+        self.verdict = None
+        self.reason = f"Pas un article de {author}"
+        self.json_ld = None     # texte du script JSON-LD en cours
+        self.byline = None      # texte de la signature en cours
+        self.depth = 0
+        self.other = False      # méta ou JSON-LD nommant une autre personne
+        self.in_article = False
+
+    def decide(self, author, authoritative):
+        if names_author(author, self.author):
+            self.verdict = True
+        elif authoritative and personal_names(author):
+            self.other = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.byline is not None and tag not in self.VOID_TAGS:
+            self.depth += 1
+        starts_byline = self.byline is None and tag not in self.VOID_TAGS and (
+            any(c in (attrs.get("class") or "") for c in self.BYLINE_CLASSES)
+            or attrs.get("data-testid") == "author"
+        )
+        if tag == "article":
+            self.in_article = True
+        elif tag == "meta" and (attrs.get("name") or "").lower() == "author":
+            self.decide(attrs.get("content") or "", authoritative=True)
+        elif tag == "script" and attrs.get("type") == "application/ld+json":
+            self.json_ld = ""
+        elif (tag == "p" and self.in_article and self.byline is None and not starts_byline
+              and self.other and self.verdict is None):
+            # Corps de l'article commencé sans signature de l'auteur : la méta disait vrai
+            self.verdict = False
+        if starts_byline:
+            self.byline, self.depth = "", 1
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self.json_ld is not None:
+            self.decide_json_ld(self.json_ld)
+            self.json_ld = None
+        if self.byline is not None:
+            self.depth -= 1
+            if self.depth == 0:
+                self.decide(self.byline, authoritative=False)
+                self.byline = None
+
+    def handle_data(self, data):
+        if self.json_ld is not None:
+            self.json_ld += data
+        elif self.byline is not None:
+            self.byline += data
+
+    def decide_json_ld(self, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(data, dict) or "author" not in data:
+            return
+        authors = data["author"] if isinstance(data["author"], list) else [data["author"]]
+        # Un auteur `Organization` (le journal lui-même) ne dit rien de la signature
+        authors = [a for a in authors if not (isinstance(a, dict) and a.get("@type") == "Organization")]
+        if not authors:
+            return
+        names = [a.get("name", "") if isinstance(a, dict) else str(a) for a in authors]
+        self.decide(" / ".join(names), authoritative=True)
+
+def sniff_author(url, author):
+    """Analyseur pour `Site.sniff` ; inutile quand l'URL suffit à `is_author_article`."""
+    if url_names_author(url, author):
+        return None
+    return AuthorSniffer(author)
+
+def find_article_links(soup, page_url, author=None):
     """Extrait les liens d'articles depuis une page"""
-    articles_found = 0
-    
     # Sélecteurs pour trouver les liens d'articles
     link_selectors = [
         "a[href*='/actualites/']",
@@ -169,150 +193,89 @@ def extract_article_links(page, filter_lagace=False):
         ".title a"
     ]
     
+    links = []
     for selector in link_selectors:
-        try:
-            elements = page.locator(selector).all()
-            for element in elements:
-                href = element.get_attribute("href")
-                if href and href not in scraped_urls:
-                    if not href.startswith("http"):
-                        href = "https://www.lapresse.ca" + href
-                    
-                    # Si on filtre, vérifier que c'est un article de Lagacé
-                    if filter_lagace and not ("lagace" in href.lower() or "patrick-lagace" in href.lower()):
-                        continue
-                    
-                    scraped_urls.add(href)
-                    articles_found += 1
-                    print(f"🔗 Article trouvé: {href}")
-                    
-        except Exception as e:
-            print(f"⚠️ Erreur avec sélecteur {selector}: {e}")
-    
-    return articles_found
-
-def download_and_verify_articles():
-    """Télécharge et vérifie que chaque article est bien de Lagacé"""
-    if not scraped_urls:
-        print("❌ Aucun article trouvé.")
-        return
-    
-    print(f"\n📥 Vérification et téléchargement de {len(scraped_urls)} articles...")
-    
-    verified_articles = []
-    
-    for i, url in enumerate(scraped_urls, 1):
-        print(f"📥 [{i}/{len(scraped_urls)}] Vérification: {url}")
-        
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            r = requests.get(url, headers=headers, timeout=15)
-            r.raise_for_status()
-            
-            soup = BeautifulSoup(r.text, "html.parser")
-            
-            # Vérifier si c'est vraiment un article de Lagacé
-            if not is_lagace_article(soup, url):
-                print(f"⚠️ Pas un article de Lagacé, ignoré")
+        for element in soup.select(selector):
+            href = element.get("href")
+            if not href:
                 continue
+            href = urljoin("https://www.lapresse.ca", href)
             
-            # Extraction du titre
-            titre = "Sans titre"
-            title_selectors = ["h1", ".article-title", ".story-title", "[data-testid='article-title']"]
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    titre = title_elem.get_text(strip=True)
-                    break
-            
-            # Extraction de la date
-            date = "0000-00-00"
-            date_selectors = ["time", ".article-date", ".story-date", "[data-testid='article-date']"]
-            for selector in date_selectors:
-                date_elem = soup.select_one(selector)
-                if date_elem:
-                    date_attr = date_elem.get("datetime") or date_elem.get_text(strip=True)
-                    if date_attr:
-                        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date_attr)
-                        if date_match:
-                            date = date_match.group(1)
-                            break
-            
-            # Extraction du contenu
-            texte = extract_article_content(soup)
-            
-            if not texte:
-                print(f"⚠️ Contenu vide, ignoré")
-                continue
-            
-            # Créer une signature unique pour éviter les doublons
-            article_signature = f"{titre}_{date}_{len(texte)}"
-            if article_signature in unique_articles:
-                print(f"⚠️ Doublon détecté, ignoré: {titre}")
+            # Si on filtre, vérifier que c'est un article de l'auteur
+            if author and not url_names_author(href, author):
                 continue
             
-            unique_articles.add(article_signature)
-            
-            # Création du nom de fichier
-            fname = f"{date}_Lagace_{clean_filename(titre)}.txt"
-            filepath = OUTPUT_DIR / fname
-            
-            # Sauvegarde
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"TITRE : {titre}\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"AUTEUR: Patrick Lagacé\n")
-                f.write(f"DATE: {date}\n\n")
-                f.write(texte)
-            
-            verified_articles.append(fname)
-            print(f"✅ Sauvegardé : {fname}")
-            
-            # Pause pour éviter d'être bloqué
-            time.sleep(random.uniform(0.5, 1.5))
-            
-        except Exception as e:
-            print(f"❌ Erreur pour {url}: {e}")
-            continue
+            links.append(href)
     
-    return verified_articles
+    return links
+
+def reject_article(soup, url, article, author):
+    """Écarte les articles d'autres auteurs (les doublons sont repérés par dedup.py)"""
+    # Auteur publié en JSON-LD / méta : pas besoin de la cascade de sélecteurs
+    if article.get("author") and names_author(article["author"], author):
+        return None
+    if not is_author_article(soup, url, author):
+        return f"Pas un article de {author}"
+    return None
+
+def make_site(slug, author, file_tag, output_dir, job=None, sitemaps=False):
+    """Chroniques d'un auteur de La Presse (`slug` : patrick-lagace).
+
+    `sitemaps` : lit aussi les sitemaps de toutes les chroniques. Le manifeste
+    et la frontière étant communs au site, un seul job La Presse à la fois
+    devrait l'activer (jobs.py).
+    """
+    base_url = BASE_URL.format(slug=slug)
+    return Site(
+        name="lapresse",
+        author=author,
+        file_tag=file_tag,
+        output_dir=output_dir,
+        # Page auteur principale - avec pagination systématique
+        listing_url=lambda n: base_url if n == 1 else f"{base_url}?page={n}",
+        find_links=find_article_links,
+        first_page=1,
+        max_pages=50,  # Limiter à 50 pages max
+        # Sections chroniques, défilées puis filtrées sur l'auteur
+        scroll_pages=[
+            "https://www.lapresse.ca/debats/chroniques",
+            "https://www.lapresse.ca/actualites/chroniques",
+            "https://www.lapresse.ca/chroniques"
+        ],
+        scroll_find_links=lambda soup, url: find_article_links(soup, url, author),
+        # Un seul défilement par section pour apprendre son flux XHR, parcouru ensuite en HTTP
+        scroll_feeds=True,
+        feed_cutoff=FEED_CUTOFF,
+        # Sitemaps du site : toutes les chroniques, l'auteur est vérifié au téléchargement (sniff)
+        sitemaps=["https://www.lapresse.ca"] if sitemaps else [],
+        sitemap_filter=lambda url: "/chroniques/" in url,
+        reject=lambda soup, url, article: reject_article(soup, url, article, author),
+        # Lecture en flux : les pages d'autres auteurs sont écartées dès leur en-tête
+        sniff=lambda url: sniff_author(url, author),
+        job=job,
+    )
+
+SITE = make_site(AUTHOR, "Patrick Lagacé", "Lagace", OUTPUT_DIR, sitemaps=True)
 
 # Exécution du script
 if __name__ == "__main__":
     print("🚀 Scraping ciblé des articles de Patrick Lagacé...")
     
-    # Étape 1: Scraping des archives
-    print("\n" + "="*50)
-    print("ÉTAPE 1: Scraping des archives")
-    print("="*50)
-    scrape_archives()
-    
-    # Étape 2: Téléchargement et vérification
-    print("\n" + "="*50)
-    print("ÉTAPE 2: Téléchargement et vérification")
-    print("="*50)
-    verified_articles = download_and_verify_articles()
-    
-    print(f"\n🎉 Terminé !")
-    print(f"📊 {len(scraped_urls)} URLs trouvées")
-    print(f"📊 {len(verified_articles)} articles de Lagacé téléchargés")
-    print(f"📁 Fichiers sauvegardés dans : {OUTPUT_DIR}")
+    written = run_site(
+        SITE,
+        headless=False,
+        block_resources=False,  # bloque images, polices, médias et traceurs
+        resume=True,            # False pour refaire la découverte
+        incremental=True,       # s'arrête aux articles déjà connus ; False pour toute l'archive
+        refresh=False,          # True : revalide les articles déjà écrits (GET conditionnel)
+        browser_url=None,       # "http://127.0.0.1:9222" : Chromium partagé (browser_server.py) (ignore headless)
+    )
     
-    # Statistiques
-    if verified_articles:
-        dates = []
-        for article in verified_articles:
-            try:
-                date_str = article.split("_")[0]
-                if date_str != "0000-00-00":
-                    dates.append(date_str)
-            except:
-                pass
-        
-        if dates:
-            dates.sort()
-            print(f"📅 Plus ancien: {dates[0]}")
-            print(f"📅 Plus récent: {dates[-1]}")
\ No newline at end of file
+    # Statistiques, sur tous les fichiers du dossier (lancements précédents compris)
+    dates = sorted(
+        f.name.split("_")[0] for f in OUTPUT_DIR.glob("*_Lagace_*.txt")
+        if not f.name.startswith("0000-00-00")
+    )
+    if dates:
+        print(f"📅 Plus ancien: {dates[0]}")
+        print(f"📅 Plus récent: {dates[-1]}")
@@ -1,181 +1,177 @@
 #!/usr/bin/env python3
 import re
-import time
 import logging
 from pathlib import Path
-from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from extraction import parse_date
+from Lapresse_lagace import names_author
+from metadata import from_parts
+from pipeline import Site, run_site
+from selector_cache import SELECTORS
 
 # ----------------------------
 # Configuration
 # ----------------------------
-BASE_URL    = "https://ici.radio-canada.ca/info/analyses"
+SITE_URL    = "https://ici.radio-canada.ca"
+SECTION     = "info/analyses"
 OUTPUT_DIR  = Path.home() / "Desktop" / "chroniques_radio_canada"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 MAX_PAGES   = 10
-PAGE_TIMEOUT = 30000  # ms
-SELECTOR_TIMEOUT = 30000  # ms
-DELAY_SEC    = 2
 
-# Set up logging
+# Journalisation
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
-# Month mapping for French dates
-MOIS_FR = {
-    "janvier":   "01", "février":  "02", "mars":     "03",
-    "avril":     "04", "mai":      "05", "juin":     "06",
-    "juillet":   "07", "août":     "08", "septembre":"09",
-    "octobre":   "10", "novembre": "11", "décembre": "12"
-}
-
 # ----------------------------
-# Utility functions
+# Extraction
 # ----------------------------
-def safe_filename(text, max_length=60):
-    """Sanitize a string to be filesystem-safe."""
-    name = re.sub(r'[<>:"/\\|?*]', '_', text)
-    name = re.sub(r'\s+', '_', name).strip('_')
-    return name[:max_length]
+DATE_SELECTORS = [
+    'time[datetime]', 'span[data-testid="date"]', 'time',
+    '.published-date', '.date'
+]
+CONTENT_SELECTORS = [
+    'div[data-testid="text-content"] p',
+    'article div p',
+    'div.article-content p',
+    '[data-testid="article-body"] p',
+    'main p',
+    'div.content p',
+    'p'
+]
+MIN_PARAGRAPH_LEN = 50
 
-def extract_date(page) -> str:
-    """Try several selectors to parse a YYYY-MM-DD date."""
-    date_selectors = [
-        'time[datetime]', 'span[data-testid="date"]', 'time',
-        '.published-date', '.date'
-    ]
-    for sel in date_selectors:
-        try:
-            elt = page.query_selector(sel)
-            if not elt:
-                continue
-            # first, try datetime attribute
-            dt = elt.get_attribute("datetime") or ""
-            m = re.search(r'(\d{4}-\d{2}-\d{2})', dt)
-            if m:
-                return m.group(1)
-            # next, fallback to inner text
-            txt = elt.inner_text().strip()
-            # ISO style in text?
-            m = re.search(r'(\d{4}-\d{2}-\d{2})', txt)
-            if m:
-                return m.group(1)
-            # french style, e.g. "15 juillet 2025"
-            m = re.search(r'(\d{1,2})\s+([A-Za-zéû]+)\s+(\d{4})', txt)
-            if m:
-                day, mois, year = m.groups()
-                mois = MOIS_FR.get(mois.lower(), "01")
-                return f"{year}-{mois}-{int(day):02d}"
-        except Exception:
-            continue
-    return datetime.today().strftime("%Y-%m-%d")
+# Un seul aller-retour par article : titre, dates candidates, JSON-LD / balises
+# meta et premier sélecteur de contenu (par priorité) dont les paragraphes
+# passent le filtre de longueur. Les deux listes de sélecteurs arrivent
+# réordonnées par selector_cache.py, le gagnant appris pour la rubrique en tête.
+_EXTRACT_JS = """
+([dateSelectors, contentSelectors, minLen]) => {
+    const text = el => (el.innerText || '').trim();
+    const h1 = document.querySelector('h1');
+    const dates = [];
+    for (const sel of dateSelectors) {
+        try {
+            const el = document.querySelector(sel);
+            if (el) dates.push([sel, el.getAttribute('datetime') || '', text(el)]);
+        } catch (e) { /* sélecteur invalide : ignoré */ }
+    }
+    let selector = null, paragraphs = [];
+    for (const sel of contentSelectors) {
+        try {
+            const paras = Array.from(document.querySelectorAll(sel), text).filter(t => t.length > minLen);
+            if (paras.length) { selector = sel; paragraphs = paras; break; }
+        } catch (e) { /* sélecteur invalide : ignoré */ }
+    }
+    const jsonLd = Array.from(document.querySelectorAll('script[type="application/ld+json"]'), s => s.textContent);
+    const metas = Array.from(document.querySelectorAll('meta[content]'), m => [
+        m.getAttribute('property') || m.getAttribute('name') || m.getAttribute('itemprop'),
+        m.getAttribute('content'),
+    ]);
+    return {title: document.title.trim(), h1: h1 ? text(h1) : '', dates, selector, paragraphs, jsonLd, metas};
+}
+"""
 
-def extract_content(page) -> str:
-    """Aggregate paragraphs from a set of candidate selectors."""
-    selectors = [
-        'div[data-testid="text-content"] p',
-        'article div p',
-        'div.article-content p',
-        '[data-testid="article-body"] p',
-        'main p',
-        'div.content p',
-        'p'
-    ]
-    for sel in selectors:
-        try:
-            elems = page.query_selector_all(sel)
-            texts = [e.inner_text().strip() for e in elems]
-            # keep only paragraphs longer than 50 chars
-            paras = [t for t in texts if len(t) > 50]
-            if paras:
-                logger.info(f"   ✅ contenu extrait via « {sel} »")
-                return "\n\n".join(paras)
-        except Exception:
-            continue
-    # fallback: raw body text
-    return page.content()[:500] + "..."
+def first_date(candidates) -> str:
+    """Première date YYYY-MM-DD des candidats (attribut datetime, texte), sinon 0000-00-00."""
+    for dt, txt in candidates:
+        date = parse_date(dt or "") or parse_date(txt or "")
+        if date:
+            return date
+    # date inconnue : signalée comme sur les autres sites plutôt que datée du jour
+    return "0000-00-00"
 
-def find_article_links(page) -> set[str]:
-    """Collect all unique article URLs on the listing page."""
+async def extract_page(page) -> dict:
+    """Titre, date et texte d'une analyse rendue, lus par un seul script dans la page."""
+    url = page.url
+    date_selectors = SELECTORS.order("radiocanada", url, "date", DATE_SELECTORS)
+    content_selectors = SELECTORS.order("radiocanada", url, "content", CONTENT_SELECTORS)
+    found = await page.evaluate(_EXTRACT_JS, [date_selectors, content_selectors, MIN_PARAGRAPH_LEN])
+    SELECTORS.record("radiocanada", url, "content", found["selector"])
+    if found["selector"]:
+        logger.info(f"   ✅ contenu extrait via « {found['selector']} »")
+    meta = from_parts(found["jsonLd"], found["metas"])
+    # Métadonnées publiées d'abord ; les sélecteurs ne comblent que les manques
+    candidates = [(meta["published"], "")] if meta["published"] else []
+    if not candidates:
+        # Le premier sélecteur dont la date se lit est le gagnant pour la date
+        dated = [sel for sel, dt, txt in found["dates"] if first_date([(dt, txt)]) != "0000-00-00"]
+        SELECTORS.record("radiocanada", url, "date", dated[0] if dated else None)
+    # Sans texte, le pipeline note l'article en échec
+    return {
+        "title": meta["title"] or found["title"] or found["h1"] or "Sans titre",
+        "date": first_date(candidates + [(dt, txt) for _, dt, txt in found["dates"]]),
+        "text": "\n\n".join(found["paragraphs"]),
+        "paragraphs": found["paragraphs"],
+        "selector": found["selector"],
+        "author": meta["author"],
+        "modified": meta["modified"],
+        "metadata": "partial" if meta["title"] or meta["published"] else "none",
+    }
+
+def find_article_links(soup, page_url, section=SECTION) -> list[str]:
+    """URL des articles de `section` sur la page de liste."""
+    prefix = f"/{section}/"
     selectors = [
-        'a[href*="/info/analyses/"]',
-        'article a[href*="/info/analyses/"]',
-        '.title a[href*="/analyses/"]'
+        f'a[href*="{prefix}"]',
+        f'article a[href*="{prefix}"]',
+        f'.title a[href*="/{section.rsplit("/", 1)[-1]}/"]'
     ]
-    links = set()
+    links = []
     for sel in selectors:
-        for a in page.query_selector_all(sel):
-            href = a.get_attribute("href") or ""
-            if "/info/analyses/" in href and not re.match(r"/info/analyses/?(?:/\d+)?/?$", href):
+        for a in soup.select(sel):
+            href = a.get("href") or ""
+            if prefix in href and not re.match(rf"/{re.escape(section)}/?(?:/\d+)?/?$", href):
                 if href.startswith("/"):
-                    href = "https://ici.radio-canada.ca" + href
-                links.add(href)
+                    href = SITE_URL + href
+                links.append(href)
     return links
 
-# ----------------------------
-# Main scraping logic
-# ----------------------------
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    context = browser.new_context(
-        user_agent=(
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/114.0.0.0 Safari/537.36"
-        )
-    )
-
-    page = context.new_page()
-    article_urls: set[str] = set()
-
-    # 1) Collect listing pages
-    for n in range(1, MAX_PAGES + 1):
-        url = BASE_URL if n == 1 else f"{BASE_URL}/{n}"
-        logger.info(f"🔄 Chargement page {n}: {url}")
-        try:
-            page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
-            page.wait_for_selector('a[href*="/info/analyses/"]', timeout=SELECTOR_TIMEOUT)
-            new_links = find_article_links(page)
-            diff = new_links - article_urls
-            if not diff:
-                logger.info("✅ Aucun nouvel article, arrêt de la collecte.")
-                break
-            article_urls |= new_links
-            logger.info(f"   ↳ {len(diff)} nouveaux liens trouvés (total {len(article_urls)})")
-            time.sleep(DELAY_SEC)
-        except PlaywrightTimeoutError:
-            logger.warning(f"⚠️ Timeout sur la page {n}, on passe à la suivante.")
-        except Exception as e:
-            logger.error(f"❌ Erreur page {n}: {e}")
-
-    logger.info(f"\n📚 {len(article_urls)} articles à télécharger\n")
+def reject_other_authors(soup, url, article, author):
+    """`Site.reject` : ne garde que les analyses signées `author` (métadonnées publiées, sinon signature)."""
+    names = article.get("author") or ""
+    if not names and soup is not None:
+        names = " ".join(el.get_text(" ", strip=True) for el in
+                         soup.select('[class*="author"], [class*="byline"], [rel="author"]'))
+    if names_author(names, author):
+        return None
+    return f"Pas une analyse de {author}"
 
-    # 2) Download each article
-    for idx, art_url in enumerate(sorted(article_urls), 1):
-        logger.info(f"📥 [{idx}/{len(article_urls)}] {art_url}")
-        try:
-            art_page = context.new_page()
-            art_page.goto(art_url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
-            art_page.wait_for_selector("h1, article, [data-testid='text-content']", timeout=SELECTOR_TIMEOUT)
-            title = art_page.title().strip() or art_page.query_selector("h1").inner_text().strip()
-            date  = extract_date(art_page)
-            body  = extract_content(art_page)
-
-            filename = f"{date}_RadioCanada_{safe_filename(title)}.txt"
-            filepath = OUTPUT_DIR / filename
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"TITRE : {title}\nURL   : {art_url}\nDATE  : {date}\n\n{body}")
+def make_site(section, file_tag, output_dir, author=None, job=None) -> Site:
+    """Analyses d'une rubrique de Radio-Canada (`section` : info/analyses), ou seulement celles d'`author`."""
+    base_url = f"{SITE_URL}/{section}"
+    return Site(
+        name="radiocanada",
+        author=author,  # None : analyses de plusieurs journalistes
+        file_tag=file_tag,
+        output_dir=output_dir,
+        listing_url=lambda n: base_url if n == 1 else f"{base_url}/{n}",
+        find_links=lambda soup, url: find_article_links(soup, url, section),
+        first_page=1,
+        max_pages=MAX_PAGES,
+        listing_window=4,  # pages de liste lues en parallèle
+        extract_page=extract_page,
+        # La rubrique liste tous les journalistes : avec `author`, les autres sont écartés
+        reject=(lambda soup, url, article: reject_other_authors(soup, url, article, author)) if author else None,
+        job=job,
+    )
 
-            logger.info(f"   ✅ Sauvegardé → {filename}")
-            art_page.close()
-            time.sleep(DELAY_SEC)
-        except PlaywrightTimeoutError:
-            logger.warning(f"⚠️ Timeout téléchargement: {art_url}")
-        except Exception as e:
-            logger.error(f"❌ Erreur téléchargement: {e}")
+SITE = make_site(SECTION, "RadioCanada", OUTPUT_DIR)
 
-    browser.close()
-    logger.info("✅ Scraping terminé !")
+# ----------------------------
+# Exécution du script
+# ----------------------------
+if __name__ == "__main__":
+    run_site(
+        SITE,
+        http_workers=4,         # HTTP d'abord, Chromium seulement si l'extraction échoue
+        browser_workers=2,
+        max_per_host=2,
+        block_resources=False,  # bloque images, polices, médias et traceurs (blocking.py)
+        resume=True,            # False pour refaire la découverte
+        incremental=True,       # s'arrête aux articles déjà connus ; False pour toute l'archive
+        refresh=False,          # True : revalide les articles déjà écrits (GET conditionnel)
+        browser_url=None,       # "http://127.0.0.1:9222" : Chromium partagé (browser_server.py)
+    )
+    logger.info("✅ Scraping terminé !")
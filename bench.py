@@ -0,0 +1,416 @@
+"""Banc d'essai hors ligne : chaque scraper tourne de bout en bout contre un serveur local.
+
+    python bench.py record jdm --pages 2            # enregistre listes et articles (réseau)
+    python bench.py run jdm ledevoir --latency 50 --throttle-rate 0.05 --json avant.json
+    python bench.py compare avant.json apres.json
+
+Les pages enregistrées vivent dans bench_fixtures/<hôte>/<sha1 de l'URL>.html. Le
+serveur les sert sous http://127.0.0.1:<port>/<hôte>/<chemin>, et le banc réécrit
+les URL du site vers lui ; les filtres de liens et de rejet voient toujours les
+URL d'origine. Latence, erreurs 500 et 429 (avec Retry-After) s'injectent au
+niveau du serveur.
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import inspect
+import io
+import json
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from pipeline import SITES, Pipeline, load_site
+from rate_limit import RateLimiter
+from selector_cache import SELECTORS, SELECTORS_PATH
+
+FIXTURES_DIR = Path(__file__).parent / "bench_fixtures"
+
+# Les scripts rejoués hors ligne ne doivent rien aller chercher sur le réseau
+_SCRIPT_RE = re.compile(r"<script(?![^>]*application/ld\+json)[^>]*>.*?</script>", re.S | re.I)
+
+
+def fixture_path(url, fixtures_dir=FIXTURES_DIR):
+    parts = urlsplit(url)
+    return fixtures_dir / parts.netloc / f"{hashlib.sha1(url.encode()).hexdigest()}.html"
+
+
+def save_fixture(url, html, fixtures_dir=FIXTURES_DIR):
+    path = fixture_path(url, fixtures_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(_SCRIPT_RE.sub("", html), encoding="utf-8")
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {"n": 0, "p50": None, "p95": None}
+    return {
+        "n": len(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+    }
+
+
+def peak_rss_mb():
+    """RSS maximale de ce processus et du plus gros enfant terminé (Chromium, pilote)."""
+    # ru_maxrss est en octets sur macOS, en kilo-octets sous Linux
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 1e6,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 1e6,
+    }
+
+
+# --- Serveur de fixtures -----------------------------------------------------
+
+class FixtureServer:
+    """Serveur HTTP local des pages enregistrées, avec pannes injectées."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency_ms=0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, seed=0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.by_status = {}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body, headers = server.respond(self.path)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, path):
+        time.sleep(self.latency)
+        with self.lock:
+            roll = self.random.random()
+        path_ = fixture_path(self.unlocal(self.base + path), self.fixtures_dir)
+        if roll < self.throttle_rate:
+            status, body, headers = 429, b"", {"Retry-After": str(self.retry_after)}
+        elif roll < self.throttle_rate + self.error_rate:
+            status, body, headers = 500, b"", {}
+        elif path_.exists():
+            status, body, headers = 200, path_.read_bytes(), {}
+        else:
+            status, body, headers = 404, b"", {}
+        with self.lock:
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+        return status, body, headers
+
+    def local(self, url):
+        """URL du site → URL servie par le banc."""
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.base}/{parts.netloc}{parts.path}{query}"
+
+    def unlocal(self, url):
+        """URL servie par le banc → URL d'origine (https)."""
+        if not url.startswith(self.base + "/"):
+            return url
+        return "https://" + url[len(self.base) + 1:]
+
+    def localize(self, site, output_dir):
+        """Copie de `site` dont les pages de liste et les articles passent par le serveur.
+
+        Les sitemaps sont retirés : ils mèneraient au site réel, et à toute son archive.
+        """
+
+        def links(find_links):
+            return lambda soup, page_url: [self.local(u) for u in find_links(soup, self.unlocal(page_url))]
+
+        reject = site.reject
+        return dataclasses.replace(
+            site,
+            output_dir=output_dir,
+            listing_url=lambda n: self.local(site.listing_url(n)),
+            find_links=links(site.find_links),
+            scroll_pages=[self.local(u) for u in site.scroll_pages],
+            scroll_find_links=links(site.scroll_find_links or site.find_links),
+            sitemaps=[],
+            reject=reject and (lambda soup, url, article: reject(soup, self.unlocal(url), article)),
+        )
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- Pipelines instrumentés -------------------------------------------------
+
+class RoundTrips:
+    """Compte les appels attendus sur les pages Playwright et les éléments qu'elles renvoient."""
+
+    def __init__(self):
+        self.count = 0
+
+    def wrap(self, target):
+        return target if isinstance(target, _Counted) else _Counted(target, self)
+
+
+class _Counted:
+    def __init__(self, target, counter):
+        self._target = target
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self._await(result) if inspect.isawaitable(result) else result
+
+        return call
+
+    async def _await(self, awaitable):
+        self._counter.count += 1
+        result = await awaitable
+        # Les ElementHandle / JSHandle renvoyés coûtent eux aussi un aller-retour par appel
+        if isinstance(result, list):
+            return [self._counter.wrap(r) if hasattr(r, "as_element") else r for r in result]
+        return self._counter.wrap(result) if hasattr(result, "as_element") else result
+
+
+class BenchPipeline(Pipeline):
+    """Pipeline qui chronomètre chaque étage et compte les allers-retours Chromium."""
+
+    def __init__(self, site, rate=None, **options):
+        super().__init__(site, **options)
+        if rate:
+            self.limiter = RateLimiter(options.get("max_per_host", 4), start_rate=rate, max_rate=rate)
+        self.stage_times = {}
+        self.round_trips = RoundTrips()
+
+    def timed(self, stage, start):
+        self.stage_times.setdefault(stage, []).append(time.perf_counter() - start)
+
+    async def pages(self):
+        pool = await super().pages()
+        if not getattr(pool, "counted", False):
+            acquire = pool.acquire
+
+            async def counted_acquire():
+                return self.round_trips.wrap(await acquire())
+
+            pool.acquire = counted_acquire
+            pool.counted = True
+        return pool
+
+    async def listing_links(self, url, find_links, scroll=False):
+        start = time.perf_counter()
+        try:
+            return await super().listing_links(url, find_links, scroll)
+        finally:
+            self.timed("listing", start)
+
+    async def get_html(self, url, kind="article", **options):
+        start = time.perf_counter()
+        try:
+            return await super().get_html(url, kind, **options)
+        finally:
+            self.timed("http", start)
+
+    async def render(self, url, kind="article", scroll=False):
+        start = time.perf_counter()
+        try:
+            return await super().render(url, kind, scroll)
+        finally:
+            self.timed(f"render/{kind}", start)
+
+    def extract(self, url, html, article):
+        start = time.perf_counter()
+        try:
+            return super().extract(url, html, article)
+        finally:
+            self.timed("extract", start)
+
+    def write(self, url, article):
+        start = time.perf_counter()
+        try:
+            return super().write(url, article)
+        finally:
+            self.timed("write", start)
+
+
+class RecordingPipeline(Pipeline):
+    """Pipeline réel qui enregistre chaque page de liste et d'article obtenue."""
+
+    def __init__(self, site, fixtures_dir=FIXTURES_DIR, **options):
+        super().__init__(site, **options)
+        self.fixtures_dir = fixtures_dir
+
+    async def get_html(self, url, kind="article", **options):
+        status, html = await super().get_html(url, kind, **options)
+        if html is not None:
+            save_fixture(url, html, self.fixtures_dir)
+        return status, html
+
+    async def render(self, url, kind="article", scroll=False):
+        html, article = await super().render(url, kind, scroll)
+        save_fixture(url, html, self.fixtures_dir)
+        return html, article
+
+
+# --- Commandes ------------------------------------------------------------
+
+@contextlib.contextmanager
+def isolated_selectors(tmp):
+    """Sélecteurs appris dans `tmp` : le banc part à froid et ne touche pas à ~/.cnmc/selectors.json."""
+    SELECTORS.reset(Path(tmp) / "selectors.json")
+    try:
+        yield
+    finally:
+        SELECTORS.reset(SELECTORS_PATH)
+
+
+def record(args):
+    for name in args.sites:
+        site = load_site(name)
+        with tempfile.TemporaryDirectory() as tmp, isolated_selectors(tmp):
+            # Sans sitemaps : seules les `--pages` pages de liste sont enregistrées, comme rejouées
+            site = dataclasses.replace(site, output_dir=Path(tmp) / "out", max_pages=args.pages, sitemaps=[])
+            pipeline = RecordingPipeline(site, fixtures_dir=args.fixtures, resume=False,
+                                         manifest_path=Path(tmp) / "manifest.sqlite", metrics_dir=tmp,
+                                         snapshots_dir=None, corpus_path=None)
+            written = asyncio.run(pipeline.run())
+            pipeline.manifest.close()
+        print(f"📼 {name}: {written} articles enregistrés dans {args.fixtures}")
+
+
+def bench_site(name, args):
+    with tempfile.TemporaryDirectory() as tmp, isolated_selectors(tmp), FixtureServer(
+        args.fixtures, args.latency, args.error_rate, args.throttle_rate, seed=args.seed,
+    ) as server:
+        site = server.localize(load_site(name), Path(tmp) / "out")
+        pipeline = BenchPipeline(
+            site, rate=None if args.polite else args.rate, resume=False,
+            http_workers=args.http_workers, browser_workers=args.browser_workers,
+            block_resources=args.block_resources, manifest_path=Path(tmp) / "manifest.sqlite",
+            metrics_dir=tmp, snapshots_dir=None, corpus_path=None,
+        )
+        out = io.StringIO() if args.quiet else sys.stdout
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            written = asyncio.run(pipeline.run())
+        elapsed = time.perf_counter() - start
+        pipeline.manifest.close()
+    return {
+        "articles": written,
+        "elapsed_s": elapsed,
+        "articles_per_s": written / elapsed if elapsed else 0.0,
+        "stages": {stage: percentiles(v) for stage, v in sorted(pipeline.stage_times.items())},
+        "browser_round_trips": pipeline.round_trips.count,
+        "server_statuses": {str(k): v for k, v in sorted(server.by_status.items())},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_result(name, r):
+    print(f"🏁 {name}: {r['articles']} articles en {r['elapsed_s']:.1f}s "
+          f"({r['articles_per_s']:.2f}/s), {r['browser_round_trips']} allers-retours Chromium, "
+          f"RSS max {r['peak_rss_mb']['self']:.0f} Mo (+ {r['peak_rss_mb']['children']:.0f} Mo enfants)")
+    for stage, p in r["stages"].items():
+        print(f"   ⏱️ {stage}: {p['n']} × p50 {p['p50'] * 1000:.0f} ms, p95 {p['p95'] * 1000:.0f} ms")
+    print(f"   🌐 réponses du serveur : {r['server_statuses']}")
+
+
+def run(args):
+    results = {}
+    for name in args.sites:
+        results[name] = bench_site(name, args)
+        print_result(name, results[name])
+    if args.json:
+        report = {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "options": {k: v for k, v in vars(args).items() if k not in ("func", "fixtures", "json")},
+            "sites": results,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+def compare(args):
+    """Débit et p95 par étage de `after` rapportés à `before`."""
+    before = json.loads(Path(args.before).read_text(encoding="utf-8"))["sites"]
+    after = json.loads(Path(args.after).read_text(encoding="utf-8"))["sites"]
+    for name in sorted(before.keys() & after.keys()):
+        b, a = before[name], after[name]
+        ratio = a["articles_per_s"] / b["articles_per_s"] if b["articles_per_s"] else float("nan")
+        print(f"📊 {name}: {b['articles_per_s']:.2f} → {a['articles_per_s']:.2f} articles/s (×{ratio:.2f}), "
+              f"allers-retours Chromium {b['browser_round_trips']} → {a['browser_round_trips']}")
+        for stage in sorted(b["stages"].keys() & a["stages"].keys()):
+            pb, pa = b["stages"][stage]["p95"], a["stages"][stage]["p95"]
+            if pb is not None and pa is not None:
+                print(f"   ⏱️ {stage}: p95 {pb * 1000:.0f} → {pa * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="enregistre des pages réelles comme fixtures")
+    p.add_argument("sites", nargs="+", choices=sorted(SITES))
+    p.add_argument("--pages", type=int, default=2, help="pages de liste à parcourir")
+    p.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    p.set_defaults(func=record)
+
+    p = sub.add_parser("run", help="rejoue les scrapers contre les fixtures")
+    p.add_argument("sites", nargs="+", choices=sorted(SITES))
+    p.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    p.add_argument("--latency", type=float, default=0, help="latence ajoutée par requête, en ms")
+    p.add_argument("--error-rate", type=float, default=0.0, help="part des requêtes en erreur 500")
+    p.add_argument("--throttle-rate", type=float, default=0.0, help="part des requêtes en 429")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--rate", type=float, default=1000.0, help="débit fixe par hôte, en requêtes/s")
+    p.add_argument("--polite", action="store_true", help="garde le limiteur adaptatif par défaut")
+    p.add_argument("--http-workers", type=int, default=4)
+    p.add_argument("--browser-workers", type=int, default=2)
+    p.add_argument("--block-resources", action="store_true")
+    p.add_argument("--quiet", action="store_true", help="masque le journal du pipeline")
+    p.add_argument("--json", help="fichier où écrire les résultats")
+    p.set_defaults(func=run)
+
+    p = sub.add_parser("compare", help="compare deux fichiers de résultats")
+    p.add_argument("before")
+    p.add_argument("after")
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
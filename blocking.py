@@ -0,0 +1,112 @@
+"""Blocage optionnel des images, polices, médias et traceurs via `context.route`.
+
+Les scrapers ne lisent que le titre, la date et les paragraphes : tout le
+reste est du temps de chargement, de la bande passante et de la mémoire perdus.
+"""
+from urllib.parse import urlsplit
+
+from metrics import METRICS
+
+# Types de ressources Playwright (`request.resource_type`) bloqués par défaut. Les
+# feuilles de style restent chargées : `innerText` dépend du CSS (éléments masqués).
+# Pas de « other » : Playwright y range aussi des requêtes utiles ; les balises de
+# mesure (sendBeacon) sont arrêtées par BLOCKED_HOSTS.
+BLOCKED_TYPES = {"image", "media", "font", "texttrack"}
+
+# Régies publicitaires, mesure d'audience et widgets de recommandation
+BLOCKED_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "adservice.google.com", "amazon-adsystem.com", "adsrvr.org",
+    "criteo.com", "criteo.net", "pubmatic.com", "rubiconproject.com",
+    "casalemedia.com", "openx.net", "indexww.com", "smartadserver.com",
+    "taboola.com", "outbrain.com", "scorecardresearch.com", "chartbeat.com",
+    "chartbeat.net", "facebook.net", "connect.facebook.net", "hotjar.com",
+    "permutive.com", "krxd.net", "quantserve.com", "moatads.com",
+    "newrelic.com", "nr-data.net", "jwpcdn.com", "brightcove.net",
+]
+
+# Règles par site : types et hôtes en plus, et hôtes à ne jamais bloquer
+SITE_RULES = {
+    "jdm": {
+        "allow_hosts": ["journaldemontreal.com"],
+        "block_hosts": ["qub.ca"],
+    },
+    "ledevoir": {
+        "allow_hosts": ["ledevoir.com"],
+    },
+    "lapresse": {
+        "allow_hosts": ["lapresse.ca"],
+    },
+    "radiocanada": {
+        "allow_hosts": ["radio-canada.ca"],
+        "block_hosts": ["mediaplayer.radio-canada.ca"],
+    },
+}
+
+
+def host_matches(host, patterns):
+    """Vrai si `host` est un des domaines de `patterns` ou un de leurs sous-domaines."""
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+class BlockStats:
+    """Compteurs de requêtes bloquées et d'octets réellement reçus."""
+
+    def __init__(self):
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.blocked_by_host = {}
+        self.allowed = 0
+        self.bytes_received = 0
+
+    def summary(self):
+        top_hosts = sorted(self.blocked_by_host.items(), key=lambda kv: -kv[1])[:5]
+        return (
+            f"🚫 {self.blocked} requêtes bloquées / {self.blocked + self.allowed} "
+            f"({self.bytes_received / 1e6:.1f} Mo reçus) — par type {self.blocked_by_type} "
+            f"— hôtes {dict(top_hosts)}"
+        )
+
+
+STATS = BlockStats()
+
+
+def should_block(site, resource_type, url):
+    """Décide si une requête doit être interrompue selon les règles de `site`."""
+    rules = SITE_RULES.get(site, {})
+    host = urlsplit(url).hostname or ""
+    if host_matches(host, rules.get("block_hosts", [])):
+        return True
+    if resource_type in BLOCKED_TYPES | set(rules.get("block_types", [])):
+        return True
+    if host_matches(host, rules.get("allow_hosts", [])):
+        return False
+    return host_matches(host, BLOCKED_HOSTS)
+
+
+def install_blocking(context, site, stats=STATS):
+    """Installe le filtre sur un contexte (API sync ou async) et compte le trafic.
+
+    Les gestionnaires retournent la coroutine de `route.abort()` / `route.fallback()`
+    en mode async ; Playwright l'attend lui-même.
+    """
+
+    def handle_route(route, request):
+        if should_block(site, request.resource_type, request.url):
+            stats.blocked += 1
+            stats.blocked_by_type[request.resource_type] = stats.blocked_by_type.get(request.resource_type, 0) + 1
+            host = urlsplit(request.url).hostname or ""
+            stats.blocked_by_host[host] = stats.blocked_by_host.get(host, 0) + 1
+            METRICS.inc("requests_blocked", site=site, type=request.resource_type)
+            return route.abort()
+        stats.allowed += 1
+        return route.fallback()
+
+    def count_bytes(response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            stats.bytes_received += int(length)
+
+    context.on("response", count_bytes)
+    return context.route("**/*", handle_route)
@@ -0,0 +1,147 @@
+"""Paragraphes répétés d'un article à l'autre (infolettre, « À lire aussi », droits, biographie), retirés au fil du crawl.
+
+Chaque paragraphe écrit est résumé par une empreinte (aux espaces, casse et
+ponctuation près) et compté une fois par article, par site. Dès qu'une
+empreinte figure dans BOILERPLATE_MIN articles du site, le paragraphe est
+retiré des articles suivants. Compteurs et paragraphes retirés vivent dans la
+base du manifeste.
+
+    python boilerplate.py lapresse --limit 20
+"""
+import argparse
+import hashlib
+import sqlite3
+
+from dedup import words
+from manifest import MANIFEST_PATH
+
+BOILERPLATE_MIN = 5     # articles distincts du site au-delà desquels un paragraphe est du gabarit
+SAMPLE_LEN = 200        # caractères gardés d'un paragraphe, pour le rapport
+
+BOILERPLATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paragraph_counts (
+    site     TEXT NOT NULL,
+    hash     TEXT NOT NULL,
+    articles INTEGER NOT NULL,
+    sample   TEXT NOT NULL,
+    PRIMARY KEY (site, hash)
+);
+CREATE TABLE IF NOT EXISTS article_paragraphs (
+    url     TEXT NOT NULL,
+    site    TEXT NOT NULL,
+    hash    TEXT NOT NULL,
+    removed INTEGER NOT NULL,
+    PRIMARY KEY (url, hash)
+);
+"""
+
+
+def paragraph_hash(text):
+    """Empreinte d'un paragraphe ; None s'il n'a aucun mot (séparateur, puce)."""
+    tokens = words(text)
+    if not tokens:
+        return None
+    return hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class BoilerplateIndex:
+    """Fréquence des paragraphes d'un site ; `strip` à l'extraction, `add` à l'écriture.
+
+    Les compteurs du site sont gardés en mémoire : `strip` s'exécute dans les
+    threads d'extraction sans toucher à SQLite.
+    """
+
+    def __init__(self, db, site, threshold=BOILERPLATE_MIN):
+        self.db = db
+        self.site = site
+        self.threshold = threshold
+        self.db.executescript(BOILERPLATE_SCHEMA)
+        self.counts = dict(self.db.execute("SELECT hash, articles FROM paragraph_counts WHERE site = ?", (site,)))
+
+    def is_boilerplate(self, digest):
+        return digest is not None and self.counts.get(digest, 0) >= self.threshold
+
+    def strip(self, article, sep):
+        """Retire de `article` les paragraphes de gabarit ; retourne les paragraphes retirés.
+
+        Les empreintes de tous les paragraphes lus restent dans `paragraph_hashes`
+        pour `add`, le texte lu entier dans `full_text`. Un article qui ne serait
+        plus que du gabarit est gardé entier.
+        """
+        paras = article.get("paragraphs") or []
+        hashes = [paragraph_hash(p) for p in paras]
+        article["paragraph_hashes"] = hashes
+        article["full_text"] = article["text"]
+        kept = [p for p, h in zip(paras, hashes) if not self.is_boilerplate(h)]
+        if not kept or len(kept) == len(paras):
+            article["boilerplate"] = []
+            return []
+        article["boilerplate"] = [p for p, h in zip(paras, hashes) if self.is_boilerplate(h)]
+        article["paragraphs"] = kept
+        article["text"] = sep.join(kept)
+        return article["boilerplate"]
+
+    def add(self, url, article):
+        """Compte les paragraphes de l'article écrit ; une réécriture remplace l'ancien compte."""
+        removed = {paragraph_hash(p) for p in article.get("boilerplate") or []}
+        new = {h for h in article.get("paragraph_hashes") or [] if h is not None}
+        # `paragraphs` n'a plus les paragraphes retirés : les échantillons viennent des deux listes
+        texts = (article.get("paragraphs") or []) + (article.get("boilerplate") or [])
+        samples = {paragraph_hash(p): p for p in texts}
+        with self.db:
+            old = {h for (h,) in self.db.execute("SELECT hash FROM article_paragraphs WHERE url = ?", (url,))}
+            for digest in old - new:
+                self.db.execute("UPDATE paragraph_counts SET articles = articles - 1 WHERE site = ? AND hash = ?",
+                                (self.site, digest))
+                self.counts[digest] = max(0, self.counts.get(digest, 0) - 1)
+            for digest in new - old:
+                self.db.execute(
+                    "INSERT INTO paragraph_counts (site, hash, articles, sample) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (site, hash) DO UPDATE SET articles = articles + 1",
+                    (self.site, digest, (samples.get(digest) or "")[:SAMPLE_LEN]),
+                )
+                self.counts[digest] = self.counts.get(digest, 0) + 1
+            self.db.execute("DELETE FROM article_paragraphs WHERE url = ?", (url,))
+            self.db.executemany(
+                "INSERT INTO article_paragraphs (url, site, hash, removed) VALUES (?, ?, ?, ?)",
+                ((url, self.site, digest, digest in removed) for digest in new),
+            )
+
+    def same(self, url, article):
+        """Vrai si `url` a été écrit avec les mêmes paragraphes lus, gabarit compris."""
+        stored = {h for (h,) in self.db.execute("SELECT hash FROM article_paragraphs WHERE url = ?", (url,))}
+        return bool(stored) and stored == {h for h in article.get("paragraph_hashes") or [] if h is not None}
+
+    def removed(self, url):
+        """Échantillons des paragraphes retirés de `url` à sa dernière écriture."""
+        rows = self.db.execute(
+            "SELECT c.sample FROM article_paragraphs a JOIN paragraph_counts c ON c.site = a.site AND c.hash = a.hash "
+            "WHERE a.url = ? AND a.removed", (url,))
+        return [sample for (sample,) in rows]
+
+    def top(self, limit=20):
+        """(articles, nombre de retraits, échantillon) des paragraphes de gabarit les plus fréquents."""
+        return self.db.execute(
+            "SELECT c.articles, (SELECT COUNT(*) FROM article_paragraphs a "
+            "                    WHERE a.site = c.site AND a.hash = c.hash AND a.removed), c.sample "
+            "FROM paragraph_counts c WHERE c.site = ? AND c.articles >= ? ORDER BY c.articles DESC LIMIT ?",
+            (self.site, self.threshold, limit),
+        ).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("site", help="nom du site (jdm, ledevoir, lapresse, radiocanada)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args(argv)
+    index = BoilerplateIndex(sqlite3.connect(args.manifest), args.site)
+    rows = index.top(args.limit)
+    if not rows:
+        print(f"Aucun paragraphe répété dans {BOILERPLATE_MIN} articles de {args.site}")
+    for articles, removals, sample in rows:
+        print(f"{articles:>6} articles, {removals:>6} retraits : {sample}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Chromium partagé : lancé une fois, réutilisé par tous les scrapers et lancements.
+
+Le serveur démarre le Chromium de Playwright avec le protocole DevTools
+ouvert en local ; chaque pipeline s'y connecte (`connect_over_cdp`) et y crée
+ses propres contextes, isolés des autres sites. Le processus est recyclé
+(arrêté puis relancé) après `--max-pages` pages ou au-delà de `--max-rss` Mo :
+entre deux crawls si possible, de force si la mémoire dépasse la limite en
+plein crawl (les pipelines se reconnectent).
+
+    python browser_server.py --port 9222 --max-pages 2000 --max-rss 1500
+    # puis, dans un script de site : run_site(SITE, browser_url="http://127.0.0.1:9222")
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+from manifest import DATA_DIR
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_PORT = 9222
+BROWSER_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+PROFILE_DIR = DATA_DIR / "chromium"
+MAX_PAGES = 2000
+MAX_RSS_MB = 1500
+POLL_EVERY = 2  # s ; le compte de pages est échantillonné à ce rythme
+START_TIMEOUT = 30  # s
+
+
+def chromium_executable():
+    """Chemin du Chromium installé par `playwright install chromium`."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def _proc_tree_rss(pid):
+    """RSS (octets) de `pid` et de ses descendants d'après /proc ; None hors Linux."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    children = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            # « pid (nom) état ppid … » : le nom peut contenir des espaces
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    total, todo = 0, [pid]
+    while todo:
+        current = todo.pop()
+        try:
+            for line in (proc / str(current) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+        todo += children.get(current, [])
+    return total
+
+
+def tree_rss(pid):
+    """Mémoire résidente de Chromium et de tous ses processus (rendu, GPU…), en octets."""
+    if psutil is None:
+        return _proc_tree_rss(pid)
+    try:
+        root = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+    except psutil.Error:
+        return None
+
+
+class BrowserServer:
+    """Un Chromium à l'écoute sur `port`, relancé quand il a trop servi ou trop grossi."""
+
+    def __init__(self, port=DEFAULT_PORT, headless=True, max_pages=MAX_PAGES, max_rss_mb=MAX_RSS_MB,
+                 profile_dir=PROFILE_DIR):
+        self.port = port
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.profile_dir = Path(profile_dir)
+        self.executable = chromium_executable()
+        self.process = None
+        self.recycles = 0
+        self.reset_counts()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset_counts(self):
+        self.pages = 0
+        self.seen = {}  # id de cible → dernière URL vue
+
+    def start(self):
+        # Profil jetable : rien ne doit fuir d'une génération de Chromium à la suivante
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        args = [
+            self.executable,
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={self.profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.reset_counts()
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.targets() is not None:
+                print(f"🟢 Chromium prêt sur {self.url} (pid {self.process.pid})")
+                return
+            time.sleep(0.2)
+        raise RuntimeError(f"Chromium n'a pas ouvert le port {self.port} en {START_TIMEOUT}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def targets(self):
+        """Pages ouvertes d'après /json/list, ou None si le port ne répond pas."""
+        try:
+            with urlopen(f"{self.url}/json/list", timeout=2) as r:
+                return [t for t in json.load(r) if t.get("type") == "page"]
+        except (OSError, ValueError):
+            return None
+
+    def poll(self):
+        """Met à jour le compte de pages ; retourne (pages utilisées par les clients, RSS)."""
+        targets = self.targets() or []
+        busy = 0
+        for target in targets:
+            url = target.get("url", "")
+            if url in ("", "about:blank"):
+                continue
+            busy += 1
+            if self.seen.get(target["id"]) != url:
+                self.seen[target["id"]] = url
+                self.pages += 1
+        return busy, tree_rss(self.process.pid)
+
+    def recycle_reason(self, busy, rss):
+        """Raison de relancer Chromium maintenant, ou None."""
+        if self.max_rss and rss and rss > self.max_rss:
+            # Même en plein crawl : mieux vaut une reconnexion qu'une machine qui swappe
+            return f"{rss / 1024 / 1024:.0f} Mo > {self.max_rss / 1024 / 1024:.0f} Mo"
+        if self.max_pages and self.pages >= self.max_pages and not busy:
+            return f"{self.pages} pages servies"
+        return None
+
+    def serve(self):
+        self.start()
+        try:
+            while True:
+                time.sleep(POLL_EVERY)
+                if self.process.poll() is not None:
+                    print(f"💥 Chromium arrêté (code {self.process.returncode}) : relance")
+                    self.start()
+                    continue
+                busy, rss = self.poll()
+                reason = self.recycle_reason(busy, rss)
+                if reason:
+                    self.recycles += 1
+                    print(f"♻️ Recyclage n°{self.recycles} de Chromium : {reason}")
+                    self.stop()
+                    self.start()
+        except KeyboardInterrupt:
+            print("\n🛑 Arrêt du Chromium partagé")
+        finally:
+            self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--headed", action="store_true", help="affiche les fenêtres (débogage)")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES, help="0 : pas de limite")
+    parser.add_argument("--max-rss", type=int, default=MAX_RSS_MB, help="en Mo ; 0 : pas de limite")
+    args = parser.parse_args(argv)
+    server = BrowserServer(args.port, not args.headed, args.max_pages, args.max_rss)
+    if server.max_rss and psutil is None and not Path("/proc").exists():
+        print("⚠️ Mémoire de Chromium illisible ici (installer psutil) : pas de limite de RSS")
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
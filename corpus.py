@@ -0,0 +1,273 @@
+"""Corpus unique en SQLite (avec index plein texte FTS5) à côté des fichiers .txt.
+
+Chaque article écrit y est aussi rangé : titre, URL, auteur, date, site,
+paragraphes et empreintes de dedup.py. Quand un article corrigé est réécrit,
+sa version précédente passe dans `article_versions`. Les .txt au format de
+notes_projet_CNMC.md peuvent en être régénérés à tout moment :
+
+    python corpus.py export --site jdm --out ~/Desktop/chroniques_bock_cote
+    python corpus.py search "laïcité" --author "Mathieu Bock-Côté" --since 2020-01-01
+    python corpus.py history https://www.ledevoir.com/opinion/chroniques/123456
+"""
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from dedup import pack_signature
+from extraction import RULES
+from manifest import DATA_DIR
+
+CORPUS_PATH = DATA_DIR / "corpus.sqlite"
+BATCH_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id         INTEGER PRIMARY KEY,
+    url        TEXT NOT NULL UNIQUE,
+    site       TEXT NOT NULL,
+    author     TEXT,
+    file_tag   TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    paragraphs TEXT NOT NULL,   -- liste JSON
+    exact      TEXT,
+    signature  BLOB,
+    written_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_author_date ON articles (author, date);
+CREATE INDEX IF NOT EXISTS articles_site_date ON articles (site, date);
+CREATE TABLE IF NOT EXISTS article_versions (
+    url         TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    paragraphs  TEXT NOT NULL,
+    exact       TEXT,
+    written_at  REAL NOT NULL,
+    replaced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS article_versions_url ON article_versions (url, written_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, body, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+# --- Format .txt -------------------------------------------------------------
+
+def txt_filename(date, file_tag, title):
+    titre_fichier = re.sub(r"[^\w\d-]", "_", title)[:60]
+    return f"{date}_{file_tag}_{titre_fichier}.txt"
+
+
+def format_txt(url, article, author=None):
+    """Texte d'un article au format de notes_projet_CNMC.md."""
+    header = f"TITRE  : {article['title']}\nURL    : {url}\n"
+    if author:
+        header += f"AUTEUR : {author}\n"
+    return header + f"DATE   : {article['date']}\n\n" + article["text"]
+
+
+def _url_of(path):
+    with open(path, encoding="utf-8") as f:
+        f.readline()
+        return f.readline().removeprefix("URL    : ").strip()
+
+
+def write_txt(output_dir, file_tag, author, url, article):
+    """Écrit le .txt et retourne son chemin.
+
+    Deux titres identiques sur 60 caractères le même jour ne s'écrasent plus :
+    le second fichier reçoit un suffixe tiré de son URL.
+    """
+    path = Path(output_dir) / txt_filename(article["date"], file_tag, article["title"])
+    if path.exists() and _url_of(path) != url:
+        path = path.with_name(f"{path.stem}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_txt(url, article, author))
+    return path
+
+
+def fts_query(query):
+    """Requête FTS5 où chaque mot de `query` est une chaîne : « Bock-Côté » ou « l'école » ne sont pas des opérateurs."""
+    return " ".join('"' + token.replace('"', '""') + '"' for token in query.split())
+
+
+# --- Corpus --------------------------------------------------------------------
+
+class Corpus:
+    """Articles écrits, insérés par lots dans une transaction."""
+
+    def __init__(self, path=CORPUS_PATH, batch_size=BATCH_SIZE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite compilé sans FTS5 : la recherche par mot-clé se rabat sur LIKE
+            self.fts = False
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, site, url, article):
+        """Met l'article en attente ; le lot part quand il atteint `batch_size`."""
+        exact, signature = article.get("fingerprint") or (None, None)
+        self.pending.append((
+            url, site.name, site.author, site.file_tag, article["title"], article["date"],
+            json.dumps(article.get("paragraphs") or [article["text"]], ensure_ascii=False), exact,
+            None if signature is None else pack_signature(signature), time.time(),
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.db:
+            for row in self.pending:
+                url = row[0]
+                old = self.db.execute("SELECT id, title, paragraphs, date, exact, written_at FROM articles "
+                                      "WHERE url = ?", (url,)).fetchone()
+                if old and (old[1], old[2]) != (row[4], row[6]):
+                    # Article corrigé depuis : on garde la version remplacée
+                    self.db.execute(
+                        "INSERT INTO article_versions (url, title, date, paragraphs, exact, written_at, "
+                        "replaced_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (url, old[1], old[3], old[2], old[4], old[5], row[9]),
+                    )
+                if old and self.fts:
+                    # Table FTS sans contenu : on retire l'ancienne entrée avec ses propres valeurs
+                    self.db.execute(
+                        "INSERT INTO articles_fts (articles_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                        (old[0], old[1], "\n".join(json.loads(old[2]))),
+                    )
+                cur = self.db.execute(
+                    "INSERT INTO articles (url, site, author, file_tag, title, date, paragraphs, exact, "
+                    "signature, written_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (url) DO UPDATE SET site = excluded.site, author = excluded.author, "
+                    "file_tag = excluded.file_tag, title = excluded.title, date = excluded.date, "
+                    "paragraphs = excluded.paragraphs, exact = excluded.exact, "
+                    "signature = excluded.signature, written_at = excluded.written_at "
+                    "RETURNING id",
+                    row,
+                )
+                (rowid,) = cur.fetchone()
+                if self.fts:
+                    body = "\n".join(json.loads(row[6]))
+                    self.db.execute("INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)",
+                                    (rowid, row[4], body))
+        self.pending.clear()
+
+    def search(self, query=None, author=None, site=None, since=None, until=None, limit=50, raw=False):
+        """Articles triés par date contenant tous les mots de `query`.
+
+        Avec `raw`, `query` est passée telle quelle à FTS5 (« laïcité NOT école ») ;
+        une requête mal formée lève sqlite3.OperationalError.
+        """
+        where, args = [], []
+        if query and self.fts:
+            where.append("id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+            args.append(query if raw else fts_query(query))
+        elif query:
+            where.append("(title LIKE ? OR paragraphs LIKE ?)")
+            args += [f"%{query}%"] * 2
+        for column, op, value in (("author", "=", author), ("site", "=", site),
+                                  ("date", ">=", since), ("date", "<=", until)):
+            if value:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        sql = "SELECT url, site, author, title, date FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY date DESC LIMIT ?"
+        return self.db.execute(sql, args + [limit]).fetchall()
+
+    def history(self, url):
+        """Versions de `url`, de la plus ancienne à l'actuelle : (title, date, paragraphes, écrite le)."""
+        rows = self.db.execute(
+            "SELECT title, date, paragraphs, written_at FROM article_versions WHERE url = ? "
+            "UNION ALL SELECT title, date, paragraphs, written_at FROM articles WHERE url = ? "
+            "ORDER BY written_at",
+            (url, url),
+        )
+        return [(title, date, json.loads(paragraphs), written_at) for title, date, paragraphs, written_at in rows]
+
+    def export(self, output_dir, site=None, author=None):
+        """Régénère les .txt de `site` / `author` dans `output_dir` ; retourne leur nombre."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        where, args = [], []
+        for column, value in (("site", site), ("author", author)):
+            if value:
+                where.append(f"{column} = ?")
+                args.append(value)
+        sql = "SELECT url, site, author, file_tag, title, date, paragraphs FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        count = 0
+        for url, site_, author_, file_tag, title, date, paragraphs in self.db.execute(sql + " ORDER BY date", args):
+            article = {"title": title, "date": date, "text": RULES[site_]["sep"].join(json.loads(paragraphs))}
+            write_txt(output_dir, file_tag, author_, url, article)
+            count += 1
+        return count
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="régénère les .txt")
+    p.add_argument("--out", type=Path, required=True)
+    p.add_argument("--site")
+    p.add_argument("--author")
+
+    p = sub.add_parser("search", help="cherche par mot-clé, auteur et date")
+    p.add_argument("query", nargs="?")
+    p.add_argument("--author")
+    p.add_argument("--site")
+    p.add_argument("--since", help="AAAA-MM-JJ")
+    p.add_argument("--until", help="AAAA-MM-JJ")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--raw", action="store_true", help="requête FTS5 telle quelle (AND, OR, NOT, \"phrase\", préfixe*)")
+
+    p = sub.add_parser("history", help="versions successives d'un article")
+    p.add_argument("url")
+
+    args = parser.parse_args(argv)
+    corpus = Corpus(args.corpus)
+    if args.command == "export":
+        start = time.perf_counter()
+        count = corpus.export(args.out.expanduser(), args.site, args.author)
+        print(f"📤 {count} articles exportés dans {args.out} en {time.perf_counter() - start:.1f}s")
+    elif args.command == "history":
+        for title, date, paragraphs, written_at in corpus.history(args.url):
+            words = sum(len(p.split()) for p in paragraphs)
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(written_at))}  {date}  {words:>5} mots  {title}")
+    else:
+        try:
+            rows = corpus.search(args.query, args.author, args.site, args.since, args.until, args.limit, args.raw)
+        except sqlite3.OperationalError as e:
+            corpus.close()
+            sys.exit(f"❌ Requête invalide « {args.query} » : {e}")
+        for url, site, author, title, date in rows:
+            print(f"{date}  {site:<12} {author or '':<22} {title}\n            {url}")
+    corpus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Empreintes de contenu : repère les doublons exacts et quasi exacts, tous sites et lancements confondus.
+
+Le texte est découpé en séquences de SHINGLE mots, résumé par une signature
+MinHash de PERMUTATIONS valeurs, puis rangé par bandes (LSH) : deux articles
+qui partagent au moins une bande sont comparés, les autres jamais. Le coût par
+article ne dépend donc pas de la taille du corpus. Empreintes et bandes vivent
+dans la base du manifeste.
+"""
+import hashlib
+import random
+import re
+import struct
+
+SHINGLE = 5
+PERMUTATIONS = 64
+BANDS = 16                      # 16 bandes de 4 valeurs : candidats dès ~50 % de similarité
+ROWS = PERMUTATIONS // BANDS
+NEAR_DUPLICATE = 0.8            # similarité de Jaccard estimée au-delà de laquelle on écarte
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240101)  # graine fixe : les signatures restent comparables d'un lancement à l'autre
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(PERMUTATIONS)]
+_PACK = struct.Struct(f"<{PERMUTATIONS}Q")
+
+DEDUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url       TEXT PRIMARY KEY,
+    site      TEXT NOT NULL,
+    exact     TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_exact ON fingerprints (exact);
+CREATE TABLE IF NOT EXISTS lsh (
+    band   INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    url    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lsh_bucket ON lsh (band, bucket);
+"""
+
+
+def words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def exact_hash(text):
+    """Empreinte du texte aux espaces, casse et ponctuation près."""
+    return hashlib.sha1(" ".join(words(text)).encode("utf-8")).hexdigest()
+
+
+def minhash(text):
+    tokens = words(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(max(1, len(tokens) - SHINGLE + 1))}
+    hashes = [_hash64(s) for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def pack_signature(signature):
+    return _PACK.pack(*signature)
+
+
+def unpack_signature(blob):
+    return _PACK.unpack(blob)
+
+
+def similarity(sig_a, sig_b):
+    """Similarité de Jaccard estimée entre deux signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / PERMUTATIONS
+
+
+def _buckets(signature):
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        yield band, hashlib.blake2b(repr(chunk).encode(), digest_size=8).hexdigest()
+
+
+class DuplicateIndex:
+    """Index des articles déjà écrits ; `find` avant l'écriture, `add` après."""
+
+    def __init__(self, db, threshold=NEAR_DUPLICATE):
+        self.db = db
+        self.threshold = threshold
+        self.db.executescript(DEDUP_SCHEMA)
+
+    def fingerprint(self, article):
+        text = article["text"]
+        return exact_hash(text), minhash(text)
+
+    def find(self, url, fingerprint):
+        """(« exact » | « near », URL de l'original, similarité) si l'article est déjà connu, sinon None."""
+        exact, signature = fingerprint
+        row = self.db.execute("SELECT url FROM fingerprints WHERE exact = ? AND url != ?", (exact, url)).fetchone()
+        if row:
+            return "exact", row[0], 1.0
+        candidates = set()
+        for band, bucket in _buckets(signature):
+            rows = self.db.execute("SELECT url FROM lsh WHERE band = ? AND bucket = ? AND url != ?",
+                                   (band, bucket, url))
+            candidates.update(u for (u,) in rows)
+        best = None
+        for candidate in candidates:
+            (blob,) = self.db.execute("SELECT signature FROM fingerprints WHERE url = ?", (candidate,)).fetchone()
+            score = similarity(signature, unpack_signature(blob))
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = ("near", candidate, score)
+        return best
+
+    def exact(self, url):
+        """Empreinte exacte du texte écrit pour `url`, ou None."""
+        row = self.db.execute("SELECT exact FROM fingerprints WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, url, site, fingerprint):
+        exact, signature = fingerprint
+        with self.db:
+            self.db.execute("DELETE FROM lsh WHERE url = ?", (url,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, site, exact, signature) VALUES (?, ?, ?, ?)",
+                (url, site, exact, pack_signature(signature)),
+            )
+            self.db.executemany("INSERT INTO lsh (band, bucket, url) VALUES (?, ?, ?)",
+                                ((band, bucket, url) for band, bucket in _buckets(signature)))
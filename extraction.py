@@ -0,0 +1,165 @@
+"""Extraction titre / date / paragraphes à partir du HTML, commune à tous les sites.
+
+Les mêmes règles servent pour le HTML reçu en HTTP et pour le DOM rendu par
+Chromium (`page.content()`). Chaque cascade commence par le sélecteur qui a
+gagné le plus souvent pour la rubrique de l'URL (selector_cache.py).
+"""
+import re
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+from bs4 import BeautifulSoup
+
+from metadata import body_paragraphs, read_metadata
+from selector_cache import SELECTORS
+
+# Month mapping for French dates
+MOIS_FR = {
+    "janvier":   "01", "février":  "02", "mars":     "03",
+    "avril":     "04", "mai":      "05", "juin":     "06",
+    "juillet":   "07", "août":     "08", "septembre":"09",
+    "octobre":   "10", "novembre": "11", "décembre": "12"
+}
+
+# Cascades de sélecteurs par site, dans l'ordre de priorité des scripts d'origine.
+# `min_len` : longueur minimale d'un paragraphe ; `sep` : séparateur à l'écriture.
+RULES = {
+    "jdm": {
+        "title": ["title"],
+        "date": ["time"],
+        "content": ["article p"],
+        "min_len": 1,
+        "sep": "\n",
+    },
+    "ledevoir": {
+        "title": ["title"],
+        "date": ["time"],
+        "content": ["article p"],
+        "min_len": 1,
+        "sep": "\n",
+    },
+    "lapresse": {
+        "title": ["h1", ".article-title", ".story-title", "[data-testid='article-title']"],
+        "date": ["time", ".article-date", ".story-date", "[data-testid='article-date']"],
+        "content": [
+            "article p",
+            ".article-content p",
+            ".story-content p",
+            ".content p",
+            "div[data-module='ArticleBody'] p",
+            ".text-content p",
+            ".entry-content p",
+            ".post-content p",
+            ".article-body p",
+        ],
+        "min_len": 1,
+        "sep": "\n",
+    },
+    "radiocanada": {
+        "title": ["title", "h1"],
+        "date": ['time[datetime]', 'span[data-testid="date"]', 'time', '.published-date', '.date'],
+        "content": [
+            'div[data-testid="text-content"] p',
+            'article div p',
+            'div.article-content p',
+            '[data-testid="article-body"] p',
+            'main p',
+            'div.content p',
+            'p',
+        ],
+        "min_len": 51,
+        "sep": "\n\n",
+    },
+}
+
+# Marqueurs d'une page qui ne s'affiche qu'avec JavaScript
+JS_ONLY_MARKERS = ("enable javascript", "activer javascript", "activez javascript", "javascript is required")
+
+
+def parse_date(text):
+    """Retourne YYYY-MM-DD depuis une date ISO ou française (« 15 juillet 2025 »), sinon None."""
+    m = re.search(r'(\d{4}-\d{2}-\d{2})', text)
+    if m:
+        return m.group(1)
+    m = re.search(r'(\d{1,2})\s+([A-Za-zéû]+)\s+(\d{4})', text)
+    if m:
+        day, mois, year = m.groups()
+        if mois.lower() in MOIS_FR:
+            return f"{year}-{MOIS_FR[mois.lower()]}-{int(day):02d}"
+    return None
+
+
+def clean_text(elem):
+    """Texte d'un élément, espaces normalisés (proche de `innerText`)."""
+    return " ".join(elem.get_text().split())
+
+
+def extract_title(soup, site, url=None):
+    for selector in SELECTORS.order(site, url, "title", RULES[site]["title"]):
+        elem = soup.select_one(selector)
+        if elem and clean_text(elem):
+            SELECTORS.record(site, url, "title", selector)
+            return clean_text(elem)
+    SELECTORS.record(site, url, "title", None)
+    return "Sans titre"
+
+
+def extract_date(soup, site, url=None):
+    for selector in SELECTORS.order(site, url, "date", RULES[site]["date"]):
+        elem = soup.select_one(selector)
+        if elem:
+            date = parse_date(elem.get("datetime") or "") or parse_date(clean_text(elem))
+            if date:
+                SELECTORS.record(site, url, "date", selector)
+                return date
+    SELECTORS.record(site, url, "date", None)
+    return "0000-00-00"
+
+
+def extract_paragraphs(soup, site, url=None):
+    """Paragraphes du premier sélecteur de la cascade qui donne un résultat."""
+    rules = RULES[site]
+    for selector in SELECTORS.order(site, url, "content", rules["content"]):
+        texts = [clean_text(p) for p in soup.select(selector)]
+        paras = [t for t in texts if len(t) >= rules["min_len"]]
+        if paras:
+            SELECTORS.record(site, url, "content", selector)
+            return paras
+    SELECTORS.record(site, url, "content", None)
+    return []
+
+
+def looks_js_only(soup):
+    """Vrai si la page n'a presque pas de texte servi, ou demande JavaScript sans en avoir."""
+    noscript = " ".join(n.get_text(" ", strip=True).lower() for n in soup.find_all("noscript"))
+    body = soup.body.get_text(" ", strip=True) if soup.body else ""
+    return len(body) < 200 or (any(marker in noscript for marker in JS_ONLY_MARKERS) and len(body) < 1000)
+
+
+def extract_from_soup(soup, site, url=None):
+    """Titre, date et paragraphes d'une page déjà analysée ; None sans paragraphes.
+
+    Les métadonnées publiées (metadata.py) passent en premier ; les cascades de
+    RULES ne servent qu'aux champs qu'elles ne donnent pas. `metadata` vaut
+    « complete » quand aucune cascade n'a été parcourue.
+    """
+    meta = read_metadata(soup)
+    body = body_paragraphs(meta["body"], RULES[site]["min_len"])
+    paras = body or extract_paragraphs(soup, site, url)
+    if not paras:
+        return None
+    date = parse_date(meta["published"] or "")
+    found = sum(bool(v) for v in (meta["title"], date, body))
+    return {
+        "title": meta["title"] or extract_title(soup, site, url),
+        "date": date or extract_date(soup, site, url),
+        "text": RULES[site]["sep"].join(paras),
+        "paragraphs": paras,
+        "author": meta["author"],
+        "modified": meta["modified"],
+        "metadata": ("none", "partial", "partial", "complete")[found],
+    }
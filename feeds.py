@@ -0,0 +1,167 @@
+"""Flux paginés derrière les pages à défilement infini, appris puis parcourus en HTTP.
+
+Une seule visite dans Chromium enregistre les réponses XHR/fetch reçues pendant
+le défilement. Parmi elles, `learn_feed` cherche une requête dont un nombre
+change d'un appel à l'autre (page=2 → page=3, offset=20 → offset=40, /page/2 →
+/page/3) et dont la réponse contient des liens d'articles ; le pipeline
+demande ensuite les pages suivantes directement, sans navigateur.
+"""
+import json
+import re
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlsplit
+
+from bs4 import BeautifulSoup
+
+from extraction import PARSER, parse_date
+
+PAGE_PARAMS = {"page", "p", "pg", "pagenumber", "pageindex", "pagenum"}
+OFFSET_PARAMS = {"offset", "from", "start", "skip", "startindex"}
+MAX_BODY = 2_000_000  # caractères : au-delà ce n'est pas un flux de liste
+# En-têtes de la requête du navigateur rejoués en HTTP (certains flux les exigent)
+REPLAYED_HEADERS = {"accept", "x-requested-with", "referer"}
+
+_NUMBER = re.compile(r"\d+")
+_URLISH = re.compile(r"^(?:https?://|/)[^\s\"'<>]+$")
+_DATE_KEY = re.compile(r"date|publi|time|created|modified", re.I)
+
+
+@dataclass
+class Capture:
+    """Une réponse XHR/fetch observée pendant le défilement."""
+    url: str
+    request_headers: dict
+    content_type: str
+    body: str
+
+
+@dataclass
+class Feed:
+    """Flux dont le `index`-ième nombre de l'URL avance de `step` à chaque page."""
+    template: str
+    index: int
+    start: int
+    step: int
+    headers: dict
+
+    def url(self, n):
+        """URL de la n-ième page après la dernière observée."""
+        value = self.start + n * self.step
+        matches = list(_NUMBER.finditer(self.template))
+        m = matches[self.index]
+        return self.template[:m.start()] + str(value) + self.template[m.end():]
+
+
+def _shape(url):
+    return _NUMBER.sub("#", url)
+
+
+def _numbers(url):
+    return [int(m.group()) for m in _NUMBER.finditer(url)]
+
+
+def _strings(data):
+    """Toutes les chaînes d'un JSON, avec la clé qui les porte."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, str):
+                yield key, value
+            else:
+                yield from _strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            if isinstance(value, str):
+                yield "", value
+            else:
+                yield from _strings(value)
+
+
+def feed_links(body, url, find_links):
+    """(liens d'articles, dates YYYY-MM-DD) d'une réponse de flux, JSON ou fragment HTML.
+
+    Les URL d'un JSON sont remises dans des `<a href>` pour passer par le même
+    `find_links` que les pages de liste.
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    if data is not None:
+        hrefs, dates = [], []
+        for key, value in _strings(data):
+            if _URLISH.match(value):
+                hrefs.append(value)
+            elif _DATE_KEY.search(key):
+                date = parse_date(value)
+                if date:
+                    dates.append(date)
+            elif "<a " in value:
+                # Fragment HTML embarqué dans le JSON (champ « html », « content »…)
+                links, more_dates = feed_links(value, url, find_links)
+                hrefs += links
+                dates += more_dates
+        soup = BeautifulSoup("".join(f'<a href="{h}"></a>' for h in hrefs), PARSER)
+        return find_links(soup, url), dates
+    soup = BeautifulSoup(body, PARSER)
+    dates = [d for d in (parse_date(t.get("datetime") or t.get_text()) for t in soup.select("time")) if d]
+    return find_links(soup, url), dates
+
+
+def learn_feed(captures, find_links):
+    """Flux le plus riche en liens d'articles parmi `captures`, ou None."""
+    useful = []
+    for capture in captures:
+        if len(capture.body) > MAX_BODY:
+            continue
+        links, _ = feed_links(capture.body, capture.url, find_links)
+        if links:
+            useful.append((capture, len(set(links))))
+
+    best = None
+    by_shape = {}
+    for capture, count in useful:
+        by_shape.setdefault(_shape(capture.url), []).append((capture, count))
+    for group in by_shape.values():
+        feed = _from_group(group)
+        score = sum(count for _, count in group)
+        if feed and (best is None or score > best[1]):
+            best = (feed, score)
+    return best[0] if best else None
+
+
+def _from_group(group):
+    """Flux d'un groupe de requêtes de même forme : le nombre qui varie est la pagination."""
+    last, count = group[-1]
+    numbers = [_numbers(c.url) for c, _ in group]
+    if len(group) >= 2:
+        # Plusieurs nombres peuvent varier (horodatage anti-cache) : la pagination avance le moins
+        varying = []
+        for i in range(len(numbers[0])):
+            values = sorted({n[i] for n in numbers})
+            if len(values) >= 2:
+                varying.append((min(b - a for a, b in zip(values, values[1:])), i, values[-1]))
+        if varying:
+            step, i, highest = min(varying)
+            return Feed(last.url, i, highest + step, step, last.request_headers)
+    # Une seule requête : on se fie au nom du paramètre
+    query = dict(parse_qsl(urlsplit(last.url).query))
+    for name, value in query.items():
+        if not value.isdigit():
+            continue
+        if name.lower() in PAGE_PARAMS:
+            step = 1
+        elif name.lower() in OFFSET_PARAMS:
+            step = count
+        else:
+            continue
+        index = _index_of_param(last.url, name)
+        if index is not None:
+            return Feed(last.url, index, int(value) + step, step, last.request_headers)
+    return None
+
+
+def _index_of_param(url, name):
+    m = re.search(rf"[?&]{re.escape(name)}=(\d+)", url)
+    if not m:
+        return None
+    return sum(1 for n in _NUMBER.finditer(url) if n.start() < m.start(1))
@@ -0,0 +1,164 @@
+"""URL canoniques et index des articles déjà découverts, tous sites et auteurs confondus.
+
+Deux liens vers le même article (paramètres de suivi, fragment, barre oblique
+finale, http/https, autre rubrique chez La Presse) donnent la même clé. Les
+clés vues sont persistées dans la table `frontier` du manifeste ; en mémoire ne
+reste qu'un filtre de Bloom, consulté avant SQLite.
+"""
+import hashlib
+import math
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Paramètres qui ne changent pas la page servie
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga",
+    "cmp", "xtor", "ref", "referrer", "origin", "sharing", "partner", "redirectedfrom",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "pk_")
+
+# Hôte → motifs dont le premier groupe identifie l'article, du plus sûr au moins sûr
+KEY_RULES = {
+    "lapresse.ca": [
+        re.compile(r"/(\d{2}-\d{6,})-"),                          # ancien format : 01-4834567-titre.php
+        re.compile(r"/(\d{4}-\d{2}-\d{2}/[^/]+?)(?:\.php)?$"),    # date/slug, quelle que soit la rubrique
+    ],
+    "journaldemontreal.com": [
+        re.compile(r"/(\d{4}/\d{2}/\d{2}/[^/]+)$"),               # date/slug
+    ],
+    "ledevoir.com": [
+        re.compile(r"/(\d{5,})(?:/|$)"),                          # identifiant numérique
+    ],
+    "radio-canada.ca": [
+        re.compile(r"/(\d{5,})(?:/|$)"),
+    ],
+}
+
+
+def _rule_host(host):
+    for domain in KEY_RULES:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return None
+
+
+def canonical_url(url, base=None):
+    """`url` absolue sans fragment, paramètres de suivi ni barre oblique finale.
+
+    Les sites de KEY_RULES, servis en https, passent toujours en https.
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443) and not _rule_host(host):
+        host = f"{host}:{parts.port}"
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = re.sub(r"/{2,}", "/", parts.path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    scheme = "https" if _rule_host(parts.hostname or "") else (parts.scheme or "https")
+    return urlunsplit((scheme, host, path or "/", urlencode(sorted(query)), ""))
+
+
+_URL_DATE = re.compile(r"/(\d{4})[/-](\d{2})[/-](\d{2})/")
+
+
+def url_date(url):
+    """Date YYYY-MM-DD inscrite dans le chemin (/2020/01/31/ ou /2020-01-31/), sinon None."""
+    m = _URL_DATE.search(urlsplit(url).path)
+    return "-".join(m.groups()) if m else None
+
+
+def url_key(url):
+    """Clé d'un article : « domaine:identifiant » si une règle du site s'applique, sinon l'URL canonique."""
+    url = canonical_url(url)
+    parts = urlsplit(url)
+    domain = _rule_host(parts.hostname or "")
+    if domain:
+        for pattern in KEY_RULES[domain]:
+            m = pattern.search(parts.path)
+            if m:
+                return f"{domain}:{m.group(1).lower()}"
+    return url
+
+
+class BloomFilter:
+    """Ensemble approximatif : pas de faux négatifs, `error_rate` de faux positifs à pleine capacité."""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+FRONTIER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    key  TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    url  TEXT NOT NULL
+);
+"""
+
+
+class Frontier:
+    """Clés d'articles déjà découverts, persistées dans la base du manifeste."""
+
+    def __init__(self, db, site, capacity=1_000_000):
+        self.db = db
+        self.site = site
+        self.db.executescript(FRONTIER_SCHEMA)
+        self._backfill()
+        self.bloom = BloomFilter(capacity)
+        for (key,) in self.db.execute("SELECT key FROM frontier"):
+            self.bloom.add(key)
+
+    def _backfill(self):
+        """Indexe les URL d'un manifeste antérieur à la table `frontier`."""
+        if self.db.execute("SELECT 1 FROM frontier WHERE site = ? LIMIT 1", (self.site,)).fetchone():
+            return
+        rows = self.db.execute("SELECT url FROM urls WHERE site = ?", (self.site,)).fetchall()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO frontier (key, site, url) VALUES (?, ?, ?)",
+                ((url_key(url), self.site, url) for (url,) in rows),
+            )
+
+    def __contains__(self, key):
+        # Le filtre écarte presque tous les inconnus sans toucher au disque
+        if key not in self.bloom:
+            return False
+        return self.db.execute("SELECT 1 FROM frontier WHERE key = ?", (key,)).fetchone() is not None
+
+    def known(self, url):
+        return url_key(url) in self
+
+    def admit(self, urls):
+        """URL canoniques des articles jamais vus parmi `urls`, désormais indexées."""
+        new = []
+        with self.db:
+            for url in urls:
+                url = canonical_url(url)
+                key = url_key(url)
+                if key in self:
+                    continue
+                self.db.execute("INSERT OR IGNORE INTO frontier (key, site, url) VALUES (?, ?, ?)",
+                                (key, self.site, url))
+                self.bloom.add(key)
+                new.append(url)
+        return new
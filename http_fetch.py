@@ -0,0 +1,101 @@
+"""Récupération HTTP d'abord, avec une session keep-alive partagée.
+
+Chromium n'est utilisé qu'en repli : quand l'extraction ne trouve aucun
+paragraphe, quand la page exige JavaScript ou quand le serveur refuse le client HTTP.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+from page_pool import USER_AGENT
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "fr-CA,fr;q=0.9,en;q=0.5",
+}
+HTTP_TIMEOUT = 15  # s
+
+# Pas la peine de rendre dans Chromium une page qui n'existe pas
+GONE_STATUSES = {404, 410}
+# Réponse à un GET conditionnel : la copie déjà téléchargée est à jour
+NOT_MODIFIED = 304
+STREAM_CHUNK = 8192
+
+
+def make_session(pool_size=8):
+    """Session requests dont le pool garde `pool_size` connexions ouvertes par hôte."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+SESSION = make_session()
+
+
+class PathStats:
+    """Nombre d'articles obtenus par HTTP, par Chromium ou en échec, par site."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, site, path):
+        site_counts = self.counts.setdefault(site, {"http": 0, "browser": 0, "failed": 0})
+        site_counts[path] += 1
+
+    def summary(self):
+        return "\n".join(
+            f"🌐 {site}: {c['http']} via HTTP, {c['browser']} via Chromium, {c['failed']} en échec"
+            for site, c in sorted(self.counts.items())
+        )
+
+
+PATH_STATS = PathStats()
+
+
+def fetch_html(url, session=SESSION, headers=None):
+    """GET `url` ; retourne (status, html, headers). `html` vaut None si la réponse est inutilisable.
+
+    `status` vaut None en cas d'erreur réseau ou de délai dépassé. `headers`
+    s'ajoutent à ceux de la session pour cette requête.
+    """
+    try:
+        r = session.get(url, timeout=HTTP_TIMEOUT, headers=headers)
+    except requests.RequestException:
+        return None, None, {}
+    return r.status_code, r.text if r.ok and r.status_code != NOT_MODIFIED else None, r.headers
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """En-têtes d'un GET conditionnel à partir des validateurs d'une réponse précédente."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def stream_html(url, sniffer, session=SESSION):
+    """Comme `fetch_html`, mais lit la réponse par morceaux et les passe à `sniffer.feed`.
+
+    Dès que `sniffer.verdict` vaut False, la connexion est fermée sans lire la
+    suite et `html` vaut None ; sinon la page entière est retournée.
+    """
+    try:
+        with session.get(url, timeout=HTTP_TIMEOUT, stream=True) as r:
+            if not r.ok:
+                return r.status_code, None, r.headers
+            r.encoding = r.encoding or "utf-8"
+            chunks = []
+            for chunk in r.iter_content(STREAM_CHUNK, decode_unicode=True):
+                chunks.append(chunk)
+                if sniffer.verdict is None:
+                    sniffer.feed(chunk)
+                    if sniffer.verdict is False:
+                        return r.status_code, None, r.headers
+            return r.status_code, "".join(chunks), r.headers
+    except requests.RequestException:
+        return None, None, {}
@@ -0,0 +1,151 @@
+"""Lance de nombreux crawls (site × auteur ou rubrique) en parallèle sur un pool de processus.
+
+Chaque job tourne dans un processus neuf (métriques, session HTTP et Chromium
+à lui), avec son propre manifeste (`Site.key`) et sa période since/until.
+Requêtes simultanées, débit et pauses par hôte valent pour tous les processus
+confondus (`SharedHostSlots`), et un bilan agrégé est écrit à la fin.
+
+    python jobs.py jobs.json
+
+Format du fichier (JSON) :
+
+    {
+      "workers": 4,
+      "max_per_host": 4,
+      "jobs": [
+        {"site": "ledevoir", "since": "2020-01-01",
+         "args": {"slug": "jean-francois-lisee", "author": "Jean-François Lisée",
+                  "file_tag": "Lisee", "output_dir": "~/Desktop/chroniques_lisee"},
+         "options": {"http_workers": 2, "incremental": true}},
+        {"site": "radiocanada",
+         "args": {"section": "info/analyses", "file_tag": "RadioCanada",
+                  "output_dir": "~/Desktop/analyses_rc"}}
+      ]
+    }
+
+`args` va à `make_site` du module du site (SITES), `options` à `Pipeline`.
+"""
+import argparse
+import asyncio
+import dataclasses
+import importlib
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from manifest import DATA_DIR
+from metrics import METRICS
+from pipeline import SITES, Pipeline
+from rate_limit import SharedHostSlots
+from selector_cache import SELECTORS
+
+JOBS_DIR = DATA_DIR / "jobs"
+WORKERS = 4
+MAX_PER_HOST = 4
+
+
+def build_site(spec):
+    """`Site` d'un job : `make_site(**args)` du module du site, puis job et période."""
+    args = dict(spec["args"])
+    args["output_dir"] = Path(args["output_dir"]).expanduser()
+    site = importlib.import_module(SITES[spec["site"]]).make_site(**args)
+    job = spec.get("job") or args.get("slug") or args.get("section")
+    return dataclasses.replace(
+        site,
+        job=job.replace("/", "-") if job else None,
+        since=spec.get("since"),
+        until=spec.get("until"),
+    )
+
+
+def run_job(spec, host_slots):
+    """Exécute un job dans le processus courant ; sa sortie va dans JOBS_DIR/<key>.log."""
+    site = build_site(spec)
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = JOBS_DIR / f"{site.key}.log"
+    start = time.perf_counter()
+    error = None
+    written = 0
+    with open(log_path, "w", encoding="utf-8") as log, redirect_stdout(log):
+        options = {"headless": True, **spec.get("options", {})}
+        pipeline = Pipeline(site, host_slots=host_slots, **options)
+        print(f"🚀 {site.key} — {site.author or site.file_tag}")
+        try:
+            written = asyncio.run(pipeline.run())
+        except Exception as e:  # un job en échec n'arrête pas les autres
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ {error}")
+        print("\n".join(s for s in (pipeline.manifest.summary(), SELECTORS.summary(),
+                                      pipeline.limiter.summary(), METRICS.summary()) if s))
+        counts = pipeline.manifest.counts()
+    return {
+        "key": site.key,
+        "written": written,
+        "states": counts,
+        "pages": METRICS.total("pages_fetched"),
+        "bytes": METRICS.total("bytes"),
+        "seconds": round(time.perf_counter() - start, 1),
+        "error": error,
+        "log": str(log_path),
+    }
+
+
+def run_jobs(specs, workers=WORKERS, max_per_host=MAX_PER_HOST):
+    """Exécute les jobs sur `workers` processus et retourne leurs bilans."""
+    results = []
+    with multiprocessing.Manager() as manager:
+        host_slots = SharedHostSlots(manager, max_per_host)
+        # Un processus neuf par job : METRICS et les singletons ne se mélangent pas
+        with ProcessPoolExecutor(workers, max_tasks_per_child=1) as pool:
+            futures = {pool.submit(run_job, spec, host_slots): spec for spec in specs}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    spec = futures[future]
+                    result = {"key": f"{spec['site']} {spec.get('args')}", "written": 0,
+                              "error": f"{type(e).__name__}: {e}"}
+                results.append(result)
+                status = f"❌ {result['error']}" if result.get("error") else f"✅ {result['written']} articles"
+                print(f"{status} — {result['key']} ({len(results)}/{len(specs)})")
+    return results
+
+
+def report(results, elapsed):
+    lines = [f"{'job':<40} {'écrits':>7} {'pages':>7} {'Mo':>7} {'s':>7}"]
+    for r in sorted(results, key=lambda r: r["key"]):
+        lines.append(f"{r['key']:<40} {r['written']:>7} {r.get('pages', 0):>7} "
+                     f"{r.get('bytes', 0) / 1e6:>7.1f} {r.get('seconds', 0):>7}")
+    lines.append(f"📊 {sum(r['written'] for r in results)} articles, "
+                 f"{sum(r.get('pages', 0) for r in results)} pages, {len(results)} jobs en {elapsed:.0f}s"
+                 f" ({sum(1 for r in results if r.get('error'))} en échec)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("config", type=Path, help="fichier JSON des jobs")
+    parser.add_argument("--workers", type=int, help="processus simultanés (sinon celui du fichier)")
+    args = parser.parse_args(argv)
+    config = json.loads(args.config.read_text(encoding="utf-8"))
+    unknown = {spec["site"] for spec in config["jobs"]} - set(SITES)
+    if unknown:
+        sys.exit(f"Sites inconnus : {', '.join(sorted(unknown))} (connus : {', '.join(sorted(SITES))})")
+    start = time.perf_counter()
+    results = run_jobs(config["jobs"], args.workers or config.get("workers", WORKERS),
+                       config.get("max_per_host", MAX_PER_HOST))
+    elapsed = time.perf_counter() - start
+    print(report(results, elapsed))
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    path = JOBS_DIR / "report.json"
+    path.write_text(json.dumps({"seconds": round(elapsed, 1), "jobs": results}, ensure_ascii=False, indent=2),
+                    encoding="utf-8")
+    print(f"📁 Bilan : {path}")
+
+
+if __name__ == "__main__":
+    main()
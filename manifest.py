@@ -0,0 +1,182 @@
+"""Manifeste de crawl persistant (SQLite) : l'état de chaque URL survit aux plantages.
+
+Une URL passe par discovered → fetched → extracted → written, ou finit en
+failed (réessayée jusqu'à MAX_ATTEMPTS) ou skipped (écartée volontairement :
+pas le bon auteur, doublon). À la reprise, les URL written/skipped sont
+ignorées sans aucun accès réseau, et la pagination n'est pas refaite si elle
+avait été menée à terme.
+
+Le filigrane d'un site (date et URL de l'article écrit le plus récent) permet
+une passe incrémentale : la pagination s'arrête dès qu'elle ne montre plus
+que des articles antérieurs. Les validateurs (ETag, Last-Modified, dateModified)
+des articles écrits servent à les revalider sans les retélécharger.
+"""
+import sqlite3
+import time
+from pathlib import Path
+
+DATA_DIR = Path("~/.cnmc").expanduser()
+MANIFEST_PATH = DATA_DIR / "manifest.sqlite"
+
+STATES = ("discovered", "fetched", "extracted", "written", "failed", "skipped")
+DONE_STATES = ("written", "skipped")
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url         TEXT PRIMARY KEY,
+    site        TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    output_path TEXT,
+    error       TEXT,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_site_state ON urls (site, state);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    site       TEXT PRIMARY KEY,
+    date       TEXT NOT NULL,    -- YYYY-MM-DD
+    url        TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS validators (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    modified      TEXT,    -- dateModified publié par la page
+    checked_at    REAL NOT NULL
+);
+"""
+
+
+class Manifest:
+    """État des URL d'un site, stocké dans une base SQLite locale."""
+
+    def __init__(self, site, path=MANIFEST_PATH):
+        self.site = site
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def discover(self, urls):
+        """Ajoute les URL inconnues et retourne celles qui étaient nouvelles.
+
+        Les URL déjà suivies gardent leur état.
+        """
+        now = time.time()
+        new = []
+        with self.db:
+            for url in urls:
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO urls (url, site, state, updated_at) VALUES (?, ?, 'discovered', ?)",
+                    (url, self.site, now),
+                )
+                if cur.rowcount:
+                    new.append(url)
+        return new
+
+    def start(self, url):
+        """Compte une tentative de téléchargement."""
+        with self.db:
+            self.db.execute(
+                "UPDATE urls SET attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+
+    def mark(self, url, state, output_path=None, error=None):
+        """Change l'état de `url` ; une URL écrite repart de zéro tentative (revalidations suivantes)."""
+        if state not in STATES:
+            raise ValueError(f"État inconnu : {state}")
+        with self.db:
+            self.db.execute(
+                "UPDATE urls SET state = ?, output_path = COALESCE(?, output_path), error = ?, updated_at = ?, "
+                "attempts = CASE WHEN ? = 'written' THEN 0 ELSE attempts END WHERE url = ?",
+                (state, None if output_path is None else str(output_path), error, time.time(), state, url),
+            )
+
+    def attempts(self, url):
+        row = self.db.execute("SELECT attempts FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def state(self, url):
+        row = self.db.execute("SELECT state FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def output_path(self, url):
+        row = self.db.execute("SELECT output_path FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def written(self):
+        """URL écrites pour ce site, à revalider."""
+        rows = self.db.execute("SELECT url FROM urls WHERE site = ? AND state = 'written' ORDER BY url",
+                               (self.site,))
+        return [url for (url,) in rows]
+
+    def validators(self, url):
+        """(etag, last_modified, modified) de la dernière copie de `url`, ou (None, None, None)."""
+        row = self.db.execute("SELECT etag, last_modified, modified FROM validators WHERE url = ?",
+                              (url,)).fetchone()
+        return row or (None, None, None)
+
+    def save_validators(self, url, etag=None, last_modified=None, modified=None):
+        """Retient les validateurs connus ; ceux laissés à None gardent leur valeur."""
+        with self.db:
+            self.db.execute(
+                "INSERT INTO validators (url, etag, last_modified, modified, checked_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET etag = COALESCE(excluded.etag, etag), "
+                "last_modified = COALESCE(excluded.last_modified, last_modified), "
+                "modified = COALESCE(excluded.modified, modified), checked_at = excluded.checked_at",
+                (url, etag, last_modified, modified, time.time()),
+            )
+
+    def pending(self):
+        """URL à (re)télécharger : pas terminées et sous la limite de tentatives."""
+        rows = self.db.execute(
+            f"SELECT url FROM urls WHERE site = ? AND state NOT IN {DONE_STATES} AND attempts < ? ORDER BY url",
+            (self.site, MAX_ATTEMPTS),
+        )
+        return [url for (url,) in rows]
+
+    def counts(self):
+        rows = self.db.execute("SELECT state, COUNT(*) FROM urls WHERE site = ? GROUP BY state", (self.site,))
+        return dict(rows.fetchall())
+
+    def discovery_complete(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (f"discovery:{self.site}",)).fetchone()
+        return row is not None
+
+    def complete_discovery(self):
+        """Note que la pagination est allée jusqu'au bout pour ce site."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"discovery:{self.site}", str(time.time())),
+            )
+
+    def watermark(self):
+        """(date, URL) de l'article écrit le plus récent pour ce site, ou None."""
+        return self.db.execute("SELECT date, url FROM watermarks WHERE site = ?", (self.site,)).fetchone()
+
+    def raise_watermark(self, date, url):
+        """Avance le filigrane si `date` est plus récente ; les dates inconnues (0000-00-00) sont ignorées."""
+        if not date or date.startswith("0000"):
+            return
+        with self.db:
+            self.db.execute(
+                "INSERT INTO watermarks (site, date, url, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (site) DO UPDATE SET date = excluded.date, url = excluded.url, "
+                "updated_at = excluded.updated_at WHERE excluded.date > watermarks.date",
+                (self.site, date, url, time.time()),
+            )
+
+    def summary(self):
+        counts = self.counts()
+        return f"🗂️ {self.site}: " + ", ".join(f"{counts.get(s, 0)} {s}" for s in STATES)
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,118 @@
+"""Métadonnées d'article publiées par la page : JSON-LD `NewsArticle`, OpenGraph et `<meta>`.
+
+Une seule lecture donne titre, auteur, dates et souvent le texte complet
+(`articleBody`) ; extraction.py ne parcourt ses cascades de sélecteurs que
+pour ce qui manque.
+"""
+import json
+
+# Types schema.org d'un article de presse
+ARTICLE_TYPES = {
+    "NewsArticle", "Article", "ReportageNewsArticle", "OpinionNewsArticle", "AnalysisNewsArticle",
+    "BackgroundNewsArticle", "ReviewNewsArticle", "BlogPosting", "Report",
+}
+
+# Nom de <meta> (property, name ou itemprop) → champ, du plus sûr au moins sûr
+META_FIELDS = {
+    "og:title": "title",
+    "twitter:title": "title",
+    "article:published_time": "published",
+    "datepublished": "published",
+    "dc.date": "published",
+    "article:modified_time": "modified",
+    "og:updated_time": "modified",
+    "datemodified": "modified",
+    "last-modified": "modified",
+    "author": "author",
+    "article:author": "author",
+    "dc.creator": "author",
+}
+
+
+def _types(node):
+    kind = node.get("@type")
+    return set(kind) if isinstance(kind, list) else {kind}
+
+
+def _articles(data):
+    """Objets JSON-LD de type article, y compris dans les listes et `@graph`."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _articles(item)
+    elif isinstance(data, dict):
+        if _types(data) & ARTICLE_TYPES:
+            yield data
+        yield from _articles(data.get("@graph"))
+
+
+def _names(value):
+    """Nom(s) d'un champ `author` : chaîne, Person, ou liste des deux."""
+    if isinstance(value, list):
+        names = [n for v in value for n in _names(v)]
+    elif isinstance(value, dict):
+        names = [value["name"]] if isinstance(value.get("name"), str) else []
+    elif isinstance(value, str):
+        names = [value]
+    else:
+        names = []
+    return [n.strip() for n in names if n.strip()]
+
+
+def _text(value):
+    return " ".join(value.split()) if isinstance(value, str) and value.strip() else None
+
+
+def from_parts(json_ld_texts, metas):
+    """Métadonnées à partir des textes des scripts JSON-LD et des paires (nom de <meta>, contenu).
+
+    Retourne un dict title / author / published / modified (dates telles que
+    publiées) / body (`articleBody` brut) ; chaque valeur peut valoir None.
+    """
+    found = {"title": None, "author": None, "published": None, "modified": None, "body": None}
+    for text in json_ld_texts:
+        try:
+            data = json.loads(text or "")
+        except ValueError:
+            continue
+        for article in _articles(data):
+            found["title"] = found["title"] or _text(article.get("headline"))
+            found["author"] = found["author"] or " / ".join(_names(article.get("author"))) or None
+            found["published"] = found["published"] or _text(article.get("datePublished"))
+            found["modified"] = found["modified"] or _text(article.get("dateModified"))
+            body = article.get("articleBody")
+            if isinstance(body, str) and body.strip():
+                found["body"] = found["body"] or body.strip()
+
+    # Les <meta> ne complètent que ce que le JSON-LD n'a pas donné
+    meta, rank = {}, {}
+    order = {name: i for i, name in enumerate(META_FIELDS)}
+    for name, content in metas:
+        name = (name or "").lower()
+        field = META_FIELDS.get(name)
+        if field and content and content.strip() and order[name] < rank.get(field, len(order)):
+            meta[field], rank[field] = content.strip(), order[name]
+    found["title"] = found["title"] or _text(meta.get("title"))
+    if not found["author"] and meta.get("author") and not meta["author"].startswith("http"):
+        found["author"] = meta["author"]
+    found["published"] = found["published"] or meta.get("published")
+    found["modified"] = found["modified"] or meta.get("modified")
+    return found
+
+
+def read_metadata(soup):
+    """Métadonnées d'une page déjà analysée par BeautifulSoup."""
+    scripts = [s.string for s in soup.find_all("script", type="application/ld+json")]
+    metas = [
+        (m.get("property") or m.get("name") or m.get("itemprop"), m.get("content"))
+        for m in soup.find_all("meta")
+    ]
+    return from_parts(scripts, metas)
+
+
+def body_paragraphs(body, min_len):
+    """Paragraphes d'un `articleBody` ; [] s'il n'est pas découpé en paragraphes (texte tronqué ou à plat)."""
+    if not body:
+        return []
+    paras = [" ".join(p.split()) for p in body.splitlines()]
+    paras = [p for p in paras if len(p) >= min_len]
+    return paras if len(paras) >= 2 else []
@@ -0,0 +1,186 @@
+"""Compteurs et histogrammes d'un crawl, communs à tous les scrapers.
+
+Les étages du pipeline, le blocage et les attentes y enregistrent ce qu'ils
+font ; `METRICS.write(...)` produit un instantané JSON et un fichier
+OpenMetrics (format texte Prometheus), et `trace_path` active une trace JSONL
+d'une ligne par opération chronométrée.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Bornes des histogrammes, en secondes
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    "pages_fetched": "Pages obtenues, par voie (http, browser) et type (listing, article)",
+    "bytes": "Octets reçus : corps HTTP, ou Content-Length des réponses vues par Chromium",
+    "requests_blocked": "Requêtes Chromium interrompues par blocking.py",
+    "retries": "Requêtes remises à plus tard après un ralentissement ou un délai dépassé",
+    "articles_written": "Articles écrits sur disque",
+    "articles_failed": "Articles abandonnés",
+    "articles_skipped": "Articles écartés volontairement, par raison",
+    "revalidations": "Articles déjà écrits revalidés, par issue (not_modified, unchanged, updated, skipped, failed)",
+    "feeds": "Flux XHR appris ou non sur les pages à défilement",
+    "feed_pages": "Pages de flux XHR lues en HTTP",
+    "boilerplate_paragraphs": "Paragraphes de gabarit retirés des articles (boilerplate.py)",
+    "boilerplate_bytes": "Octets de gabarit retirés des articles",
+    "selectors": "Cascades de sélecteurs, par champ et issue (hit : gagnant appris, miss, cold, none)",
+    "metadata": "Articles extraits, selon la part tirée du JSON-LD / OpenGraph (complete, partial, none)",
+    "http_seconds": "Durée d'un GET HTTP",
+    "navigation_seconds": "Durée de page.goto dans Chromium",
+    "readiness_seconds": "Durée des attentes de readiness.py",
+    "extract_seconds": "Durée de l'extraction d'un article",
+    "write_seconds": "Durée de l'écriture d'un article",
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q):
+        """Borne supérieure du seau qui contient le quantile `q` (None au-delà du dernier)."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (None,), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+
+class Metrics:
+    """Compteurs et histogrammes étiquetés ; sûrs depuis les threads d'extraction."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.trace_path = None
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[_key(labels)] = series.get(_key(labels), 0) + value
+
+    def observe(self, name, seconds, **labels):
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            series.setdefault(_key(labels), Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, name, url=None, **labels):
+        """Chronomètre le bloc dans l'histogramme `name` ; l'ajoute à la trace si elle est active."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(name, elapsed, **labels)
+            if self.trace_path:
+                self.trace(name, elapsed, url, **labels)
+
+    def trace(self, name, seconds, url=None, **labels):
+        line = json.dumps({"t": time.time(), "span": name, "seconds": round(seconds, 4), "url": url, **labels},
+                          ensure_ascii=False)
+        with self.lock, open(self.trace_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def total(self, name, **labels):
+        """Somme du compteur `name` sur les séries dont les étiquettes contiennent `labels`."""
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(v for k, v in self.counters.get(name, {}).items() if wanted <= set(k))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed_s": time.time() - self.started,
+                "counters": {
+                    name: [{"labels": dict(k), "value": v} for k, v in sorted(series.items())]
+                    for name, series in sorted(self.counters.items())
+                },
+                "histograms": {
+                    name: [
+                        {"labels": dict(k), "count": h.count, "sum": h.sum,
+                         "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                         "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts))}
+                        for k, h in sorted(series.items())
+                    ]
+                    for name, series in sorted(self.histograms.items())
+                },
+            }
+
+    def openmetrics(self):
+        """Texte au format OpenMetrics : `cnmc_<nom>_total` et `cnmc_<nom>_bucket`."""
+
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE cnmc_{name} counter")
+                lines.append(f"# HELP cnmc_{name} {HELP.get(name, name)}")
+                for k, v in sorted(series.items()):
+                    lines.append(f"cnmc_{name}_total{fmt(k)} {v}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE cnmc_{name} histogram")
+                lines.append(f"# HELP cnmc_{name} {HELP.get(name, name)}")
+                for k, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts):
+                        cumulative += n
+                        lines.append(f"cnmc_{name}_bucket{fmt(k, [('le', bound)])} {cumulative}")
+                    lines.append(f"cnmc_{name}_count{fmt(k)} {h.count}")
+                    lines.append(f"cnmc_{name}_sum{fmt(k)} {h.sum:.6f}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Écrit `path`.json et `path`.prom (remplacés d'un coup, lisibles en cours de crawl)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for suffix, text in ((".json", json.dumps(self.snapshot(), indent=2, ensure_ascii=False)),
+                             (".prom", self.openmetrics())):
+            tmp = path.with_suffix(suffix + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            tmp.replace(path.with_suffix(suffix))
+
+    def summary(self):
+        lines = []
+        for name, series in sorted(self.snapshot()["histograms"].items()):
+            for s in series:
+                where = "/".join(str(v) for v in s["labels"].values())
+                p50, p95 = s["p50"], s["p95"]
+                lines.append(
+                    f"📊 {name} {where}: {s['count']} mesures, moyenne {s['sum'] / s['count']:.2f}s, "
+                    f"p50 ≤ {p50 if p50 is not None else '∞'}s, p95 ≤ {p95 if p95 is not None else '∞'}s"
+                )
+        return "\n".join(lines)
+
+
+METRICS = Metrics()
@@ -0,0 +1,53 @@
+"""Pool de pages Playwright réutilisables pour télécharger les articles en parallèle."""
+import asyncio
+from contextlib import asynccontextmanager
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/114.0.0.0 Safari/537.36"
+)
+
+
+class PagePool:
+    """N contextes isolés, chacun avec une page réutilisée d'un article à l'autre."""
+
+    def __init__(self, browser, size, setup_context=None):
+        self.browser = browser
+        self.size = size
+        self.setup_context = setup_context
+        self._idle = asyncio.Queue()
+        self._contexts = []
+
+    async def start(self):
+        for _ in range(self.size):
+            context = await self.browser.new_context(user_agent=USER_AGENT)
+            if self.setup_context:
+                await self.setup_context(context)
+            self._contexts.append(context)
+            await self._idle.put(await context.new_page())
+
+    async def acquire(self):
+        return await self._idle.get()
+
+    async def release(self, page):
+        if not self.browser.is_connected():
+            return  # navigateur perdu : le pool sera reconstruit
+        # Une page plantée ou fermée est remplacée pour garder le pool plein
+        if page.is_closed():
+            page = await page.context.new_page()
+        await self._idle.put(page)
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            await self.release(page)
+
+    async def close(self):
+        if not self.browser.is_connected():
+            return
+        for context in self._contexts:
+            await context.close()
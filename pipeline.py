@@ -0,0 +1,963 @@
+"""Pipeline découverte → récupération → extraction → écriture, commun à tous les sites.
+
+Chaque étage tourne en parallèle des autres et leur communique le travail par
+des files bornées : le téléchargement commence dès la première page de liste,
+et une étape lente freine les précédentes au lieu d'accumuler du HTML en
+mémoire. Un script de site se résume à une définition `Site` passée à `run_site`.
+
+    liste ──► fetch_q ──► [HTTP] ──► extract_q ──► [extraction] ──► write_q ──► [écriture]
+                                        ▲               │
+                                        └── [Chromium] ◄┘ render_q (page vide en HTTP)
+"""
+import asyncio
+import importlib
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+from blocking import STATS as BLOCK_STATS, install_blocking
+from boilerplate import BoilerplateIndex
+from corpus import CORPUS_PATH, Corpus, write_txt
+from dedup import DuplicateIndex, exact_hash
+from extraction import PARSER, RULES, extract_from_soup, looks_js_only
+from feeds import REPLAYED_HEADERS, Capture, feed_links, learn_feed
+from frontier import Frontier, canonical_url, url_date
+from http_fetch import GONE_STATUSES, NOT_MODIFIED, PATH_STATS, conditional_headers, fetch_html, stream_html
+from manifest import DATA_DIR, MANIFEST_PATH, MAX_ATTEMPTS, Manifest
+from metrics import METRICS
+from page_pool import PagePool
+from rate_limit import THROTTLE_STATUSES, RateLimiter, Throttled, congested, parse_retry_after, retry_delay
+from readiness import STATS as READINESS_STATS, async_scroll_until_stable, async_wait_until_ready
+from selector_cache import SELECTORS
+from sitemaps import walk as walk_sitemaps
+from snapshots import SNAPSHOTS_DIR, SnapshotArchive
+
+# Nombre d'erreurs de suite sur les pages de liste avant d'abandonner la pagination
+MAX_LISTING_ERRORS = 3
+# Garde-fou pour un flux XHR qui ne finirait jamais
+MAX_FEED_PAGES = 500
+# URL de sitemap transmises ensemble à la frontière
+SITEMAP_BATCH = 200
+
+# Nom de site → module qui définit son `SITE`
+SITES = {
+    "jdm": "les_chroniques_bock_cote",
+    "ledevoir": "test_ledevoir",
+    "lapresse": "Lapresse_lagace",
+    "radiocanada": "RQ",
+}
+
+METRICS_DIR = DATA_DIR / "metrics"
+PROGRESS_EVERY = 30  # s entre deux lignes de progression / écritures des métriques
+
+
+def links_matching(predicate):
+    """`find_links` par défaut : tous les `a[href]` absolus qui satisfont `predicate`."""
+
+    def find_links(soup, page_url):
+        links = (urljoin(page_url, a["href"]) for a in soup.select("a[href]"))
+        return [href for href in links if predicate(href)]
+
+    return find_links
+
+
+@dataclass
+class Site:
+    """Ce qui distingue un site : ses pages de liste, ses liens, son auteur."""
+
+    name: str                             # clé des règles dans extraction/readiness/blocking
+    author: Optional[str]                 # None : pas de ligne AUTEUR (rubrique multi-auteurs)
+    file_tag: str                         # ex. « BockCote » dans 2020-01-06_BockCote_….txt
+    output_dir: Path
+    listing_url: Callable[[int], str]     # numéro de page → URL de la liste
+    find_links: Callable                  # (soup, page_url) → URL d'articles
+    first_page: int = 1
+    max_pages: int = 100
+    listing_via: str = "browser"          # "http" ou "browser"
+    # Pages de liste lues en parallèle ; au-delà de 1, la fin de l'archive est d'abord sondée
+    listing_window: int = 1
+    # Pages à défilement infini lues après la pagination, avec leur propre filtre
+    scroll_pages: list = field(default_factory=list)
+    scroll_find_links: Optional[Callable] = None
+    # Pages à défilement : apprendre leur flux XHR et le parcourir en HTTP jusqu'à `feed_cutoff`
+    scroll_feeds: bool = False
+    feed_cutoff: Optional[str] = None    # YYYY-MM-DD ; None : jusqu'au bout du flux
+    # Sitemaps lus avant la pagination : sites (robots.txt) ou URL de sitemaps, filtre d'URL
+    sitemaps: list = field(default_factory=list)
+    sitemap_filter: Optional[Callable] = None  # url → bool
+    sitemap_since: Optional[str] = None        # YYYY-MM-DD
+    # (soup, url, article) → raison du rejet, ou None si l'article est gardé
+    reject: Optional[Callable] = None
+    # url → analyseur incrémental du HTTP reçu (`feed`, `verdict`, `reason`), ou None pour
+    # ne pas filtrer : un verdict False écarte l'article sans finir de le télécharger
+    sniff: Optional[Callable] = None
+    # Extraction sur la page rendue (coroutine page → article), sinon règles d'extraction.py
+    extract_page: Optional[Callable] = None
+    # Auteur ou rubrique parmi d'autres du même site (jobs.py) : manifeste et métriques à part
+    job: Optional[str] = None
+    # Période voulue (YYYY-MM-DD) : les articles datés hors période sont écartés
+    since: Optional[str] = None
+    until: Optional[str] = None
+
+    @property
+    def key(self):
+        """Identifiant du crawl : `name`, ou `name-job` pour un job parmi d'autres du même site."""
+        return self.name if self.job is None else f"{self.name}-{self.job}"
+
+
+def load_site(name):
+    return importlib.import_module(SITES[name]).SITE
+
+
+def write_article(site, url, article):
+    """Écrit l'article au format de notes_projet_CNMC.md et retourne son chemin."""
+    return write_txt(site.output_dir, site.file_tag, site.author, url, article)
+
+
+def extract_html(site, url, html, article=None):
+    """Article d'une page et raison de son rejet, selon les règles de `site`.
+
+    `article` est celui déjà extrait sur la page rendue, s'il y en a un.
+    Retourne (None, None) si la page est vide ou exige JavaScript.
+    """
+    soup = BeautifulSoup(html, PARSER)
+    if article is None:
+        if looks_js_only(soup):
+            return None, None
+        article = extract_from_soup(soup, site.name, url)
+        if article is None:
+            return None, None
+    date = article["date"]
+    if not date.startswith("0000") and ((site.since and date < site.since) or (site.until and date > site.until)):
+        return article, "Hors période"
+    if site.reject:
+        reason = site.reject(soup, url, article)
+        if reason:
+            return article, reason
+    return article, None
+
+
+class Pipeline:
+    """Un crawl d'un site, de la première page de liste au dernier fichier écrit."""
+
+    def __init__(self, site, http_workers=4, browser_workers=2, extract_workers=2,
+                 max_per_host=4, queue_size=8, http_first=True, block_resources=False,
+                 resume=True, incremental=False, refresh=False, headless=True, browser_url=None,
+                 host_slots=None, strip_boilerplate=True, manifest_path=MANIFEST_PATH,
+                 metrics_dir=METRICS_DIR, trace=False, progress_every=PROGRESS_EVERY,
+                 snapshots_dir=SNAPSHOTS_DIR, corpus_path=CORPUS_PATH):
+        self.site = site
+        self.http_workers = http_workers
+        self.browser_workers = browser_workers
+        self.extract_workers = extract_workers
+        self.http_first = http_first
+        self.block_resources = block_resources
+        self.resume = resume
+        # Passe quotidienne : pagination arrêtée aux articles déjà connus ou antérieurs au filigrane
+        self.incremental = incremental
+        self.watermark = None
+        # Revalidation : GET conditionnel des articles déjà écrits, réécrits seulement s'ils ont changé
+        self.refresh = refresh
+        # URL déjà écrites remises en file par `refresh` : un échec ne les fait jamais redescendre
+        self.revalidating = set()
+        # URL → (ETag, Last-Modified) de la dernière réponse, en attente de l'écriture
+        self.fetched_validators = {}
+        self.headless = headless
+        # Chromium partagé de browser_server.py ; None : Chromium lancé et arrêté par ce pipeline
+        self.browser_url = browser_url
+        self.shared_browser = False
+        # <metrics_dir>/<site>.json et .prom, réécrits toutes les `progress_every` s
+        self.metrics_path = Path(metrics_dir) / site.key
+        self.progress_every = progress_every
+        if trace:
+            Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+            METRICS.trace_path = Path(metrics_dir) / f"{site.key}.trace.jsonl"
+
+        self.manifest = Manifest(site.key, manifest_path)
+        # Clés des articles déjà découverts, tous sites confondus : un doublon n'est jamais récupéré
+        self.frontier = Frontier(self.manifest.db, site.key)
+        # Empreintes des articles écrits : un même texte n'est jamais écrit deux fois
+        self.duplicates = DuplicateIndex(self.manifest.db)
+        # Fréquence des paragraphes du site : ceux répétés d'article en article sont retirés ; None : texte entier
+        self.boilerplate = BoilerplateIndex(self.manifest.db, site.name) if strip_boilerplate else None
+        # Corpus SQLite/FTS5 rempli en parallèle des .txt ; None : .txt seulement
+        self.corpus = Corpus(corpus_path) if corpus_path else None
+        # Pages d'articles brutes, pour ré-extraire hors ligne (reextract.py) ; None : pas d'archive
+        self.snapshots = SnapshotArchive(site.name, snapshots_dir) if snapshots_dir else None
+        # Débit adaptatif et concurrence par hôte, pour HTTP comme pour Chromium ;
+        # `host_slots` (SharedHostSlots) : concurrence, débit et pauses communs à plusieurs processus
+        self.limiter = RateLimiter(max_per_host, shared=host_slots)
+        # Files bornées : c'est ce qui garde la mémoire plate
+        self.fetch_q = asyncio.Queue(maxsize=queue_size)
+        self.extract_q = asyncio.Queue(maxsize=queue_size)
+        self.write_q = asyncio.Queue(maxsize=queue_size)
+        # Non bornée pour éviter un interblocage extraction ↔ Chromium ; ne contient que des URL
+        self.render_q = asyncio.Queue()
+        # URL entrées dans le pipeline et pas encore écrites, écartées ou abandonnées
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.retry_tasks = set()
+        # Page de liste → tâche qui la lit : une page sondée n'est jamais relue
+        self.listing_tasks = {}
+        self.listing_slots = asyncio.Semaphore(site.listing_window)
+
+        self._playwright = None
+        self._browser = None
+        self._pool = None
+        self._browser_lock = asyncio.Lock()
+        self.written = 0
+
+    # --- Chromium, démarré seulement si un étage en a besoin ----------------
+
+    async def pages(self):
+        async with self._browser_lock:
+            if self._pool is not None and not self._browser.is_connected():
+                # Le Chromium partagé a été recyclé : nouveaux contextes sur le nouveau processus
+                print("♻️ Chromium partagé relancé : reconnexion")
+                self._pool = None
+            if self._pool is None:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self.launch_browser()
+                self._pool = PagePool(self._browser, self.browser_workers, self.setup_context)
+                await self._pool.start()
+        return self._pool
+
+    async def launch_browser(self):
+        if self.browser_url:
+            try:
+                browser = await self._playwright.chromium.connect_over_cdp(self.browser_url)
+                self.shared_browser = True
+                print(f"🔌 Chromium partagé : {self.browser_url}")
+                return browser
+            except Exception as e:
+                print(f"⚠️ Chromium partagé injoignable ({e}) : lancement local")
+        self.shared_browser = False
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    def browser_lost(self):
+        return self._browser is not None and not self._browser.is_connected()
+
+    async def setup_context(self, context):
+        context.on("response", self.count_response)
+        if self.block_resources:
+            await install_blocking(context, self.site.name)
+
+    def count_response(self, response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            METRICS.inc("bytes", int(length), site=self.site.name, via="browser")
+
+    async def render(self, url, kind="article", scroll=False):
+        """HTML rendu de `url` une fois prêt, et l'article si le site l'extrait sur la page."""
+        pool = await self.pages()
+        async with self.limiter.slot(url), pool.page() as page:
+            try:
+                with METRICS.timer("navigation_seconds", url, site=self.site.name, kind=kind):
+                    response = await page.goto(url, timeout=60000)
+            except PlaywrightTimeoutError:
+                self.limiter.throttle(url)
+                raise
+            if response and response.status in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                self.limiter.throttle(url, retry_after)
+                raise Throttled(response.status, retry_after)
+            if response and congested(response.status):
+                self.limiter.throttle(url)
+            else:
+                self.limiter.success(url)
+            METRICS.inc("pages_fetched", site=self.site.name, via="browser", kind=kind)
+            await async_wait_until_ready(page, self.site.name, kind)
+            if scroll:
+                await async_scroll_until_stable(page, self.site.name)
+            article = await self.site.extract_page(page) if self.site.extract_page and kind == "article" else None
+            html = await page.content()
+        if kind == "article":
+            await self.archive(url, html, "browser", response.status if response else None,
+                               response.headers if response else None)
+        return html, article
+
+    # --- Étage 1 : découverte ----------------------------------------------
+
+    async def get_html(self, url, kind="article", sniffer=None, headers=None):
+        """GET HTTP sous le limiteur ; (status, html) après avoir informé le limiteur.
+
+        Avec `sniffer`, la réponse est lue en flux et abandonnée dès qu'il l'écarte.
+        `headers` s'ajoutent à ceux de la session (flux XHR).
+        """
+        request_headers = headers
+        async with self.limiter.slot(url):
+            with METRICS.timer("http_seconds", url, site=self.site.name, kind=kind):
+                if sniffer is None:
+                    status, html, headers = await asyncio.to_thread(fetch_html, url, headers=request_headers)
+                else:
+                    status, html, headers = await asyncio.to_thread(stream_html, url, sniffer)
+        if status is None or status in THROTTLE_STATUSES:
+            retry_after = parse_retry_after(headers.get("retry-after"))
+            self.limiter.throttle(url, retry_after)
+            raise Throttled(status, retry_after)
+        if congested(status):
+            # Erreur serveur hors surcharge (500…) : pas de nouvel essai ici, mais le débit baisse
+            self.limiter.throttle(url)
+        else:
+            self.limiter.success(url)
+        METRICS.inc("pages_fetched", site=self.site.name, via="http", kind=kind)
+        if html is not None:
+            METRICS.inc("bytes", len(html.encode("utf-8")), site=self.site.name, via="http")
+            if kind == "article":
+                await self.archive(url, html, "http", status, headers)
+                if headers.get("etag") or headers.get("last-modified"):
+                    # Retenus à l'écriture seulement : un article pas réécrit ne doit pas valoir un 304
+                    self.fetched_validators[url] = (headers.get("etag"), headers.get("last-modified"))
+        return status, html
+
+    async def archive(self, url, html, via, status, headers):
+        # Pas `if self.snapshots` : une archive encore vide a une longueur nulle
+        if self.snapshots is not None:
+            await asyncio.to_thread(self.snapshots.save, url, html, via, status, headers)
+
+    async def listing_links(self, url, find_links, scroll=False):
+        """Liens d'une page de liste ; réessaie après un ralentissement demandé."""
+        for attempt in range(MAX_LISTING_ERRORS):
+            try:
+                if self.site.listing_via == "http" and not scroll:
+                    status, html = await self.get_html(url, "listing")
+                    if html is None:
+                        raise RuntimeError(f"HTTP {status}")
+                else:
+                    html, _ = await self.render(url, "listing", scroll)
+                break
+            except (Throttled, PlaywrightTimeoutError) as e:
+                if attempt == MAX_LISTING_ERRORS - 1:
+                    raise
+                delay = retry_delay(attempt, getattr(e, "retry_after", None))
+                METRICS.inc("retries", site=self.site.name, kind="listing")
+                print(f"🐢 {e} — nouvel essai dans {delay:.0f}s")
+                await asyncio.sleep(delay)
+        soup = await asyncio.to_thread(BeautifulSoup, html, PARSER)
+        return find_links(soup, url)
+
+    async def enqueue(self, urls):
+        for url in urls:
+            self.in_flight += 1
+            self.idle.clear()
+            await self.fetch_q.put(url)
+
+    def listing_page(self, n):
+        """Tâche qui lit la page de liste `n` (liens dédoublonnés), lancée une seule fois."""
+        if n not in self.listing_tasks:
+            self.listing_tasks[n] = asyncio.ensure_future(self.read_listing(n))
+        return self.listing_tasks[n]
+
+    async def read_listing(self, n):
+        async with self.listing_slots:
+            url = self.site.listing_url(n)
+            print(f"📄 Page {n} : {url}")
+            links = await self.listing_links(url, self.site.find_links)
+        return list(dict.fromkeys(canonical_url(link) for link in links))
+
+    async def find_last_page(self):
+        """Dernière page de liste non vide : sondes exponentielles lancées ensemble, puis dichotomie.
+
+        Une page sans lien, en erreur HTTP (404 hors archive), ou qui ne fait que
+        répéter la première (certains sites y renvoient les numéros hors archive),
+        est au-delà de la fin.
+        """
+        first = self.site.first_page
+        last = first + self.site.max_pages - 1
+        probes = {min(first + 2 ** k, last) for k in range(self.site.max_pages.bit_length())} | {last}
+        probes = sorted(n for n in probes if n > first)
+        for n in probes:
+            self.listing_page(n)
+        first_links = set(await self.listing_page(first))
+        if not first_links:
+            return first
+
+        async def exists(n):
+            try:
+                links = await self.listing_page(n)
+            except RuntimeError:
+                return False
+            return bool(links) and not set(links) <= first_links
+
+        lo, hi = first, None
+        for n in probes:
+            if not await exists(n):
+                hi = n
+                break
+            lo = n
+        if hi is None:
+            return lo
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if await exists(mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    async def paginate(self, last):
+        """Pages first..last dans l'ordre, `listing_window` à la fois ; s'arrête à la première sans nouveau lien."""
+        site = self.site
+        seen = set()
+        errors = 0
+        for n in range(site.first_page, last + 1):
+            # Les pages suivantes se téléchargent pendant qu'on traite celle-ci
+            for ahead in range(n, min(n + site.listing_window, last + 1)):
+                self.listing_page(ahead)
+            try:
+                links = await self.listing_page(n)
+            except Exception as e:
+                errors += 1
+                print(f"❌ Erreur page {n} : {e}")
+                if errors >= MAX_LISTING_ERRORS:
+                    break
+                continue
+            errors = 0
+            new_links = [link for link in links if link not in seen]
+            print(f"🔗 Nouveaux liens trouvés : {len(new_links)}")
+            if not new_links:
+                print("✅ Plus de nouveaux articles. Fin de la pagination.")
+                break
+            seen.update(new_links)
+            caught_up = self.caught_up(links)
+            await self.enqueue(self.manifest.discover(self.frontier.admit(new_links)))
+            if caught_up:
+                print("🔖 Rien de plus récent à chercher. Fin de la pagination.")
+                break
+
+    async def capture_feeds(self, url):
+        """Défile `url` une fois dans Chromium ; (HTML rendu, réponses XHR/fetch observées)."""
+        responses = []
+
+        def on_response(response):
+            if response.request.resource_type in ("xhr", "fetch") and response.ok:
+                responses.append(response)
+
+        pool = await self.pages()
+        async with self.limiter.slot(url), pool.page() as page:
+            page.on("response", on_response)
+            try:
+                with METRICS.timer("navigation_seconds", url, site=self.site.name, kind="listing"):
+                    await page.goto(url, timeout=60000)
+                self.limiter.success(url)
+                METRICS.inc("pages_fetched", site=self.site.name, via="browser", kind="listing")
+                await async_wait_until_ready(page, self.site.name, "listing")
+                await async_scroll_until_stable(page, self.site.name)
+                html = await page.content()
+                captures = []
+                for response in responses:
+                    try:
+                        body = await response.text()
+                    except Exception:
+                        continue    # corps déjà libéré (redirection, page fermée)
+                    request_headers = response.request.headers
+                    captures.append(Capture(
+                        response.url,
+                        {k: v for k, v in request_headers.items() if k.lower() in REPLAYED_HEADERS},
+                        response.headers.get("content-type", ""),
+                        body,
+                    ))
+            finally:
+                page.remove_listener("response", on_response)
+        return html, captures
+
+    async def discover_feed(self, url):
+        """Apprend le flux XHR de la page à défilement `url`, puis le parcourt en HTTP.
+
+        Le flux est lu jusqu'à `feed_cutoff`, jusqu'à une page sans lien d'article
+        nouveau ou jusqu'à MAX_FEED_PAGES. Sans flux reconnu, on garde les liens
+        du défilement lui-même, comme avant.
+        """
+        site = self.site
+        find_links = site.scroll_find_links or site.find_links
+        html, captures = await self.capture_feeds(url)
+        soup = await asyncio.to_thread(BeautifulSoup, html, PARSER)
+        await self.enqueue(self.manifest.discover(self.frontier.admit(find_links(soup, url))))
+        # Le flux s'apprend sur tous les liens d'articles, pas seulement ceux de l'auteur
+        feed = await asyncio.to_thread(learn_feed, captures, site.find_links)
+        if feed is None:
+            print(f"📜 Aucun flux reconnu parmi {len(captures)} réponses XHR : liens du défilement seulement")
+            METRICS.inc("feeds", site=site.name, outcome="none")
+            return
+        print(f"📡 Flux appris : {feed.template} (pas {feed.step})")
+        METRICS.inc("feeds", site=site.name, outcome="learned")
+
+        seen = set()
+        errors = 0
+        for n in range(MAX_FEED_PAGES):
+            feed_url = feed.url(n)
+            try:
+                status, body = await self.get_html(feed_url, "listing", headers=feed.headers)
+                if body is None:
+                    raise RuntimeError(f"HTTP {status}")
+            except Exception as e:
+                errors += 1
+                print(f"❌ Erreur flux {feed_url} : {e}")
+                if errors >= MAX_LISTING_ERRORS:
+                    break
+                await asyncio.sleep(retry_delay(errors - 1, getattr(e, "retry_after", None)))
+                continue
+            errors = 0
+            METRICS.inc("feed_pages", site=site.name)
+            links, dates = await asyncio.to_thread(feed_links, body, feed_url, site.find_links)
+            new_links = [link for link in dict.fromkeys(canonical_url(link) for link in links) if link not in seen]
+            if not new_links:
+                print("✅ Plus de nouveaux articles dans le flux.")
+                break
+            seen.update(new_links)
+            caught_up = self.caught_up(new_links)
+            wanted = new_links
+            if find_links is not site.find_links:
+                wanted, _ = await asyncio.to_thread(feed_links, body, feed_url, find_links)
+            await self.enqueue(self.manifest.discover(self.frontier.admit(wanted)))
+            if caught_up:
+                print("🔖 Rien de plus récent à chercher dans le flux : fin.")
+                break
+            cutoff = site.feed_cutoff or site.since
+            if cutoff and dates and max(dates) < cutoff:
+                print(f"✅ Flux antérieur au {cutoff} : fin.")
+                break
+
+    async def discover_sitemaps(self):
+        """Articles des sitemaps du site, lus en flux dans un thread et passés à la frontière par lots."""
+        site = self.site
+        since = site.sitemap_since or site.since
+        if self.incremental and self.watermark:
+            since = max(since or "", self.watermark[0])
+        loop = asyncio.get_running_loop()
+        batches = asyncio.Queue()
+
+        def on_sitemap(url, count):
+            METRICS.inc("pages_fetched", site=site.name, via="http", kind="sitemap")
+            print(f"🗺️ {url} : {count} articles")
+
+        def read():
+            batch = []
+            try:
+                for url in walk_sitemaps(site.sitemaps, site.sitemap_filter, since, site.until,
+                                         on_sitemap=on_sitemap):
+                    batch.append(url)
+                    if len(batch) >= SITEMAP_BATCH:
+                        loop.call_soon_threadsafe(batches.put_nowait, batch)
+                        batch = []
+            finally:
+                loop.call_soon_threadsafe(batches.put_nowait, batch)
+                loop.call_soon_threadsafe(batches.put_nowait, None)
+
+        reader = asyncio.ensure_future(asyncio.to_thread(read))
+        found = 0
+        while (batch := await batches.get()) is not None:
+            found += len(batch)
+            await self.enqueue(self.manifest.discover(self.frontier.admit(batch)))
+        await reader
+        print(f"🗺️ {found} articles dans les sitemaps" + (f" depuis le {since}" if since else ""))
+
+    def caught_up(self, links):
+        """Vrai si tous les `links` sont d'avant `since`, ou déjà connus / d'avant le filigrane en passe incrémentale."""
+        since = self.site.since
+        watermark = self.watermark[0] if self.incremental and self.watermark else None
+        if not links or not (self.incremental or since):
+            return False
+
+        def old(link):
+            if self.incremental and self.frontier.known(link):
+                return True
+            date = url_date(link)
+            return bool(date and ((since and date < since) or (watermark and date <= watermark)))
+
+        return all(old(link) for link in links)
+
+    async def discover(self):
+        site = self.site
+        # D'abord ce qu'un lancement précédent a laissé en plan
+        pending = self.manifest.pending()
+        if pending:
+            print(f"♻️ {len(pending)} articles en attente depuis le dernier lancement")
+        await self.enqueue(pending)
+
+        if self.refresh:
+            written = self.manifest.written()
+            print(f"🔄 Revalidation de {len(written)} articles déjà écrits")
+            self.revalidating.update(written)
+            await self.enqueue(written)
+            return
+
+        if self.incremental and not self.manifest.discovery_complete():
+            # Pagination jamais menée au bout (premier lancement, ou interrompu) : les
+            # articles connus ne disent rien de ceux d'après, on parcourt toute l'archive
+            print("🔖 Aucune pagination complète encore : parcours complet avant les passes incrémentales")
+            self.incremental = False
+        elif self.incremental:
+            self.watermark = self.manifest.watermark()
+            if self.watermark:
+                print(f"🔖 Passe incrémentale depuis le {self.watermark[0]} ({self.watermark[1]})")
+            else:
+                print("🔖 Passe incrémentale : arrêt aux articles déjà connus")
+        elif self.resume and self.manifest.discovery_complete():
+            print("♻️ Pagination déjà terminée lors d'un lancement précédent.")
+            return
+
+        if site.sitemaps:
+            try:
+                await self.discover_sitemaps()
+            except Exception as e:
+                print(f"❌ Sitemaps : {e}")
+
+        last = site.first_page + site.max_pages - 1
+        # Une passe incrémentale s'arrête dès les premières pages : inutile de sonder la fin
+        if site.listing_window > 1 and not self.incremental:
+            try:
+                last = await self.find_last_page()
+                print(f"🔭 Dernière page de liste : {last}")
+            except Exception as e:
+                # Sans borne connue, la fenêtre glissante et l'arrêt sur page vide suffisent
+                print(f"❌ Sondage de la fin de l'archive impossible : {e}")
+        try:
+            await self.paginate(last)
+        finally:
+            # Pages lues d'avance au-delà de la fin, ou sondes en cours
+            for task in self.listing_tasks.values():
+                task.cancel()
+            await asyncio.gather(*self.listing_tasks.values(), return_exceptions=True)
+
+        for url in site.scroll_pages:
+            print(f"📜 Défilement : {url}")
+            try:
+                if site.scroll_feeds:
+                    await self.discover_feed(url)
+                else:
+                    links = await self.listing_links(url, site.scroll_find_links or site.find_links, scroll=True)
+                    await self.enqueue(self.manifest.discover(self.frontier.admit(links)))
+            except Exception as e:
+                print(f"❌ Erreur {url} : {e}")
+
+        self.manifest.complete_discovery()
+
+    # --- Étage 2 : récupération --------------------------------------------
+
+    async def to_render(self, url):
+        await self.render_q.put(url)
+
+    async def fetch_worker(self):
+        while True:
+            url = await self.fetch_q.get()
+            try:
+                self.manifest.start(url)
+                if not self.http_first:
+                    await self.to_render(url)
+                    continue
+                if url in self.revalidating:
+                    # Article déjà validé : pas de renifleur, GET conditionnel
+                    sniffer = None
+                    etag, last_modified, _ = self.manifest.validators(url)
+                    status, html = await self.get_html(url, headers=conditional_headers(etag, last_modified))
+                else:
+                    sniffer = self.site.sniff(url) if self.site.sniff else None
+                    status, html = await self.get_html(url, sniffer=sniffer)
+                if status == NOT_MODIFIED:
+                    self.unchanged(url, "not_modified")
+                elif sniffer is not None and sniffer.verdict is False:
+                    print(f"⚠️ {sniffer.reason}, ignoré sans tout télécharger : {url}")
+                    self.skip(url, sniffer.reason)
+                elif status in GONE_STATUSES:
+                    print(f"⚠️ Page introuvable, ignorée : {url}")
+                    self.skip(url, f"HTTP {status}")
+                    PATH_STATS.record(self.site.name, "failed")
+                elif html is None:
+                    await self.to_render(url)
+                else:
+                    self.advance(url, "fetched")
+                    await self.extract_q.put((url, html, "http", None))
+            except Throttled as e:
+                self.retry(url, e, e.retry_after)
+            except Exception as e:
+                self.fail(url, e)
+            finally:
+                self.fetch_q.task_done()
+
+    async def render_worker(self):
+        while True:
+            url = await self.render_q.get()
+            try:
+                html, article = await self.render(url)
+                self.advance(url, "fetched")
+                await self.extract_q.put((url, html, "browser", article))
+            except Throttled as e:
+                self.retry(url, e, e.retry_after)
+            except PlaywrightTimeoutError as e:
+                self.retry(url, e)
+            except Exception as e:
+                if self.browser_lost():
+                    self.retry(url, e)
+                else:
+                    self.fail(url, e)
+            finally:
+                self.render_q.task_done()
+
+    # --- Étage 3 : extraction ----------------------------------------------
+
+    def extract(self, url, html, article):
+        """Exécuté dans un thread : l'analyse HTML ne bloque pas la boucle asyncio.
+
+        Retourne (article, raison du rejet) ; (None, None) si la page est vide.
+        Le gabarit est retiré et l'empreinte de contenu calculée ici aussi, hors de la boucle.
+        """
+        with METRICS.timer("extract_seconds", url, site=self.site.name):
+            article, reason = extract_html(self.site, url, html, article)
+            if article:
+                METRICS.inc("metadata", site=self.site.name, coverage=article.get("metadata", "none"))
+            if article and article["text"] and not reason:
+                if self.boilerplate:
+                    removed = self.boilerplate.strip(article, RULES[self.site.name]["sep"])
+                    if removed:
+                        METRICS.inc("boilerplate_paragraphs", len(removed), site=self.site.name)
+                        METRICS.inc("boilerplate_bytes", sum(len(p.encode("utf-8")) for p in removed),
+                                    site=self.site.name)
+                article["fingerprint"] = self.duplicates.fingerprint(article)
+            return article, reason
+
+    async def extract_worker(self):
+        while True:
+            url, html, via, article = await self.extract_q.get()
+            try:
+                article, reason = await asyncio.to_thread(self.extract, url, html, article)
+                if article is None or not article["text"]:
+                    if via == "http":
+                        await self.to_render(url)
+                    else:
+                        self.fail(url, "contenu vide")
+                elif reason:
+                    print(f"⚠️ {reason}, ignoré : {url}")
+                    self.skip(url, reason)
+                elif self.refresh and self.same_as_written(url, article):
+                    self.unchanged(url, "unchanged")
+                else:
+                    self.advance(url, "extracted")
+                    await self.write_q.put((url, article, via))
+            except Exception as e:
+                self.fail(url, e)
+            finally:
+                self.extract_q.task_done()
+
+    def same_as_written(self, url, article):
+        """Vrai si `url` a déjà été écrit avec ce texte, ou si sa dateModified n'a pas bougé.
+
+        Le gabarit retiré dépend des compteurs du moment : la comparaison porte
+        aussi sur le texte lu entier, pour qu'un paragraphe devenu gabarit depuis
+        l'écriture ne passe pas pour une mise à jour.
+        """
+        _, _, modified = self.manifest.validators(url)
+        if modified and article.get("modified") == modified:
+            return True
+        exact = self.duplicates.exact(url)
+        if exact is None:
+            return False
+        if exact == article["fingerprint"][0]:
+            return True
+        if not self.boilerplate:
+            return False
+        # Écrit avant que le gabarit soit retiré : le .txt contient le texte lu entier
+        full_text = article.get("full_text")
+        return (full_text is not None and exact == exact_hash(full_text)) or self.boilerplate.same(url, article)
+
+    # --- Étage 4 : écriture --------------------------------------------------
+
+    def write(self, url, article):
+        with METRICS.timer("write_seconds", url, site=self.site.name):
+            return write_article(self.site, url, article)
+
+    async def write_worker(self):
+        while True:
+            url, article, via = await self.write_q.get()
+            try:
+                # Un seul rédacteur : vérification et ajout à l'index ne se chevauchent pas
+                duplicate = self.duplicates.find(url, article["fingerprint"])
+                if duplicate:
+                    kind, original, score = duplicate
+                    reason = "Doublon exact" if kind == "exact" else "Quasi-doublon"
+                    print(f"⚠️ {reason} ({score:.0%}) de {original}, ignoré : {url}")
+                    self.skip(url, reason)
+                    continue
+                previous = self.manifest.output_path(url)
+                path = self.write(url, article)
+                if previous and Path(previous) != path:
+                    # Titre ou date corrigés : le nouveau .txt remplace l'ancien
+                    Path(previous).unlink(missing_ok=True)
+                if self.refresh and previous:
+                    METRICS.inc("revalidations", site=self.site.name, outcome="updated")
+                self.duplicates.add(url, self.site.name, article["fingerprint"])
+                if self.boilerplate:
+                    self.boilerplate.add(url, article)
+                if self.corpus:
+                    self.corpus.add(self.site, url, article)
+                self.manifest.mark(url, "written", path)
+                self.manifest.raise_watermark(article["date"], url)
+                self.keep_validators(url, article.get("modified"))
+                PATH_STATS.record(self.site.name, via)
+                self.written += 1
+                METRICS.inc("articles_written", site=self.site.name, via=via)
+                print(f"✅ [{self.written}] Sauvegardé : {path.name}")
+                self.done()
+            except Exception as e:
+                self.fail(url, e)
+            finally:
+                self.write_q.task_done()
+
+    # --- Sorties du pipeline ------------------------------------------------
+
+    def done(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self.idle.set()
+
+    def keep_validators(self, url, modified=None):
+        """Retient les validateurs de la dernière réponse de `url`, maintenant que sa version écrite est à jour."""
+        etag, last_modified = self.fetched_validators.pop(url, (None, None))
+        if etag or last_modified or modified:
+            self.manifest.save_validators(url, etag, last_modified, modified)
+
+    def skip(self, url, reason):
+        self.fetched_validators.pop(url, None)
+        if url in self.revalidating:
+            # Page disparue, rejetée ou devenue doublon : le .txt écrit reste, l'URL aussi
+            print(f"⚠️ Revalidation écartée, version écrite gardée : {url} ({reason})")
+            self.manifest.mark(url, "written", error=reason)
+            METRICS.inc("revalidations", site=self.site.name, outcome="skipped")
+            self.done()
+            return
+        self.manifest.mark(url, "skipped", error=reason)
+        METRICS.inc("articles_skipped", site=self.site.name, reason=reason)
+        self.done()
+
+    def advance(self, url, state):
+        """Étape intermédiaire ; un article en revalidation reste « written » jusqu'à sa réécriture."""
+        if url not in self.revalidating:
+            self.manifest.mark(url, state)
+
+    def unchanged(self, url, outcome):
+        """Revalidation sans changement : l'article reste écrit tel quel."""
+        self.manifest.mark(url, "written")
+        self.keep_validators(url)
+        METRICS.inc("revalidations", site=self.site.name, outcome=outcome)
+        self.done()
+
+    def fail(self, url, error):
+        self.fetched_validators.pop(url, None)
+        if url in self.revalidating:
+            # La version déjà écrite reste valable : l'erreur est notée, l'état ne change pas
+            print(f"⚠️ Revalidation impossible, version écrite gardée : {url} ({error})")
+            self.manifest.mark(url, "written", error=str(error))
+            METRICS.inc("revalidations", site=self.site.name, outcome="failed")
+            self.done()
+            return
+        print(f"❌ Erreur {url} : {error}")
+        self.manifest.mark(url, "failed", error=str(error))
+        PATH_STATS.record(self.site.name, "failed")
+        METRICS.inc("articles_failed", site=self.site.name)
+        self.done()
+
+    def retry(self, url, error, retry_after=None):
+        """Remet `url` en file après un délai à gigue, tant qu'il reste des tentatives."""
+        attempts = self.manifest.attempts(url)
+        if attempts >= MAX_ATTEMPTS:
+            self.fail(url, error)
+            return
+        delay = retry_delay(attempts, retry_after)
+        print(f"🔁 {url} : {error} — nouvel essai dans {delay:.0f}s")
+        METRICS.inc("retries", site=self.site.name, kind="article")
+        if url not in self.revalidating:
+            self.manifest.mark(url, "failed", error=str(error))
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self.fetch_q.put(url)
+
+        task = asyncio.create_task(requeue())
+        self.retry_tasks.add(task)
+        task.add_done_callback(self.retry_tasks.discard)
+
+    # --- Orchestration -------------------------------------------------------
+
+    async def drain(self):
+        """Attend que chaque URL entrée dans le pipeline en soit sortie."""
+        await self.idle.wait()
+
+    async def report_progress(self):
+        """Toutes les `progress_every` s : ligne de progression avec ETA, métriques sur disque."""
+        start = time.monotonic()
+        while True:
+            await asyncio.sleep(self.progress_every)
+            METRICS.write(self.metrics_path)
+            SELECTORS.save()
+            if self.corpus:
+                self.corpus.flush()
+            site = self.site.name
+            finished = sum(METRICS.total(name, site=site)
+                           for name in ("articles_written", "articles_failed", "articles_skipped"))
+            rate = finished / (time.monotonic() - start)
+            # Les URL pas encore découvertes ne sont pas comptées : l'ETA est optimiste pendant la pagination
+            eta = f"{self.in_flight / rate / 60:.0f} min" if rate else "?"
+            print(f"📈 {site}: {self.written} écrits, {finished - self.written} écartés ou en échec, "
+                  f"{self.in_flight} en cours, {rate * 60:.1f} articles/min, fin estimée dans {eta}")
+
+    async def run(self):
+        self.site.output_dir.mkdir(parents=True, exist_ok=True)
+        workers = (
+            [self.fetch_worker() for _ in range(self.http_workers)]
+            + [self.render_worker() for _ in range(self.browser_workers)]
+            + [self.extract_worker() for _ in range(self.extract_workers)]
+            + [self.write_worker()]
+            + [self.report_progress()]
+        )
+        tasks = [asyncio.create_task(w) for w in workers]
+        try:
+            await self.discover()
+            await self.drain()
+        finally:
+            for task in tasks + list(self.retry_tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._pool:
+                await self._pool.close()
+                # Un Chromium partagé reste ouvert pour le prochain pipeline
+                if not self.shared_browser:
+                    await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+            if self.corpus:
+                self.corpus.flush()
+            SELECTORS.save()
+            METRICS.write(self.metrics_path)
+        return self.written
+
+
+def run_site(site, **options):
+    """Lance le pipeline pour `site` et affiche le bilan."""
+    pipeline = Pipeline(site, **options)
+    print(f"🚀 {site.key} — {site.author or site.file_tag}")
+    written = asyncio.run(pipeline.run())
+    print(f"\n🎉 {written} articles sauvegardés dans {site.output_dir}")
+    if pipeline.refresh:
+        outcomes = {o: METRICS.total("revalidations", site=site.name, outcome=o)
+                    for o in ("not_modified", "unchanged", "updated", "skipped", "failed")}
+        print(f"🔄 Revalidation : {outcomes['not_modified']} réponses 304, {outcomes['unchanged']} inchangés, "
+              f"{outcomes['updated']} mis à jour, {outcomes['skipped']} écartés, {outcomes['failed']} en échec")
+    removed = METRICS.total("boilerplate_paragraphs", site=site.name)
+    if removed:
+        print(f"✂️ Gabarit retiré : {removed} paragraphes, "
+              f"{METRICS.total('boilerplate_bytes', site=site.name) / 1e3:.0f} Ko")
+    summaries = [pipeline.manifest.summary(), READINESS_STATS.summary(), PATH_STATS.summary(),
+                 SELECTORS.summary(), pipeline.limiter.summary(), METRICS.summary()]
+    if pipeline.block_resources:
+        summaries.append(BLOCK_STATS.summary())
+    print("\n".join(s for s in summaries if s))
+    print(f"📁 Métriques : {pipeline.metrics_path.with_suffix('.json')} et .prom")
+    return written
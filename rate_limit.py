@@ -0,0 +1,247 @@
+"""Limiteur de débit adaptatif par hôte, partagé par les chemins HTTP et Chromium.
+
+Chaque hôte a un seau à jetons dont le débit monte de façon additive tant que
+le site répond bien, et est divisé dès qu'il signale une surcharge (429, 502,
+503, 504, délai dépassé) ou qu'il échoue (autre 5xx). Un `Retry-After`
+suspend l'hôte le temps demandé.
+
+Quand plusieurs processus crawlent en même temps (jobs.py), `SharedHostSlots`
+tient ces limites pour tous : requêtes simultanées, débit et pauses par hôte
+sont communs aux processus, et un ralentissement vu par un job vaut pour les
+autres.
+"""
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Surcharge : débit divisé et URL remise en file plus tard
+THROTTLE_STATUSES = {429, 502, 503, 504}
+
+START_RATE = 1.0       # requêtes / s au démarrage, par hôte
+MIN_RATE = 0.1
+MAX_RATE = 8.0
+INCREASE = 0.05        # + par réponse saine
+DECREASE = 0.5         # × par signal de surcharge
+BURST = 2              # jetons accumulables
+
+RETRY_BASE = 2.0       # s
+RETRY_CAP = 120.0      # s
+
+
+class Throttled(Exception):
+    """Le serveur demande de ralentir ; `retry_after` en secondes si fourni.
+
+    `status` vaut 429, 502, 503 ou 504 (THROTTLE_STATUSES), ou None quand la
+    requête n'a pas eu de réponse (erreur réseau, délai dépassé).
+    """
+
+    def __init__(self, status, retry_after=None):
+        if status is None:
+            super().__init__("erreur réseau ou délai dépassé, ralentissement")
+        else:
+            super().__init__(f"HTTP {status}, ralentissement demandé")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def congested(status):
+    """Vrai pour une erreur serveur (5xx) : l'origine peine, le débit ne doit pas monter."""
+    return status is not None and status >= 500
+
+
+def parse_retry_after(value):
+    """Secondes à attendre d'après un en-tête `Retry-After` (délai ou date HTTP), sinon None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, retry_after=None):
+    """Délai avant de remettre une URL en file : exponentiel, avec gigue complète."""
+    delay = random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+
+def _alive(pid):
+    """Vrai si le processus `pid` tourne encore ; un zombie (tué, pas encore récolté) ne compte pas."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+class SharedHostSlots:
+    """Concurrence, débit et pauses par hôte, partagés entre processus par un `multiprocessing.Manager`.
+
+    Chaque requête, tous processus confondus, prend son créneau sur l'horloge
+    commune de l'hôte, espacé de 1/débit ; débit et `Retry-After` sont
+    communs. Les requêtes en cours sont comptées par processus : celles d'un
+    processus mort en cours de requête sont libérées au prochain essai.
+    Se transmet tel quel aux processus d'un pool (proxys du gestionnaire).
+    """
+
+    POLL = 0.05  # s entre deux essais quand l'hôte est plein
+
+    def __init__(self, manager, max_per_host, start_rate=START_RATE):
+        self.max_per_host = max_per_host
+        self.start_rate = start_rate
+        self.holders = manager.dict()   # hôte → {pid: requêtes en cours}
+        self.hosts = manager.dict()     # hôte → (débit, prochain créneau, suspendu jusqu'à), en time.time()
+        self.lock = manager.Lock()
+
+    def try_acquire(self, host):
+        pid = os.getpid()
+        with self.lock:
+            holders = {p: n for p, n in self.holders.get(host, {}).items() if p == pid or _alive(p)}
+            acquired = sum(holders.values()) < self.max_per_host
+            if acquired:
+                holders[pid] = holders.get(pid, 0) + 1
+            self.holders[host] = holders
+            return acquired
+
+    def release(self, host):
+        pid = os.getpid()
+        with self.lock:
+            holders = dict(self.holders.get(host, {}))
+            if holders.get(pid, 0) > 1:
+                holders[pid] -= 1
+            else:
+                holders.pop(pid, None)
+            self.holders[host] = holders
+
+    def in_flight(self, host):
+        return sum(self.holders.get(host, {}).values())
+
+    @asynccontextmanager
+    async def slot(self, host):
+        # Attente active courte plutôt qu'un acquire bloquant : reste annulable
+        while not self.try_acquire(host):
+            await asyncio.sleep(self.POLL)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def reserve(self, host):
+        """Réserve le prochain créneau de `host` ; retourne les secondes à attendre avant la requête."""
+        with self.lock:
+            rate, next_at, paused_until = self.hosts.get(host) or (self.start_rate, 0.0, 0.0)
+            now = time.time()
+            start = max(now, next_at, paused_until)
+            self.hosts[host] = (rate, start + 1 / rate, paused_until)
+        return start - now
+
+    def update(self, host, change, retry_after=None):
+        """Applique `change` (débit → débit) au débit commun de `host` ; retourne le nouveau débit."""
+        with self.lock:
+            rate, next_at, paused_until = self.hosts.get(host) or (self.start_rate, 0.0, 0.0)
+            rate = change(rate)
+            if retry_after:
+                paused_until = max(paused_until, time.time() + retry_after)
+            self.hosts[host] = (rate, next_at, paused_until)
+        return rate
+
+
+class HostBucket:
+    """Seau à jetons d'un hôte, au débit ajusté par AIMD."""
+
+    def __init__(self, rate, max_concurrent):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.throttles = 0
+        self.requests = 0
+
+    async def take(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(BURST, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Débit et concurrence par hôte ; `slot(url)` encadre chaque requête."""
+
+    def __init__(self, max_per_host=4, start_rate=START_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 shared=None):
+        self.max_per_host = max_per_host
+        self.shared = shared
+        self.start_rate = start_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.buckets = {}
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = HostBucket(self.start_rate, self.max_per_host)
+        return self.buckets[host]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        bucket = self.bucket(url)
+        async with bucket.slots:
+            if self.shared is None:
+                await bucket.take()
+                yield
+            else:
+                host = urlsplit(url).netloc
+                async with self.shared.slot(host):
+                    # Débit commun à tous les processus : le seau local ne tient que les statistiques
+                    await asyncio.sleep(self.shared.reserve(host))
+                    bucket.requests += 1
+                    yield
+
+    def adjust(self, url, change, retry_after=None):
+        """Applique `change` au débit de l'hôte de `url`, commun aux processus avec `shared`."""
+        bucket = self.bucket(url)
+        if self.shared is None:
+            bucket.rate = change(bucket.rate)
+        else:
+            bucket.rate = self.shared.update(urlsplit(url).netloc, change, retry_after)
+        return bucket
+
+    def success(self, url):
+        self.adjust(url, lambda rate: min(self.max_rate, rate + INCREASE))
+
+    def throttle(self, url, retry_after=None):
+        bucket = self.adjust(url, lambda rate: max(self.min_rate, rate * DECREASE), retry_after)
+        bucket.tokens = 0.0
+        bucket.throttles += 1
+        if retry_after:
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + retry_after)
+
+    def summary(self):
+        return "\n".join(
+            f"🚦 {host}: {b.requests} requêtes, débit final {b.rate:.2f}/s, {b.throttles} ralentissements"
+            for host, b in sorted(self.buckets.items())
+        )
@@ -0,0 +1,139 @@
+"""Attente événementielle : on rend la main dès que le contenu extrait est là et stable.
+
+Remplace les `wait_for_timeout(...)` fixes. Chaque attente est bornée par le
+délai du site et sa durée réelle est enregistrée dans `STATS`.
+"""
+import time
+
+from metrics import METRICS
+
+# Sélecteurs attendus par site et par type de page. Chaque sélecteur de la
+# liste doit être présent ; une virgule dans un sélecteur veut dire « l'un ou l'autre ».
+PROFILES = {
+    "jdm": {
+        "listing": ["a[href*='/202']"],
+        "article": ["article p", "time[datetime]"],
+        "timeout": 10000,
+    },
+    "ledevoir": {
+        "listing": ["a[href*='/opinion/chroniques/']"],
+        "article": ["article p", "time[datetime]"],
+        "timeout": 10000,
+    },
+    "lapresse": {
+        "listing": ["a[href*='/actualites/'], a[href*='/debats/'], a[href*='/chroniques/']"],
+        "article": ["article p, .article-content p, .story-content p", "h1"],
+        "timeout": 15000,
+    },
+    "radiocanada": {
+        "listing": ['a[href*="/info/analyses/"]'],
+        "article": ["h1, article, [data-testid='text-content']", "p"],
+        "timeout": 30000,
+    },
+}
+
+STABLE_MS = 300
+POLL_MS = 100
+
+# Vrai quand tous les sélecteurs sont présents et que leur nombre d'éléments
+# et leur longueur de texte n'ont pas bougé depuis `stableMs`.
+_READY_JS = """
+([selectors, stableMs]) => {
+    const parts = [];
+    for (const sel of selectors) {
+        const nodes = document.querySelectorAll(sel);
+        if (!nodes.length) return false;
+        let len = 0;
+        nodes.forEach(n => { len += (n.textContent || '').length; });
+        parts.push(nodes.length + ':' + len);
+    }
+    const key = parts.join('|');
+    const now = performance.now();
+    const st = window.__cnmcReady;
+    if (!st || st.key !== key) {
+        window.__cnmcReady = {key: key, since: now};
+        return false;
+    }
+    return now - st.since >= stableMs;
+}
+"""
+
+_GROW_JS = """
+([height, links]) => document.body.scrollHeight > height
+                     || document.querySelectorAll('a').length > links
+"""
+
+
+class ReadinessStats:
+    """Durées réelles des attentes, par site et type de page."""
+
+    def __init__(self):
+        self.samples = {}
+        self.timeouts = {}
+
+    def record(self, key, elapsed, ready):
+        site, kind = key.split("/", 1)
+        METRICS.observe("readiness_seconds", elapsed, site=site, kind=kind)
+        self.samples.setdefault(key, []).append(elapsed)
+        if not ready:
+            self.timeouts[key] = self.timeouts.get(key, 0) + 1
+
+    def summary(self):
+        lines = []
+        for key, values in sorted(self.samples.items()):
+            values = sorted(values)
+            p50 = values[len(values) // 2]
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            lines.append(
+                f"⏱️ {key}: {len(values)} attentes, p50 {p50:.2f}s, p95 {p95:.2f}s, "
+                f"max {values[-1]:.2f}s, {self.timeouts.get(key, 0)} timeouts"
+            )
+        return "\n".join(lines)
+
+
+STATS = ReadinessStats()
+
+
+def _selectors(site, kind, selectors):
+    profile = PROFILES[site]
+    return selectors or profile[kind], profile["timeout"]
+
+
+async def async_wait_until_ready(page, site, kind="article", selectors=None, timeout=None):
+    """Attend que `page` soit prête ; retourne False si le délai du site est atteint.
+
+    Un dépassement n'est pas une erreur : l'appelant extrait ce qui est chargé,
+    comme le faisaient les attentes fixes.
+    """
+    selectors, site_timeout = _selectors(site, kind, selectors)
+    start = time.perf_counter()
+    try:
+        await page.wait_for_function(_READY_JS, arg=[selectors, STABLE_MS],
+                                     timeout=timeout or site_timeout, polling=POLL_MS)
+        ready = True
+    except Exception:
+        ready = False
+    STATS.record(f"{site}/{kind}", time.perf_counter() - start, ready)
+    return ready
+
+
+_SCROLL_STATE_JS = "() => [document.body.scrollHeight, document.querySelectorAll('a').length]"
+
+
+async def async_scroll_until_stable(page, site, max_scrolls=10, timeout=3000):
+    """Défile jusqu'en bas tant que la page charge du nouveau contenu.
+
+    S'arrête dès qu'un défilement n'ajoute ni hauteur ni liens dans `timeout` ms.
+    """
+    for _ in range(max_scrolls):
+        height, links = await page.evaluate(_SCROLL_STATE_JS)
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        start = time.perf_counter()
+        try:
+            await page.wait_for_function(_GROW_JS, arg=[height, links], timeout=timeout, polling=POLL_MS)
+            grew = True
+        except Exception:
+            grew = False
+        STATS.record(f"{site}/scroll", time.perf_counter() - start, grew)
+        if not grew:
+            break
@@ -0,0 +1,127 @@
+"""Ré-extraction hors ligne : relit l'archive de snapshots.py et réécrit les .txt.
+
+    python reextract.py jdm lapresse --workers 8 --output ~/Desktop/essai
+
+Après correction d'un sélecteur dans extraction.py, chaque page archivée est
+de nouveau analysée et écrite, sur tous les cœurs, sans aucun accès réseau.
+Les sites qui extraient sur la page rendue (Radio-Canada) passent ici par les
+règles d'extraction.py sur le DOM archivé. Les articles réécrits sont mis à
+jour dans le corpus (corpus.py) et, dans le dossier du site, dans le
+manifeste : un titre ou une date corrigés remplacent l'ancien .txt.
+Les paragraphes de gabarit comptés au crawl (boilerplate.py) sont retirés.
+Les pages archivées le sont avant la recherche de doublons : celles que le
+crawl a écartées (doublon, autre auteur, hors période) restent écartées ici,
+d'après leur état `skipped` dans le manifeste.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+from boilerplate import BoilerplateIndex
+from corpus import CORPUS_PATH, Corpus
+from dedup import exact_hash, minhash
+from extraction import RULES
+from manifest import MANIFEST_PATH, Manifest
+from pipeline import SITES, extract_html, load_site, write_article
+from snapshots import SNAPSHOTS_DIR, SnapshotArchive, load_snapshot
+
+_site = None
+_manifest = None
+_boilerplate = None
+
+
+def _init_worker(name, output_dir, manifest_path=MANIFEST_PATH):
+    global _site, _manifest, _boilerplate
+    _site = load_site(name)
+    if output_dir:
+        _site = replace(_site, output_dir=output_dir)
+    # Lecture seule : états et compteurs ne changent qu'au crawl
+    _manifest = Manifest(name, manifest_path).db
+    _boilerplate = BoilerplateIndex(_manifest, name)
+
+
+def _skipped(url):
+    """Raison pour laquelle le crawl a écarté `url`, ou None."""
+    row = _manifest.execute("SELECT error FROM urls WHERE url = ? AND state = 'skipped'", (url,)).fetchone()
+    return (row[0] or "Écarté au crawl") if row else None
+
+
+def reextract_one(path):
+    """(« written » | « skipped » | « empty » | « failed », url, détail, article) pour un snapshot."""
+    url = None
+    try:
+        record = load_snapshot(path)
+        url = record["url"]
+        skipped = _skipped(url)
+        if skipped:
+            return "skipped", url, skipped, None
+        article, reason = extract_html(_site, url, record["html"])
+        if article is None or not article["text"]:
+            return "empty", url, None, None
+        if reason:
+            return "skipped", url, reason, None
+        _boilerplate.strip(article, RULES[_site.name]["sep"])
+        article["fingerprint"] = (exact_hash(article["text"]), minhash(article["text"]))
+        return "written", url, str(write_article(_site, url, article)), article
+    except Exception as e:
+        return "failed", url or str(path), str(e), None
+
+
+def reextract(name, workers=None, output_dir=None, snapshots_dir=SNAPSHOTS_DIR, corpus_path=CORPUS_PATH,
+              manifest_path=MANIFEST_PATH):
+    """Ré-extrait toutes les pages archivées de `name` ; retourne le compte par résultat."""
+    paths = SnapshotArchive(name, snapshots_dir).paths()
+    site = load_site(name)
+    (output_dir or site.output_dir).mkdir(parents=True, exist_ok=True)
+    counts = {"written": 0, "skipped": 0, "empty": 0, "failed": 0}
+    corpus = Corpus(corpus_path) if corpus_path else None
+    # Dossier d'essai (--output) : les .txt du site et le manifeste restent tels quels
+    manifest = Manifest(name, manifest_path) if output_dir is None else None
+    # Chaque processus charge lui-même la définition du site : ses fonctions ne se sérialisent pas
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(name, output_dir, manifest_path)) as pool:
+        for status, url, detail, article in pool.map(reextract_one, paths, chunksize=16):
+            counts[status] += 1
+            if status == "written":
+                if manifest:
+                    previous = manifest.output_path(url)
+                    if previous and Path(previous) != Path(detail):
+                        # Titre ou date corrigés : le nouveau .txt remplace l'ancien
+                        Path(previous).unlink(missing_ok=True)
+                    manifest.mark(url, "written", output_path=detail)
+                if corpus:
+                    corpus.add(site, url, article)
+            elif status == "failed":
+                print(f"❌ Erreur {url} : {detail}")
+            elif status == "empty":
+                print(f"⚠️ Aucun contenu : {url}")
+    if corpus:
+        corpus.close()
+    if manifest:
+        manifest.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sites", nargs="+", choices=sorted(SITES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", type=Path, help="dossier de sortie (par défaut celui du site)")
+    parser.add_argument("--snapshots", type=Path, default=SNAPSHOTS_DIR)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    args = parser.parse_args(argv)
+
+    for name in args.sites:
+        start = time.perf_counter()
+        counts = reextract(name, args.workers, args.output and args.output.expanduser(), args.snapshots,
+                           args.corpus)
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print(f"♻️ {name}: {total} pages en {elapsed:.1f}s — {counts['written']} écrits, "
+              f"{counts['skipped']} écartés, {counts['empty']} vides, {counts['failed']} en échec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Sélecteurs gagnants appris par site et rubrique, essayés en premier dans les cascades d'extraction.
+
+Un gabarit de site donne presque toujours le même gagnant : après LEARN_MIN
+succès du même sélecteur pour une rubrique (premier segment du chemin de
+l'URL), il passe en tête de la cascade. Les autres ne sont essayés qu'en cas
+d'échec, compté comme un raté ; RELEARN_AFTER ratés de suite font oublier le
+gagnant (gabarit changé) et la cascade complète reprend. Les victoires sont
+gardées d'un lancement à l'autre dans DATA_DIR/selectors.json.
+"""
+import fcntl
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+from manifest import DATA_DIR
+from metrics import METRICS
+
+SELECTORS_PATH = DATA_DIR / "selectors.json"
+LEARN_MIN = 3          # succès d'un même sélecteur avant qu'il passe en tête
+RELEARN_AFTER = 3      # ratés de suite du gagnant avant de l'oublier
+
+
+def section(url):
+    """Rubrique d'une URL : premier segment du chemin (« actualites », « opinion »…)."""
+    path = urlsplit(url or "").path.strip("/")
+    return path.split("/", 1)[0] if path else ""
+
+
+class SelectorCache:
+    """Victoires par (site, rubrique, champ) et sélecteur ; sûr entre threads d'extraction."""
+
+    def __init__(self, path=SELECTORS_PATH):
+        self.lock = threading.Lock()
+        self.reset(path)
+
+    def reset(self, path=SELECTORS_PATH):
+        """Repart d'un fichier `path` et de statistiques vides (banc d'essai, tests)."""
+        with self.lock:
+            self.path = path
+            self.wins = None        # chargé au premier usage
+            self.deltas = {}        # victoires depuis la dernière écriture, ajoutées à celles du fichier
+            self.forgotten = set()  # gagnants oubliés depuis la dernière écriture
+            self.streaks = {}       # ratés de suite du gagnant
+            self.outcomes = {}      # (site, champ) → {issue: nombre}
+
+    def _load(self):
+        if self.wins is None:
+            try:
+                self.wins = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.wins = {}
+
+    def _winner(self, key):
+        wins = self.wins.get(key) or {}
+        if not wins:
+            return None
+        selector, count = max(wins.items(), key=lambda item: item[1])
+        return selector if count >= LEARN_MIN else None
+
+    def order(self, site, url, field, selectors):
+        """`selectors` avec le gagnant appris en tête, les autres dans l'ordre d'origine."""
+        with self.lock:
+            self._load()
+            winner = self._winner(f"{site}|{section(url)}|{field}")
+        if winner not in selectors:
+            return list(selectors)
+        return [winner] + [s for s in selectors if s != winner]
+
+    def record(self, site, url, field, selector):
+        """Note le sélecteur qui a donné `field` (None : aucun) ; retourne hit / miss / cold / none."""
+        key = f"{site}|{section(url)}|{field}"
+        with self.lock:
+            self._load()
+            winner = self._winner(key)
+            if selector is None:
+                outcome = "none"
+            elif winner is None:
+                outcome = "cold"
+            elif selector == winner:
+                outcome = "hit"
+            else:
+                outcome = "miss"
+            if outcome == "hit":
+                self.streaks[key] = 0
+            elif outcome == "miss":
+                # « none » n'en est pas un : le champ manque vraiment (article sans date)
+                self.streaks[key] = self.streaks.get(key, 0) + 1
+                if self.streaks[key] >= RELEARN_AFTER:
+                    print(f"⚠️ {site} / {section(url) or '/'} : « {winner} » ne donne plus le {field}, "
+                          f"gabarit changé ? La cascade complète reprend")
+                    self.wins.pop(key, None)
+                    self.deltas.pop(key, None)
+                    self.forgotten.add(key)
+                    self.streaks[key] = 0
+            if selector is not None:
+                for counts in (self.wins.setdefault(key, {}), self.deltas.setdefault(key, {})):
+                    counts[selector] = counts.get(selector, 0) + 1
+            stats = self.outcomes.setdefault((site, field), {})
+            stats[outcome] = stats.get(outcome, 0) + 1
+        METRICS.inc("selectors", site=site, field=field, outcome=outcome)
+        return outcome
+
+    def save(self):
+        """Ajoute les victoires de ce processus à celles du fichier, écrites entre-temps par d'autres (jobs.py)."""
+        with self.lock:
+            if not self.deltas and not self.forgotten:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Verrou de fichier : lecture, fusion et écriture d'un processus ne se croisent pas avec un autre
+            with open(self.path.with_suffix(".json.lock"), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                self._merge()
+
+    def _merge(self):
+        try:
+            stored = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stored = {}
+        for key in self.forgotten:
+            stored.pop(key, None)  # gagnant oublié : gabarit changé
+        for key, delta in self.deltas.items():
+            counts = stored.setdefault(key, {})
+            for selector, n in delta.items():
+                counts[selector] = counts.get(selector, 0) + n
+            self.wins[key] = dict(counts)
+        self.deltas, self.forgotten = {}, set()
+        tmp = self.path.with_suffix(f".json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(stored, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def summary(self):
+        lines = []
+        for (site, field), stats in sorted(self.outcomes.items()):
+            learned = stats.get("hit", 0) + stats.get("miss", 0)
+            rate = f"{stats.get('miss', 0) / learned:.0%}" if learned else "—"
+            lines.append(f"🎯 {site}/{field}: {stats.get('hit', 0)} en tête, {stats.get('miss', 0)} ratés "
+                         f"({rate}), {stats.get('cold', 0)} cascades complètes, {stats.get('none', 0)} sans résultat")
+        return "\n".join(lines)
+
+
+SELECTORS = SelectorCache()
@@ -0,0 +1,168 @@
+"""Découverte par les sitemaps annoncés dans robots.txt, lus en flux.
+
+Index de sitemaps, sitemaps mensuels et Google News sont lus par morceaux
+avec `XMLPullParser` (gzip compris) : chaque entrée est filtrée puis
+oubliée, un fichier de 50 000 URL ne tient jamais entier en mémoire. Les
+sitemaps enfants hors de la période voulue (mois dans l'URL, `lastmod`) ne
+sont même pas téléchargés.
+
+    python sitemaps.py https://www.lapresse.ca --match /chroniques/ --since 2020-01-01
+"""
+import argparse
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urljoin
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import requests
+
+from extraction import parse_date
+from frontier import url_date
+from http_fetch import HTTP_TIMEOUT, SESSION, STREAM_CHUNK
+
+# Mois d'un sitemap mensuel dans son URL : sitemap-2020-01.xml, /2020/01/, 202001.xml…
+_MONTH = re.compile(r"(?<!\d)((?:19|20)\d{2})[-_/]?(0[1-9]|1[0-2])(?!\d)")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class Entry:
+    """Une entrée de sitemap : un article (`url`) ou un sitemap enfant (`sitemap`)."""
+    kind: str
+    loc: str
+    lastmod: Optional[str] = None
+    published: Optional[str] = None     # news:publication_date
+
+    @property
+    def date(self):
+        """YYYY-MM-DD de publication : sitemap News, sinon URL, sinon lastmod."""
+        for value in (self.published, url_date(self.loc), self.lastmod):
+            date = parse_date(value or "")
+            if date:
+                return date
+        return None
+
+
+def robots_sitemaps(site_url, session=SESSION):
+    """URL des sitemaps annoncés par `Sitemap:` dans le robots.txt du site."""
+    try:
+        r = session.get(urljoin(site_url, "/robots.txt"), timeout=HTTP_TIMEOUT)
+    except requests.RequestException:
+        return []
+    if not r.ok:
+        return []
+    return [line.split(":", 1)[1].strip() for line in r.text.splitlines()
+            if line.lower().startswith("sitemap:")]
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(url, session=SESSION):
+    """Entrées d'un sitemap ou d'un index, au fil du téléchargement."""
+    parser = XMLPullParser(events=("start", "end"))
+    root = []
+    with session.get(url, timeout=HTTP_TIMEOUT, stream=True) as r:
+        r.raise_for_status()
+        inflate = None
+        for chunk in r.iter_content(STREAM_CHUNK):
+            if inflate is None:
+                # Fichier .xml.gz servi tel quel (sans Content-Encoding)
+                inflate = zlib.decompressobj(zlib.MAX_WBITS | 16) if chunk.startswith(_GZIP_MAGIC) else False
+            parser.feed(inflate.decompress(chunk) if inflate else chunk)
+            yield from _entries(parser, root)
+    parser.close()
+    yield from _entries(parser, root)
+
+
+def _entries(parser, root):
+    for event, elem in parser.read_events():
+        if event == "start":
+            if not root:
+                root.append(elem)
+            continue
+        kind = _local(elem.tag)
+        if kind not in ("url", "sitemap"):
+            continue
+        fields = {}
+        for child in elem.iter():
+            # Premier `loc` : celui de l'entrée, pas celui d'une image:image imbriquée
+            fields.setdefault(_local(child.tag), (child.text or "").strip())
+        if fields.get("loc"):
+            yield Entry(kind, fields["loc"], fields.get("lastmod") or None,
+                        fields.get("publication_date") or None)
+        # Entrées traitées : la racine ne garde pas 50 000 éléments vides
+        root[0].clear()
+
+
+def _month_outside(url, since, until):
+    """Vrai si l'URL d'un sitemap enfant nomme un mois entièrement hors de [since, until]."""
+    m = _MONTH.search(url)
+    if not m:
+        return False
+    month = f"{m.group(1)}-{m.group(2)}"
+    return bool((since and month < since[:7]) or (until and month > until[:7]))
+
+
+def walk(roots, match=None, since=None, until=None, session=SESSION, on_sitemap=None):
+    """URL d'articles des sitemaps `roots` (et de leurs index), filtrées par `match` et par date.
+
+    `roots` : sites (leur robots.txt est lu) ou URL de sitemaps. Une entrée sans
+    date connue est gardée. `on_sitemap(url, count)` est appelé après chaque fichier.
+    """
+    todo = []
+    for root in roots:
+        todo += [root] if re.search(r"\.xml(\.gz)?(\?|$)", root) else robots_sitemaps(root, session)
+    seen = set()
+    while todo:
+        sitemap = todo.pop(0)
+        if sitemap in seen:
+            continue
+        seen.add(sitemap)
+        count = 0
+        try:
+            for entry in iter_sitemap(sitemap, session):
+                if entry.kind == "sitemap":
+                    if _month_outside(entry.loc, since, until):
+                        continue
+                    # Un sitemap inchangé depuis avant `since` ne liste rien de plus récent
+                    if since and entry.lastmod and (parse_date(entry.lastmod) or since) < since:
+                        continue
+                    todo.append(entry.loc)
+                    continue
+                if match and not match(entry.loc):
+                    continue
+                date = entry.date
+                if date and ((since and date < since) or (until and date > until)):
+                    continue
+                count += 1
+                yield entry.loc
+        except (requests.RequestException, ParseError) as e:
+            print(f"❌ Sitemap {sitemap} : {e}")
+        if on_sitemap:
+            on_sitemap(sitemap, count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("roots", nargs="+", help="site (robots.txt) ou URL de sitemap")
+    parser.add_argument("--match", help="expression régulière que l'URL doit contenir")
+    parser.add_argument("--since", help="AAAA-MM-JJ")
+    parser.add_argument("--until", help="AAAA-MM-JJ")
+    args = parser.parse_args(argv)
+    match = re.compile(args.match).search if args.match else None
+    start = time.perf_counter()
+    urls = 0
+    for url in walk(args.roots, match, args.since, args.until,
+                    on_sitemap=lambda s, n: print(f"🗺️ {s} : {n} URL retenues")):
+        print(url)
+        urls += 1
+    print(f"✅ {urls} URL en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Archive des pages d'articles telles que reçues, pour ré-extraire sans réseau.
+
+Un enregistrement par URL, à la manière d'un WARC : URL, voie (http ou
+browser), statut, en-têtes, heure de récupération et HTML (DOM rendu pour
+Chromium), en JSON compressé gzip dans
+~/.cnmc/snapshots/<site>/<2 premiers caractères du sha1>/<sha1>.json.gz.
+Une nouvelle récupération remplace l'enregistrement précédent.
+"""
+import gzip
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from manifest import DATA_DIR
+
+SNAPSHOTS_DIR = DATA_DIR / "snapshots"
+
+
+class SnapshotArchive:
+    """Pages brutes d'un site, une par URL."""
+
+    def __init__(self, site, root=SNAPSHOTS_DIR):
+        self.site = site
+        self.dir = Path(root) / site
+
+    def path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.dir / digest[:2] / f"{digest}.json.gz"
+
+    def save(self, url, html, via, status=None, headers=None):
+        record = {
+            "url": url,
+            "site": self.site,
+            "via": via,
+            "status": status,
+            "headers": dict(headers or {}),
+            "fetched_at": time.time(),
+            "html": html,
+        }
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        tmp.replace(path)
+
+    def paths(self):
+        return sorted(self.dir.glob("*/*.json.gz"))
+
+    def __len__(self):
+        return len(self.paths())
+
+
+def load_snapshot(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
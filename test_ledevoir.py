@@ -1,79 +1,41 @@
-from playwright.sync_api import sync_playwright
 from pathlib import Path
-import re
-import time
 
-BASE_URL = "https://www.ledevoir.com/auteur/jean-francois-lisee"
-OUTPUT_DIR = Path("~/Desktop/chroniques_lisee").expanduser()
-OUTPUT_DIR.mkdir(exist_ok=True)
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
+from pipeline import Site, links_matching, run_site
 
-    all_links = set()
-    max_pages = 100
-
-    print("🔄 Chargement des pages auteur de Jean-François Lisée...")
+BASE_URL = "https://www.ledevoir.com/auteur/{slug}"
+OUTPUT_DIR = Path("~/Desktop/chroniques_lisee").expanduser()
 
-    for page_num in range(1, max_pages + 1):
-        url = BASE_URL if page_num == 1 else f"{BASE_URL}/{page_num}"
-        print(f"📄 Page {page_num} : {url}")
-        page.goto(url, timeout=30000)
-        page.wait_for_timeout(1000)
 
+def make_site(slug, author, file_tag, output_dir, job=None):
+    """Chroniques d'un auteur du Devoir (`slug` : jean-francois-lisee)."""
+    base_url = BASE_URL.format(slug=slug)
+    return Site(
+        name="ledevoir",
+        author=author,
+        file_tag=file_tag,
+        output_dir=output_dir,
+        listing_url=lambda n: base_url if n == 1 else f"{base_url}/{n}",
         # Extraire uniquement les chroniques
-        links = page.evaluate("""
-            () => Array.from(document.querySelectorAll("a"))
-                      .map(a => a.href)
-                      .filter(h => h.includes("/opinion/chroniques/"))
-        """)
-        new_links = set(links) - all_links
-
-        print(f"🔗 Chroniques trouvées : {len(new_links)}")
-
-        if not new_links:
-            print("✅ Fin de la pagination. Aucun nouveau lien.")
-            break
-
-        all_links.update(new_links)
+        find_links=links_matching(lambda h: "/opinion/chroniques/" in h),
+        first_page=1,
+        max_pages=100,
+        listing_window=4,      # pages de liste lues en parallèle
+        job=job,
+    )
 
-    print(f"📚 Total de chroniques collectées : {len(all_links)}")
 
-    for i, url in enumerate(sorted(all_links), 1):
-        print(f"📥 [{i}/{len(all_links)}] Téléchargement : {url}")
-        try:
-            article_page = browser.new_page()
-            article_page.goto(url, timeout=60000)
-            article_page.wait_for_timeout(3000)
+SITE = make_site("jean-francois-lisee", "Jean-François Lisée", "Lisee", OUTPUT_DIR)
 
-            titre = article_page.title().strip()
-            auteur = "Jean-François Lisée"
-
-            date_elem = article_page.locator("time").first
-            date_text = date_elem.get_attribute("datetime")[:10] if date_elem.count() > 0 else "0000-00-00"
-
-            texte = article_page.evaluate("""
-                () => Array.from(document.querySelectorAll('article p'))
-                          .map(p => p.innerText.trim())
-                          .join('\\n')
-            """)
-
-            titre_fichier = re.sub(r"[^\w\d-]", "_", titre)[:60]
-            fichier_name = f"{date_text}_Lisee_{titre_fichier}.txt"
-            fichier_path = OUTPUT_DIR / fichier_name
-
-            with open(fichier_path, "w", encoding="utf-8") as f:
-                f.write(f"TITRE  : {titre}\n")
-                f.write(f"URL    : {url}\n")
-                f.write(f"AUTEUR : {auteur}\n")
-                f.write(f"DATE   : {date_text}\n\n")
-                f.write(texte)
-
-            print(f"✅ Sauvegardé : {fichier_name}")
-            article_page.close()
-            time.sleep(1)
-        except Exception as e:
-            print(f"❌ Erreur : {e}")
-
-    browser.close()
+if __name__ == "__main__":
+    print("🔄 Chargement des pages auteur de Jean-François Lisée...")
+    run_site(
+        SITE,
+        http_workers=4,        # téléchargements HTTP simultanés
+        browser_workers=2,     # pages Chromium réutilisées (listes, replis)
+        max_per_host=4,
+        block_resources=False, # bloque images, polices, médias et traceurs (blocking.py)
+        resume=True,           # False pour refaire la pagination
+        incremental=True,      # s'arrête aux articles déjà connus ; False pour toute l'archive
+        refresh=False,         # True : revalide les articles déjà écrits (GET conditionnel)
+        browser_url=None,      # "http://127.0.0.1:9222" : Chromium partagé (browser_server.py)
+    )
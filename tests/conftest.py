@@ -0,0 +1,154 @@
+"""Serveur HTTP local et sites de test partagés par les tests du pipeline et des sitemaps."""
+import sys
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from selector_cache import SELECTORS, SELECTORS_PATH  # noqa: E402
+
+
+class LocalSite:
+    """Pages servies par chemin ; `hits` garde les chemins demandés.
+
+    `pages[path]` vaut (status, body, headers), ou une liste de réponses servies
+    tour à tour, la dernière indéfiniment.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.hits = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site.lock:
+                    site.hits.append(self.path)
+                    page = site.pages.get(self.path, (404, b"", {}))
+                    if isinstance(page, list):
+                        page = page.pop(0) if len(page) > 1 else page[0]
+                    status, body, headers = page
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                headers = {"Content-Type": "text/html; charset=utf-8", **headers}
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def url(self, path):
+        return self.base + path
+
+    def serve(self, path, body, status=200, **headers):
+        self.pages[path] = (status, body, headers)
+
+    def serve_in_turn(self, path, *responses):
+        """Sert les (status, body) de `responses` l'un après l'autre à chaque GET de `path`."""
+        self.pages[path] = [(status, body, {}) for status, body in responses]
+
+    def hits_of(self, prefix):
+        return [h for h in self.hits if h.startswith(prefix)]
+
+
+@pytest.fixture
+def local_site():
+    site = LocalSite()
+    threading.Thread(target=site.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield site
+    site.httpd.shutdown()
+    site.httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_selectors(tmp_path):
+    """Les sélecteurs appris restent dans le dossier du test, jamais dans ~/.cnmc."""
+    SELECTORS.reset(tmp_path / "selectors.json")
+    yield
+    SELECTORS.reset(SELECTORS_PATH)
+
+
+# --- Un site de chroniques complet : listes paginées et articles ----------------
+
+PER_PAGE = 10
+
+
+def article_html(n, day, extra=()):
+    # Assez de mots propres à l'article pour n'être ni une page JavaScript ni un quasi-doublon
+    own = " ".join(f"sujet{n}x{i}" for i in range(40))
+    paragraphs = [f"Premier paragraphe de la chronique {n} : {own}.", f"Second paragraphe, numéro {n}.", *extra]
+    body = "".join(f"<p>{p}</p>" for p in paragraphs)
+    return (f"<html><head><title>Chronique {n}</title></head><body>"
+            f"<article><time datetime=\"{day}\">{day}</time>{body}</article></body></html>")
+
+
+class Chroniques:
+    """Site de chroniques : une par jour depuis OLDEST, listées de la plus récente à la plus ancienne."""
+
+    OLDEST = date(2024, 1, 1)
+
+    def __init__(self, server, count, extra=()):
+        self.server = server
+        self.extra = list(extra)
+        self.paths = []
+        self.publish(count)
+
+    def publish(self, count):
+        """Ajoute `count` chroniques plus récentes que les autres et reconstruit les pages de liste."""
+        for n in range(len(self.paths), len(self.paths) + count):
+            day = self.OLDEST + timedelta(days=n)
+            self.paths.append(f"/{day:%Y/%m/%d}/chronique-{n}")
+            self.server.serve(self.paths[n], article_html(n, day.isoformat(), self.extra))
+        newest_first = self.paths[::-1]
+        for page in range(len(newest_first) // PER_PAGE + 2):
+            links = newest_first[page * PER_PAGE:(page + 1) * PER_PAGE]
+            html = "".join(f'<a href="{link}">{link}</a>' for link in links)
+            self.server.serve(f"/liste/{page}", f"<html><body>{html}</body></html>")
+
+    def site(self, output_dir, max_pages=20, **fields):
+        from pipeline import Site, links_matching
+
+        server = self.server
+        return Site(
+            name="jdm",
+            author=None,
+            file_tag="Test",
+            output_dir=output_dir,
+            listing_url=lambda n: server.url(f"/liste/{n}"),
+            find_links=links_matching(lambda h: "/chronique-" in h),
+            first_page=0,
+            max_pages=max_pages,
+            listing_via="http",
+            **fields,
+        )
+
+
+@pytest.fixture
+def make_pipeline(tmp_path):
+    """Pipeline d'un site de test, tout son état dans `tmp_path`, sans limite de débit."""
+    from pipeline import Pipeline
+    from rate_limit import RateLimiter
+
+    def make(site, **options):
+        options = {"manifest_path": tmp_path / "manifest.sqlite", "metrics_dir": tmp_path / "metrics",
+                   "snapshots_dir": None, "corpus_path": None, "progress_every": 3600, **options}
+        pipeline = Pipeline(site, **options)
+        pipeline.limiter = RateLimiter(start_rate=1000, max_rate=1000)
+        return pipeline
+
+    return make
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from boilerplate import BOILERPLATE_MIN, BoilerplateIndex, paragraph_hash
+from conftest import Chroniques
+from metrics import METRICS
+
+NEWSLETTER = "Abonnez-vous à notre infolettre pour recevoir les chroniques chaque matin."
+
+
+def article(n, *extra):
+    paras = [f"Paragraphe propre à l'article {n}.", *extra]
+    return {"paragraphs": list(paras), "text": "\n".join(paras)}
+
+
+def test_paragraph_hash_ignores_case_and_punctuation():
+    assert paragraph_hash("Abonnez-vous !") == paragraph_hash("abonnez vous")
+    assert paragraph_hash(" — ") is None
+
+
+def test_paragraph_becomes_boilerplate_after_enough_articles():
+    index = BoilerplateIndex(sqlite3.connect(":memory:"), "jdm")
+    for n in range(BOILERPLATE_MIN):
+        first = article(n, NEWSLETTER)
+        assert index.strip(first, "\n") == []
+        index.add(f"https://x/{n}", first)
+
+    later = article(99, NEWSLETTER)
+    assert index.strip(later, "\n") == [NEWSLETTER]
+    assert later["text"] == "Paragraphe propre à l'article 99."
+    assert later["full_text"] == f"Paragraphe propre à l'article 99.\n{NEWSLETTER}"
+    index.add("https://x/99", later)
+    assert index.removed("https://x/99") == [NEWSLETTER]
+    assert index.top()[0] == (BOILERPLATE_MIN + 1, 1, NEWSLETTER)
+
+
+def test_article_made_only_of_boilerplate_is_kept_whole():
+    index = BoilerplateIndex(sqlite3.connect(":memory:"), "jdm", threshold=1)
+    index.add("https://x/1", dict(article(1, NEWSLETTER), paragraph_hashes=[paragraph_hash(NEWSLETTER)]))
+    only = {"paragraphs": [NEWSLETTER], "text": NEWSLETTER}
+    assert index.strip(only, "\n") == [] and only["text"] == NEWSLETTER
+
+
+def test_rewrite_replaces_the_previous_counts():
+    index = BoilerplateIndex(sqlite3.connect(":memory:"), "jdm")
+    first = article(1, NEWSLETTER)
+    index.strip(first, "\n")
+    index.add("https://x/1", first)
+    assert index.same("https://x/1", first)
+
+    rewritten = article(1)
+    index.strip(rewritten, "\n")
+    index.add("https://x/1", rewritten)
+    assert index.counts[paragraph_hash(NEWSLETTER)] == 0
+    assert not index.same("https://x/1", first)
+
+
+def test_refresh_after_boilerplate_crosses_the_threshold_reports_no_update(local_site, tmp_path, make_pipeline):
+    chroniques = Chroniques(local_site, BOILERPLATE_MIN, extra=[NEWSLETTER])
+    site = chroniques.site(tmp_path / "out")
+    # Écrits avec l'infolettre : elle n'était pas encore du gabarit
+    assert asyncio.run(make_pipeline(site).run()) == BOILERPLATE_MIN
+    chroniques.publish(2)
+    pipeline = make_pipeline(site, resume=False)
+    assert asyncio.run(pipeline.run()) == 2
+    texts = {n: Path(pipeline.manifest.output_path(local_site.url(path))).read_text(encoding="utf-8")
+             for n, path in enumerate(chroniques.paths)}
+    assert [n for n, text in texts.items() if NEWSLETTER in text] == list(range(BOILERPLATE_MIN))
+
+    def revalidations():
+        return {o: METRICS.total("revalidations", site="jdm", outcome=o) for o in ("unchanged", "updated")}
+
+    before = revalidations()
+    assert asyncio.run(make_pipeline(site, refresh=True).run()) == 0
+    after = revalidations()
+    assert after["updated"] - before["updated"] == 0
+    assert after["unchanged"] - before["unchanged"] == BOILERPLATE_MIN + 2
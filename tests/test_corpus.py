@@ -0,0 +1,51 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from corpus import Corpus, fts_query, main
+
+SITE = SimpleNamespace(name="jdm", author="Mathieu Bock-Côté", file_tag="BockCote")
+
+
+def article(title, date, *paragraphs):
+    return {"title": title, "date": date, "text": "\n".join(paragraphs), "paragraphs": list(paragraphs)}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = Corpus(tmp_path / "corpus.sqlite")
+    corpus.add(SITE, "https://x/1", article("La réforme de l'école", "2024-01-02",
+                                            "Mathieu Bock-Côté revient sur l'école québécoise."))
+    corpus.add(SITE, "https://x/2", article("Laïcité", "2024-01-03", "La laïcité, encore et toujours."))
+    corpus.flush()
+    yield corpus
+    corpus.close()
+
+
+def urls(rows):
+    return [row[0] for row in rows]
+
+
+def test_fts_query_quotes_every_word():
+    assert fts_query('Bock-Côté  l\'école "x') == '"Bock-Côté" "l\'école" """x"'
+
+
+def test_search_with_hyphen_and_apostrophe(corpus):
+    assert urls(corpus.search("Bock-Côté")) == ["https://x/1"]
+    assert urls(corpus.search("l'école")) == ["https://x/1"]
+    assert urls(corpus.search("laicite")) == ["https://x/2"]
+    assert urls(corpus.search("école laïcité")) == []
+
+
+def test_raw_queries_keep_fts5_operators(corpus):
+    assert urls(corpus.search("laïcité OR école", raw=True)) == ["https://x/2", "https://x/1"]
+    with pytest.raises(sqlite3.OperationalError):
+        corpus.search("Bock-Côté", raw=True)
+
+
+def test_cli_reports_invalid_raw_queries(corpus, tmp_path, capsys):
+    main(["--corpus", str(tmp_path / "corpus.sqlite"), "search", "Bock-Côté"])
+    assert "https://x/1" in capsys.readouterr().out
+    with pytest.raises(SystemExit, match="Requête invalide"):
+        main(["--corpus", str(tmp_path / "corpus.sqlite"), "search", "--raw", "l'école"])
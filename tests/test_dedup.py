@@ -0,0 +1,48 @@
+import sqlite3
+
+from dedup import NEAR_DUPLICATE, DuplicateIndex, exact_hash, minhash, similarity
+
+WORDS = ("le gouvernement annonce une réforme de la santé qui touchera les hôpitaux du Québec "
+         "dès l'automne prochain selon la ministre responsable du dossier").split()
+
+
+def text(n, changed=0):
+    """Texte de `n` phrases ; les `changed` dernières sont réécrites."""
+    sentences = [f"Phrase {i} : " + " ".join(WORDS[i % 7:] + WORDS[:i % 7]) + "." for i in range(n)]
+    for i in range(n - changed, n):
+        sentences[i] = f"Tout autre propos numéro {i}, sans rapport avec le reste du texte."
+    return " ".join(sentences)
+
+
+def test_exact_hash_ignores_case_spacing_and_punctuation():
+    assert exact_hash("Un  texte, bien écrit !") == exact_hash("un texte bien écrit")
+    assert exact_hash("un texte") != exact_hash("un autre texte")
+
+
+def test_similarity_of_minhash_signatures():
+    original = minhash(text(40))
+    assert similarity(original, minhash(text(40))) == 1.0
+    assert similarity(original, minhash(text(40, changed=1))) >= NEAR_DUPLICATE
+    assert similarity(original, minhash(text(40, changed=30))) < NEAR_DUPLICATE
+
+
+def test_index_finds_exact_and_near_duplicates_but_not_rewrites():
+    index = DuplicateIndex(sqlite3.connect(":memory:"))
+    original = {"text": text(40)}
+    index.add("https://a/1", "jdm", index.fingerprint(original))
+
+    assert index.find("https://b/1", index.fingerprint({"text": text(40).upper()}))[:2] == ("exact", "https://a/1")
+    kind, url, score = index.find("https://b/2", index.fingerprint({"text": text(40, changed=1)}))
+    assert (kind, url) == ("near", "https://a/1") and score >= NEAR_DUPLICATE
+    assert index.find("https://b/3", index.fingerprint({"text": text(40, changed=30)})) is None
+
+
+def test_index_ignores_the_article_itself_and_replaces_its_fingerprint():
+    index = DuplicateIndex(sqlite3.connect(":memory:"))
+    index.add("https://a/1", "jdm", index.fingerprint({"text": text(40)}))
+    assert index.find("https://a/1", index.fingerprint({"text": text(40)})) is None
+
+    updated = index.fingerprint({"text": text(40, changed=30)})
+    index.add("https://a/1", "jdm", updated)
+    assert index.exact("https://a/1") == updated[0]
+    assert index.find("https://b/1", index.fingerprint({"text": text(40)})) is None
@@ -0,0 +1,60 @@
+import json
+
+from feeds import Capture, learn_feed, feed_links
+from pipeline import links_matching
+
+find_links = links_matching(lambda href: "/chronique-" in href)
+SITE = "https://www.example.com"
+
+
+def html_page(first, count=10):
+    return "".join(f'<a href="/2024/01/01/chronique-{n}">Chronique {n}</a>' for n in range(first, first + count))
+
+
+def json_page(first, count=10):
+    items = [{"url": f"{SITE}/2024/01/01/chronique-{n}", "publishedAt": "2024-01-0" + str(1 + n % 9)}
+             for n in range(first, first + count)]
+    return json.dumps({"items": items, "next": None})
+
+
+def capture(url, body, headers=None):
+    return Capture(url, headers or {}, "application/json", body)
+
+
+def test_feed_links_reads_json_and_embedded_html():
+    links, dates = feed_links(json_page(0, 3), SITE + "/api", find_links)
+    assert links == [f"{SITE}/2024/01/01/chronique-{n}" for n in range(3)]
+    assert dates == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+    body = json.dumps({"html": html_page(5, 2), "more": True})
+    assert feed_links(body, SITE + "/api", find_links)[0] == [f"{SITE}/2024/01/01/chronique-{n}" for n in (5, 6)]
+
+
+def test_learn_feed_follows_the_number_that_advances_least():
+    # Le second nombre (horodatage anti-cache) varie plus que la page
+    captures = [
+        capture(f"{SITE}/api/articles?page={page}&_={1700000000000 + 7919 * page}", json_page(10 * page))
+        for page in (2, 3)
+    ]
+    feed = learn_feed(captures, find_links)
+    assert (feed.start, feed.step) == (4, 1)
+    assert feed.url(0).startswith(f"{SITE}/api/articles?page=4&")
+    assert feed.url(2).startswith(f"{SITE}/api/articles?page=6&")
+
+
+def test_learn_feed_from_a_single_offset_request():
+    headers = {"x-requested-with": "XMLHttpRequest"}
+    feed = learn_feed([capture(f"{SITE}/api/list?offset=20&limit=10", json_page(20), headers)], find_links)
+    assert feed.url(0) == f"{SITE}/api/list?offset=30&limit=10"
+    assert feed.url(1) == f"{SITE}/api/list?offset=40&limit=10"
+    assert feed.headers == headers
+
+
+def test_learn_feed_from_html_path_pages():
+    captures = [capture(f"{SITE}/chroniques/page/{page}", html_page(10 * page)) for page in (2, 3)]
+    assert learn_feed(captures, find_links).url(0) == f"{SITE}/chroniques/page/4"
+
+
+def test_learn_feed_ignores_responses_without_article_links():
+    captures = [capture(f"{SITE}/api/meteo?page={page}", json.dumps({"temperature": page})) for page in (1, 2)]
+    assert learn_feed(captures, find_links) is None
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from conftest import PER_PAGE, Chroniques
+
+
+def last_page(make_pipeline, site):
+    pipeline = make_pipeline(site)
+
+    async def probe():
+        try:
+            return await pipeline.find_last_page()
+        finally:
+            # Sondes restées sans réponse attendue, comme à la fin de `discover`
+            await asyncio.gather(*pipeline.listing_tasks.values(), return_exceptions=True)
+
+    try:
+        return asyncio.run(probe())
+    finally:
+        pipeline.manifest.close()
+
+
+@pytest.mark.parametrize("count, expected", [
+    (35, 3),          # page 4 vide, pages suivantes en 404
+    (40, 3),          # multiple exact de PER_PAGE : la page 4 est déjà vide
+    (41, 4),          # un seul lien sur la dernière page
+    (5, 0),           # une seule page
+])
+def test_last_page_of_the_archive(local_site, make_pipeline, tmp_path, count, expected):
+    site = Chroniques(local_site, count).site(tmp_path / "out", max_pages=20, listing_window=2)
+    assert last_page(make_pipeline, site) == expected
+    # Sondes et dichotomie : bien moins de pages lues que max_pages
+    assert len(local_site.hits_of("/liste/")) < 12
+
+
+def test_last_page_is_capped_by_max_pages(local_site, make_pipeline, tmp_path):
+    chroniques = Chroniques(local_site, 100)
+    assert last_page(make_pipeline, chroniques.site(tmp_path / "out", max_pages=4, listing_window=2)) == 3
+    assert "/liste/4" not in local_site.hits
+    assert last_page(make_pipeline, chroniques.site(tmp_path / "out", max_pages=1, listing_window=2)) == 0
+
+
+def test_pages_echoing_the_first_are_past_the_end(local_site, make_pipeline, tmp_path):
+    chroniques = Chroniques(local_site, 5 * PER_PAGE)
+    for n in range(5, 20):
+        local_site.pages[f"/liste/{n}"] = local_site.pages["/liste/0"]
+    assert last_page(make_pipeline, chroniques.site(tmp_path / "out", max_pages=20, listing_window=2)) == 4
+
+
+def test_empty_first_page(local_site, make_pipeline, tmp_path):
+    site = Chroniques(local_site, 0).site(tmp_path / "out", max_pages=20, listing_window=2)
+    assert last_page(make_pipeline, site) == 0
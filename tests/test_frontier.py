@@ -0,0 +1,62 @@
+from frontier import BloomFilter, Frontier, canonical_url, url_date, url_key
+from manifest import Manifest
+
+
+def test_canonical_url_drops_tracking_fragment_and_trailing_slash():
+    url = "http://www.journaldemontreal.com/2024/01/05/une-chronique/?utm_source=fb&fbclid=x&page=2#haut"
+    assert canonical_url(url) == "https://www.journaldemontreal.com/2024/01/05/une-chronique?page=2"
+
+
+def test_canonical_url_resolves_relative_links_and_keeps_local_ports():
+    assert canonical_url("/a//b/", "http://127.0.0.1:8000/liste/1") == "http://127.0.0.1:8000/a/b"
+
+
+def test_url_key_ignores_lapresse_section():
+    a = url_key("https://www.lapresse.ca/actualites/chroniques/2024-01-05/le-titre.php")
+    b = url_key("https://www.lapresse.ca/debats/2024-01-05/le-titre")
+    assert a == b == "lapresse.ca:2024-01-05/le-titre"
+
+
+def test_url_key_uses_numeric_identifiers():
+    assert url_key("https://www.ledevoir.com/opinion/chroniques/801234/un-titre") == "ledevoir.com:801234"
+    assert (url_key("https://ici.radio-canada.ca/nouvelle/2034567/analyse?utm_medium=x")
+            == "radio-canada.ca:2034567")
+
+
+def test_url_key_falls_back_to_canonical_url():
+    assert url_key("https://example.com/billet/?ref=accueil") == "https://example.com/billet"
+
+
+def test_url_date():
+    assert url_date("https://www.journaldemontreal.com/2024/01/05/titre") == "2024-01-05"
+    assert url_date("https://www.lapresse.ca/debats/2024-01-05/titre.php") == "2024-01-05"
+    assert url_date("https://www.ledevoir.com/opinion/801234/titre") is None
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    keys = [f"cle-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"autre-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_frontier_admits_each_article_once_across_sites(tmp_path):
+    path = tmp_path / "manifest.sqlite"
+    jdm = Frontier(Manifest("jdm", path).db, "jdm")
+    url = "https://www.journaldemontreal.com/2024/01/05/titre"
+    assert jdm.admit([url, url + "?utm_source=x", url + "/"]) == [url]
+    assert jdm.known("http://journaldemontreal.com/2024/01/05/titre#commentaires")
+
+    other = Frontier(Manifest("jdm-lisee", path).db, "jdm-lisee")
+    assert other.admit([url]) == []
+    assert other.admit(["https://www.journaldemontreal.com/2024/01/06/titre"]) != []
+
+
+def test_frontier_backfills_urls_of_an_older_manifest(tmp_path):
+    manifest = Manifest("jdm", tmp_path / "manifest.sqlite")
+    url = "https://www.journaldemontreal.com/2024/01/05/titre"
+    manifest.discover([url])
+    assert Frontier(manifest.db, "jdm").known(url)
@@ -0,0 +1,49 @@
+import asyncio
+
+from conftest import Chroniques
+from manifest import Manifest
+
+
+def crawl(pipeline):
+    return asyncio.run(pipeline.run())
+
+
+def test_incremental_run_after_an_interrupted_discovery_walks_the_whole_archive(
+        local_site, tmp_path, make_pipeline, monkeypatch):
+    chroniques = Chroniques(local_site, 25)
+    site = chroniques.site(tmp_path / "out")
+
+    # Premier lancement interrompu après deux pages de liste : la pagination n'est pas notée complète
+    with monkeypatch.context() as m:
+        m.setattr(Manifest, "complete_discovery", lambda self: None)
+        assert crawl(make_pipeline(chroniques.site(tmp_path / "out", max_pages=2))) == 20
+
+    pipeline = make_pipeline(site, incremental=True)
+    assert crawl(pipeline) == 5
+    assert pipeline.manifest.counts() == {"written": 25}
+    assert pipeline.manifest.discovery_complete()
+
+
+def test_incremental_run_stops_at_the_watermark(local_site, tmp_path, make_pipeline):
+    chroniques = Chroniques(local_site, 25)
+    site = chroniques.site(tmp_path / "out")
+    assert crawl(make_pipeline(site)) == 25
+    assert make_pipeline(site).manifest.watermark()[0] == "2024-01-25"
+
+    chroniques.publish(3)
+    local_site.hits.clear()
+    pipeline = make_pipeline(site, incremental=True)
+    assert crawl(pipeline) == 3
+    # Page 0 : trois nouveautés ; page 1 : rien que du connu, fin de la pagination
+    assert local_site.hits_of("/liste/") == ["/liste/0", "/liste/1"]
+    assert pipeline.manifest.watermark()[0] == "2024-01-28"
+
+
+def test_resume_after_a_complete_discovery_skips_pagination(local_site, tmp_path, make_pipeline):
+    chroniques = Chroniques(local_site, 12)
+    site = chroniques.site(tmp_path / "out")
+    assert crawl(make_pipeline(site)) == 12
+
+    local_site.hits.clear()
+    assert crawl(make_pipeline(site, resume=True)) == 0
+    assert local_site.hits == []
@@ -0,0 +1,78 @@
+import pytest
+
+from Lapresse_lagace import AuthorSniffer, personal_names, reject_article, sniff_author
+
+AUTHOR = "Patrick Lagacé"
+
+
+def sniff(html, chunk=7):
+    sniffer = AuthorSniffer(AUTHOR)
+    # Par petits morceaux, comme `stream_html`, jusqu'au verdict
+    for i in range(0, len(html), chunk):
+        sniffer.feed(html[i:i + chunk])
+        if sniffer.verdict is not None:
+            break
+    return sniffer.verdict
+
+
+def page(head="", body=""):
+    return f"<html><head>{head}</head><body><article>{body}<p>Premier paragraphe.</p><p>Suite.</p></article></body></html>"
+
+
+META_OTHER = '<meta name="author" content="Yves Boisvert">'
+
+
+@pytest.mark.parametrize("text, names", [
+    ("Yves Boisvert", ["Yves Boisvert"]),
+    ("Yves Boisvert et Patrick Lagacé", ["Yves Boisvert", "Patrick Lagacé"]),
+    ("Marie-Ève Tremblay / Jean Dion", ["Marie-Ève Tremblay", "Jean Dion"]),
+    ("La Presse", []),
+    ("La Presse Canadienne", []),
+    ("Yves Boisvert, Agence France-Presse", []),
+    ("Rédaction", []),
+    ("https://www.lapresse.ca/auteurs/yves-boisvert", []),
+    ("Équipe 2024", []),
+    ("", []),
+])
+def test_personal_names(text, names):
+    assert personal_names(text) == names
+
+
+def test_meta_naming_the_author_accepts_at_once():
+    assert sniff(page('<meta name="author" content="Patrick Lagacé">')) is True
+
+
+def test_meta_naming_someone_else_rejects_at_the_body_without_byline():
+    assert sniff(page(META_OTHER)) is False
+
+
+def test_co_signed_byline_overrides_the_meta():
+    assert sniff(page(META_OTHER, '<div class="byline">Yves Boisvert et <b>Patrick Lagacé</b></div>')) is True
+    assert sniff(page(META_OTHER, '<p class="author">Avec Patrick Lagacé</p>')) is True
+
+
+def test_json_ld_naming_someone_else_is_a_hint_too():
+    json_ld = '<script type="application/ld+json">{"author": [{"@type": "Person", "name": "Yves Boisvert"}]}</script>'
+    assert sniff(page(json_ld)) is False
+    assert sniff(page(json_ld, '<span class="author-name">Patrick Lagacé</span>')) is True
+
+
+def test_organizations_and_other_bylines_decide_nothing():
+    organization = '<script type="application/ld+json">{"author": {"@type": "Organization", "name": "Yves"}}</script>'
+    assert sniff(page(organization)) is None
+    assert sniff(page('<meta name="author" content="La Presse">')) is None
+    assert sniff(page("", '<div class="byline">Yves Boisvert</div>')) is None
+
+
+def test_sniffer_not_needed_when_the_url_names_the_author():
+    assert sniff_author("https://www.lapresse.ca/chroniques/patrick-lagace/2024-01-01/titre", AUTHOR) is None
+
+
+def test_reject_article_reads_the_whole_page():
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page(META_OTHER, '<div class="byline">Patrick Lagacé</div>'), "html.parser")
+    assert reject_article(soup, "https://www.lapresse.ca/debats/2024-01-01/titre", {}, AUTHOR) is None
+    soup = BeautifulSoup(page(META_OTHER), "html.parser")
+    assert reject_article(soup, "https://www.lapresse.ca/debats/2024-01-01/titre", {}, AUTHOR) == \
+        f"Pas un article de {AUTHOR}"
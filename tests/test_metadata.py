@@ -0,0 +1,80 @@
+import json
+
+from bs4 import BeautifulSoup
+
+from extraction import PARSER, extract_from_soup
+from metadata import body_paragraphs, from_parts, read_metadata
+
+NEWS = {
+    "@context": "https://schema.org", "@type": "NewsArticle", "headline": "Titre JSON-LD",
+    "author": [{"@type": "Person", "name": "Yves Boisvert"}, "Patrick Lagacé"],
+    "datePublished": "2024-01-05T08:00:00-05:00", "dateModified": "2024-01-06T09:00:00-05:00",
+    "articleBody": "Premier paragraphe.\nSecond paragraphe.",
+}
+OG = [("og:title", "Titre OpenGraph"), ("article:published_time", "2023-12-31"), ("author", "Quelqu'un")]
+
+
+def test_json_ld_wins_over_meta_tags():
+    found = from_parts([json.dumps(NEWS)], OG)
+    assert found == {"title": "Titre JSON-LD", "author": "Yves Boisvert / Patrick Lagacé",
+                     "published": "2024-01-05T08:00:00-05:00", "modified": "2024-01-06T09:00:00-05:00",
+                     "body": "Premier paragraphe.\nSecond paragraphe."}
+
+
+def test_meta_tags_fill_only_what_json_ld_lacks():
+    partial = {"@type": "Article", "headline": "Titre JSON-LD"}
+    found = from_parts([json.dumps(partial)], OG + [("og:updated_time", "2024-01-02")])
+    assert found["title"] == "Titre JSON-LD"
+    assert (found["author"], found["published"], found["modified"]) == ("Quelqu'un", "2023-12-31", "2024-01-02")
+
+
+def test_meta_precedence_does_not_depend_on_page_order():
+    metas = [("twitter:title", "Titre Twitter"), ("OG:TITLE", "Titre OpenGraph"),
+             ("dc.date", "2020-01-01"), ("article:published_time", "2024-01-05")]
+    found = from_parts([], metas)
+    assert (found["title"], found["published"]) == ("Titre OpenGraph", "2024-01-05")
+
+
+def test_graph_lists_and_other_types():
+    graph = {"@graph": [{"@type": "WebPage", "headline": "Page"},
+                        {"@type": ["OpinionNewsArticle"], "headline": "Chronique", "author": {"name": "A B"}}]}
+    found = from_parts(["pas du json", json.dumps([{"@type": "Organization", "name": "La Presse"}, graph])], [])
+    assert (found["title"], found["author"]) == ("Chronique", "A B")
+
+
+def test_missing_fields_are_none():
+    assert from_parts([], []) == {"title": None, "author": None, "published": None, "modified": None, "body": None}
+    found = from_parts([json.dumps({"@type": "NewsArticle", "headline": "  ", "author": {"@type": "Person"}})],
+                       [("author", "https://www.lapresse.ca/auteurs/x"), ("og:title", "")])
+    assert found == {"title": None, "author": None, "published": None, "modified": None, "body": None}
+
+
+def test_body_paragraphs_needs_real_paragraphs():
+    assert body_paragraphs("Un.\n\n  Deux   mots.\n", 1) == ["Un.", "Deux mots."]
+    assert body_paragraphs("Un seul bloc de texte à plat.", 1) == []
+    assert body_paragraphs(None, 1) == []
+
+
+def page(head, body="<article><h1>Titre DOM</h1><time datetime='2022-02-02'></time><p>Texte DOM.</p></article>"):
+    return BeautifulSoup(f"<html><head><title>Titre DOM</title>{head}</head><body>{body}</body></html>", PARSER)
+
+
+def test_dom_only_fills_what_metadata_lacks():
+    script = f'<script type="application/ld+json">{json.dumps(NEWS)}</script>'
+    article = extract_from_soup(page(script), "jdm")
+    assert (article["title"], article["date"], article["metadata"]) == ("Titre JSON-LD", "2024-01-05", "complete")
+    assert article["paragraphs"] == ["Premier paragraphe.", "Second paragraphe."]
+
+    article = extract_from_soup(page('<meta property="og:title" content="Titre OpenGraph">'), "jdm")
+    assert (article["title"], article["date"], article["metadata"]) == ("Titre OpenGraph", "2022-02-02", "partial")
+    assert article["paragraphs"] == ["Texte DOM."]
+
+    article = extract_from_soup(page(""), "jdm")
+    assert (article["title"], article["date"], article["author"], article["metadata"]) == (
+        "Titre DOM", "2022-02-02", None, "none")
+
+
+def test_read_metadata_from_a_page():
+    soup = page('<meta itemprop="datePublished" content="2024-03-04"><meta name="author" content="Jean Dion">')
+    found = read_metadata(soup)
+    assert (found["published"], found["author"]) == ("2024-03-04", "Jean Dion")
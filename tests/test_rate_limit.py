@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import Chroniques
+from rate_limit import (DECREASE, INCREASE, RateLimiter, Throttled, congested, parse_retry_after,
+                        retry_delay)
+
+URL = "https://www.journaldemontreal.com/2024/01/05/titre"
+
+
+def test_rate_rises_additively_up_to_the_maximum():
+    limiter = RateLimiter(start_rate=1.0, max_rate=1.2)
+    for _ in range(3):
+        limiter.success(URL)
+    assert limiter.bucket(URL).rate == pytest.approx(1.0 + 3 * INCREASE)
+    for _ in range(10):
+        limiter.success(URL)
+    assert limiter.bucket(URL).rate == 1.2
+
+
+def test_throttle_divides_the_rate_down_to_the_minimum_and_honours_retry_after():
+    limiter = RateLimiter(start_rate=1.0, min_rate=0.3)
+    limiter.throttle(URL, retry_after=30)
+    bucket = limiter.bucket(URL)
+    assert bucket.rate == pytest.approx(DECREASE)
+    assert bucket.tokens == 0 and bucket.throttles == 1
+    assert bucket.paused_until > time.monotonic() + 29
+    limiter.throttle(URL)
+    assert bucket.rate == 0.3
+
+
+def test_hosts_have_their_own_bucket():
+    limiter = RateLimiter(start_rate=1.0)
+    limiter.throttle(URL)
+    assert limiter.bucket("https://www.lapresse.ca/x").rate == 1.0
+
+
+def test_congested_and_retry_after():
+    assert [congested(s) for s in (200, 404, 500, 503, None)] == [False, False, True, True, False]
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("bientôt") is None
+    assert retry_delay(0, retry_after=30) == 30
+
+
+def test_throttled_message():
+    assert str(Throttled(503, 10)) == "HTTP 503, ralentissement demandé"
+    assert str(Throttled(None)) == "erreur réseau ou délai dépassé, ralentissement"
+
+
+@pytest.mark.parametrize("status, throttled", [(502, True), (503, True), (504, True), (429, True), (500, False)])
+def test_server_errors_slow_the_host_down(local_site, tmp_path, make_pipeline, status, throttled):
+    local_site.serve("/panne", "indisponible", status=status, **{"Retry-After": "0"})
+    pipeline = make_pipeline(Chroniques(local_site, 0).site(tmp_path / "out"))
+    pipeline.limiter = RateLimiter(start_rate=4.0, max_rate=8.0)
+
+    async def get():
+        return await pipeline.get_html(local_site.url("/panne"))
+
+    if throttled:
+        with pytest.raises(Throttled):
+            asyncio.run(get())
+    else:
+        assert asyncio.run(get()) == (status, None)
+    assert pipeline.limiter.bucket(local_site.base).rate == 4.0 * DECREASE
+
+
+def test_healthy_responses_speed_the_host_up(local_site, tmp_path, make_pipeline):
+    local_site.serve("/ok", "<html><body>ok</body></html>")
+    pipeline = make_pipeline(Chroniques(local_site, 0).site(tmp_path / "out"))
+    pipeline.limiter = RateLimiter(start_rate=4.0, max_rate=8.0)
+    assert asyncio.run(pipeline.get_html(local_site.url("/ok"), "listing"))[0] == 200
+    assert pipeline.limiter.bucket(local_site.base).rate == pytest.approx(4.0 + INCREASE)
@@ -0,0 +1,29 @@
+import asyncio
+from pathlib import Path
+
+import reextract
+from conftest import Chroniques, article_html
+from snapshots import SnapshotArchive
+
+
+def test_corrected_title_replaces_the_previous_file(local_site, tmp_path, make_pipeline, monkeypatch):
+    chroniques = Chroniques(local_site, 3)
+    site = chroniques.site(tmp_path / "out")
+    pipeline = make_pipeline(site, snapshots_dir=tmp_path / "snapshots")
+    assert asyncio.run(pipeline.run()) == 3
+    url = local_site.url(chroniques.paths[0])
+    old = Path(pipeline.manifest.output_path(url))
+
+    html = article_html(0, "2024-01-01").replace("<title>Chronique 0</title>", "<title>Chronique corrigée</title>")
+    SnapshotArchive("jdm", tmp_path / "snapshots").save(url, html, "http", 200)
+    # Processus du pool créés par fork : ils héritent du site de test
+    monkeypatch.setattr(reextract, "load_site", lambda name: site)
+    counts = reextract.reextract("jdm", workers=2, snapshots_dir=tmp_path / "snapshots", corpus_path=None,
+                                 manifest_path=tmp_path / "manifest.sqlite")
+
+    assert counts == {"written": 3, "skipped": 0, "empty": 0, "failed": 0}
+    new = Path(pipeline.manifest.output_path(url))
+    assert new.name == "2024-01-01_Test_Chronique_corrigée.txt"
+    assert not old.exists()
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "2024-01-01_Test_Chronique_corrigée.txt", "2024-01-02_Test_Chronique_1.txt", "2024-01-03_Test_Chronique_2.txt"]
@@ -0,0 +1,118 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import pipeline as pipeline_module
+from conftest import Chroniques, article_html
+from manifest import MAX_ATTEMPTS
+from metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(pipeline_module, "retry_delay", lambda attempt, retry_after=None: 0)
+
+
+def crawl(pipeline):
+    return asyncio.run(pipeline.run())
+
+
+def revalidations():
+    return {outcome: METRICS.total("revalidations", site="jdm", outcome=outcome)
+            for outcome in ("not_modified", "unchanged", "updated", "skipped", "failed")}
+
+
+def delta(before):
+    return {outcome: n - before[outcome] for outcome, n in revalidations().items()}
+
+
+@pytest.fixture
+def written(local_site, tmp_path, make_pipeline):
+    """Cinq chroniques déjà écrites ; retourne (chroniques, site)."""
+    chroniques = Chroniques(local_site, 5)
+    site = chroniques.site(tmp_path / "out")
+    assert crawl(make_pipeline(site)) == 5
+    return chroniques, site
+
+
+def test_refresh_keeps_unchanged_articles(written, make_pipeline):
+    _, site = written
+    before = revalidations()
+    pipeline = make_pipeline(site, refresh=True)
+    assert crawl(pipeline) == 0
+    assert delta(before) == {"not_modified": 0, "unchanged": 5, "updated": 0, "skipped": 0, "failed": 0}
+    assert pipeline.manifest.counts() == {"written": 5}
+
+
+def test_refresh_rewrites_changed_articles(written, local_site, make_pipeline):
+    chroniques, site = written
+    local_site.serve(chroniques.paths[2], article_html(2, "2024-01-03", ["Rectificatif ajouté après coup."]))
+    before = revalidations()
+    pipeline = make_pipeline(site, refresh=True)
+    assert crawl(pipeline) == 1
+    assert delta(before)["updated"] == 1
+    assert "Rectificatif" in Path(pipeline.manifest.output_path(local_site.url(chroniques.paths[2]))).read_text()
+
+
+def test_failed_refresh_never_demotes_a_written_article(written, local_site, make_pipeline):
+    chroniques, site = written
+    url = local_site.url(chroniques.paths[1])
+    local_site.serve(chroniques.paths[1], "surcharge", status=503)
+    before = revalidations()
+
+    for _ in range(2):
+        pipeline = make_pipeline(site, refresh=True)
+        crawl(pipeline)
+        assert pipeline.manifest.state(url) == "written"
+        assert pipeline.manifest.attempts(url) == 0
+        assert Path(pipeline.manifest.output_path(url)).exists()
+    # Chaque passe épuise ses tentatives puis garde la version écrite
+    assert local_site.hits.count(chroniques.paths[1]) == 1 + 2 * MAX_ATTEMPTS
+    assert delta(before) == {"not_modified": 0, "unchanged": 8, "updated": 0, "skipped": 0, "failed": 2}
+    assert pipeline.manifest.pending() == []
+
+
+def test_page_gone_during_refresh_keeps_the_written_article(written, local_site, make_pipeline):
+    chroniques, site = written
+    url = local_site.url(chroniques.paths[3])
+    local_site.serve(chroniques.paths[3], "introuvable", status=404)
+    before = revalidations()
+    pipeline = make_pipeline(site, refresh=True)
+    crawl(pipeline)
+    assert delta(before)["skipped"] == 1
+    assert pipeline.manifest.state(url) == "written"
+    assert url in pipeline.manifest.written()
+    assert Path(pipeline.manifest.output_path(url)).exists()
+
+
+def test_validators_are_kept_only_once_the_article_is_current(local_site, tmp_path, make_pipeline):
+    chroniques = Chroniques(local_site, 2)
+    path = chroniques.paths[0]
+    url = local_site.url(path)
+    site = chroniques.site(tmp_path / "out",
+                           reject=lambda soup, url, article: "Rectificatif refusé" if "Rectificatif" in article["text"]
+                           else None)
+    local_site.serve(path, article_html(0, "2024-01-01"), ETag='"v1"')
+    assert crawl(make_pipeline(site)) == 2
+
+    # Nouvelle version écartée : le prochain GET conditionnel doit encore porter l'ancien ETag
+    local_site.serve(path, article_html(0, "2024-01-01", ["Rectificatif."]), ETag='"v2"')
+    pipeline = make_pipeline(site, refresh=True)
+    crawl(pipeline)
+    assert pipeline.manifest.validators(url)[0] == '"v1"'
+
+    local_site.serve(path, article_html(0, "2024-01-01"), ETag='"v3"')
+    pipeline = make_pipeline(site, refresh=True)
+    crawl(pipeline)
+    assert pipeline.manifest.validators(url)[0] == '"v3"'
+
+
+def test_attempts_start_over_once_written(local_site, tmp_path, make_pipeline):
+    chroniques = Chroniques(local_site, 3)
+    path = chroniques.paths[0]
+    local_site.serve_in_turn(path, (503, "surcharge"), (503, "surcharge"), (200, article_html(0, "2024-01-01")))
+    pipeline = make_pipeline(chroniques.site(tmp_path / "out"))
+    assert crawl(pipeline) == 3
+    url = local_site.url(path)
+    assert (pipeline.manifest.state(url), pipeline.manifest.attempts(url)) == ("written", 0)
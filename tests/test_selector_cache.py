@@ -0,0 +1,94 @@
+import json
+import multiprocessing
+
+from selector_cache import LEARN_MIN, RELEARN_AFTER, SelectorCache, section
+
+URL = "https://www.ledevoir.com/opinion/chroniques/801234/titre"
+CASCADE = ["h1", ".titre", "title"]
+
+
+def learned(cache, selector=".titre", times=LEARN_MIN):
+    for _ in range(times):
+        cache.record("ledevoir", URL, "title", selector)
+
+
+def test_section():
+    assert section(URL) == "opinion"
+    assert section("https://www.ledevoir.com/") == ""
+
+
+def test_winner_moves_first_once_learned(tmp_path):
+    cache = SelectorCache(tmp_path / "selectors.json")
+    learned(cache, times=LEARN_MIN - 1)
+    assert cache.order("ledevoir", URL, "title", CASCADE) == CASCADE
+    learned(cache, times=1)
+    assert cache.order("ledevoir", URL, "title", CASCADE) == [".titre", "h1", "title"]
+    # Autre rubrique, autre champ : rien d'appris
+    assert cache.order("ledevoir", "https://www.ledevoir.com/sports/1/x", "title", CASCADE) == CASCADE
+    assert cache.order("ledevoir", URL, "date", CASCADE) == CASCADE
+
+
+def test_record_outcomes(tmp_path):
+    cache = SelectorCache(tmp_path / "selectors.json")
+    assert cache.record("ledevoir", URL, "title", ".titre") == "cold"
+    learned(cache)
+    assert cache.record("ledevoir", URL, "title", ".titre") == "hit"
+    assert cache.record("ledevoir", URL, "title", "h1") == "miss"
+    assert cache.record("ledevoir", URL, "title", None) == "none"
+    # Le LEARN_MIN-ième succès trouve déjà le gagnant en tête
+    assert cache.outcomes[("ledevoir", "title")] == {"cold": LEARN_MIN, "hit": 2, "miss": 1, "none": 1}
+
+
+def test_winner_forgotten_after_repeated_misses_only(tmp_path):
+    cache = SelectorCache(tmp_path / "selectors.json")
+    learned(cache, times=10)
+    # Des articles sans le champ ne font pas oublier le gagnant
+    for _ in range(RELEARN_AFTER * 2):
+        cache.record("ledevoir", URL, "title", None)
+    assert cache.order("ledevoir", URL, "title", CASCADE)[0] == ".titre"
+
+    for _ in range(RELEARN_AFTER):
+        cache.record("ledevoir", URL, "title", "h1")
+    assert cache.order("ledevoir", URL, "title", CASCADE) == CASCADE
+
+
+def test_save_merges_counts_written_by_others(tmp_path):
+    path = tmp_path / "selectors.json"
+    first, second = SelectorCache(path), SelectorCache(path)
+    learned(first, times=2)
+    learned(second, times=3)
+    first.save()
+    second.save()
+    assert json.loads(path.read_text())["ledevoir|opinion|title"] == {".titre": 5}
+    # Rien de neuf : le fichier n'est pas réécrit avec des comptes périmés
+    first.save()
+    assert json.loads(path.read_text())["ledevoir|opinion|title"] == {".titre": 5}
+    assert SelectorCache(path).order("ledevoir", URL, "title", CASCADE)[0] == ".titre"
+
+
+def test_save_drops_forgotten_winners(tmp_path):
+    path = tmp_path / "selectors.json"
+    cache = SelectorCache(path)
+    learned(cache, times=5)
+    cache.save()
+    for _ in range(RELEARN_AFTER):
+        cache.record("ledevoir", URL, "title", "h1")
+    cache.save()
+    assert json.loads(path.read_text())["ledevoir|opinion|title"] == {"h1": 1}
+
+
+def _record_and_save(path, times):
+    cache = SelectorCache(path)
+    learned(cache, times=times)
+    cache.save()
+
+
+def test_concurrent_saves_from_several_processes(tmp_path):
+    path = tmp_path / "selectors.json"
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_record_and_save, args=(path, 7)) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert json.loads(path.read_text())["ledevoir|opinion|title"] == {".titre": 42}
@@ -0,0 +1,62 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from rate_limit import DECREASE, RateLimiter, SharedHostSlots
+
+URL = "https://www.lapresse.ca/chroniques/2024-01-01/titre"
+HOST = "www.lapresse.ca"
+
+
+@pytest.fixture(scope="module")
+def manager():
+    with multiprocessing.Manager() as manager:
+        yield manager
+
+
+def test_rate_and_pauses_are_shared_between_limiters(manager):
+    slots = SharedHostSlots(manager, max_per_host=4, start_rate=2.0)
+    first, second = RateLimiter(shared=slots), RateLimiter(shared=slots)
+    first.throttle(URL, retry_after=30)
+    second.success(URL)
+    assert second.bucket(URL).rate == pytest.approx(2.0 * DECREASE + 0.05)
+    assert slots.reserve(HOST) > 29
+
+
+def test_requests_of_all_processes_share_the_host_rate(manager):
+    slots = SharedHostSlots(manager, max_per_host=8, start_rate=20.0)
+    limiters = [RateLimiter(shared=slots) for _ in range(4)]
+
+    async def request(limiter):
+        async with limiter.slot(URL):
+            pass
+
+    async def crawl():
+        await asyncio.gather(*(request(limiter) for limiter in limiters for _ in range(3)))
+
+    start = time.monotonic()
+    asyncio.run(crawl())
+    # 12 requêtes à 20/s : au moins 11 intervalles, quel que soit le nombre de limiteurs
+    assert time.monotonic() - start >= 11 / 20 - 0.02
+    assert sum(limiter.bucket(URL).requests for limiter in limiters) == 12
+
+
+def _hold_and_die(slots):
+    assert slots.try_acquire(HOST)
+    os._exit(1)
+
+
+def test_slots_of_a_dead_process_are_released(manager):
+    slots = SharedHostSlots(manager, max_per_host=2)
+    child = multiprocessing.get_context("fork").Process(target=_hold_and_die, args=(slots,))
+    child.start()
+    child.join()
+    assert slots.in_flight(HOST) == 1
+    assert slots.try_acquire(HOST) and slots.try_acquire(HOST)
+    assert not slots.try_acquire(HOST)
+    slots.release(HOST)
+    slots.release(HOST)
+    assert slots.in_flight(HOST) == 0
@@ -0,0 +1,98 @@
+import gzip
+
+from xml.etree.ElementTree import ParseError
+
+import pytest
+
+from sitemaps import _month_outside, iter_sitemap, robots_sitemaps, walk
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+NEWS = 'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9"'
+
+
+def urlset(entries, extra_ns=""):
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS} {extra_ns}>{"".join(entries)}</urlset>'
+
+
+def url_entry(loc, lastmod=None):
+    return f"<url><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</url>"
+
+
+def index(locs):
+    children = "".join(f"<sitemap><loc>{loc}</loc>{f'<lastmod>{m}</lastmod>' if m else ''}</sitemap>"
+                       for loc, m in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{children}</sitemapindex>'
+
+
+@pytest.fixture
+def archive(local_site):
+    """robots.txt → index → sitemaps mensuels (dont un gzip), News et un sitemap ancien."""
+    s = local_site
+    xml = {"Content-Type": "application/xml"}
+    s.serve("/robots.txt", f"User-agent: *\nSitemap: {s.url('/sitemap-index.xml')}\n",
+            **{"Content-Type": "text/plain"})
+    s.serve("/sitemap-index.xml", index([
+        (s.url("/sitemap-2024-01.xml.gz"), None),
+        (s.url("/sitemap-2023-06.xml"), None),
+        (s.url("/sitemap-news.xml"), "2024-02-03"),
+        (s.url("/sitemap-pages.xml"), "2019-05-01"),
+    ]), **xml)
+    january = urlset([url_entry(s.url(f"/2024/01/{d:02d}/chronique-{d}")) for d in (5, 20)]
+                     + [url_entry(s.url("/2024/01/07/sport-hockey"))])
+    s.serve("/sitemap-2024-01.xml.gz", gzip.compress(january.encode()), **{"Content-Type": "application/x-gzip"})
+    s.serve("/sitemap-2023-06.xml", urlset([url_entry(s.url("/2023/06/01/chronique-ancienne"))]), **xml)
+    s.serve("/sitemap-news.xml", urlset([
+        "<url><loc>" + s.url("/opinion/chronique-du-jour") + "</loc><news:news>"
+        "<news:publication_date>2024-02-02T08:00:00-05:00</news:publication_date></news:news></url>",
+    ], NEWS), **xml)
+    s.serve("/sitemap-pages.xml", urlset([url_entry(s.url("/a-propos/chronique-legale"), "2019-04-01")]), **xml)
+    return s
+
+
+def test_robots_sitemaps(archive):
+    assert robots_sitemaps(archive.base) == [archive.url("/sitemap-index.xml")]
+
+
+def test_walk_reads_index_gzip_and_news_sitemaps(archive):
+    urls = list(walk([archive.base], lambda url: "chronique" in url))
+    assert urls == [archive.url(p) for p in ("/2024/01/05/chronique-5", "/2024/01/20/chronique-20",
+                                             "/2023/06/01/chronique-ancienne", "/opinion/chronique-du-jour",
+                                             "/a-propos/chronique-legale")]
+
+
+def test_walk_skips_children_outside_the_period_without_fetching_them(archive):
+    seen = []
+    urls = list(walk([archive.url("/sitemap-index.xml")], since="2024-01-10", until="2024-02-28",
+                     on_sitemap=lambda url, count: seen.append((url, count))))
+    assert urls == [archive.url("/2024/01/20/chronique-20"), archive.url("/opinion/chronique-du-jour")]
+    assert archive.hits_of("/sitemap-2023-06") == []
+    assert archive.hits_of("/sitemap-pages") == []
+    assert (archive.url("/sitemap-2024-01.xml.gz"), 1) in seen
+
+
+def test_month_outside():
+    assert _month_outside("https://x/sitemap-2023-12.xml", "2024-01-01", None)
+    assert not _month_outside("https://x/sitemap/2024/01.xml", "2024-01-15", "2024-01-20")
+    assert _month_outside("https://x/sitemap-202402.xml", None, "2024-01-31")
+    assert not _month_outside("https://x/sitemap-articles.xml", "2024-01-01", "2024-01-31")
+
+
+def test_iter_sitemap_yields_entries_before_the_end_of_the_file(local_site):
+    # Fichier tronqué : les entrées lues avant l'erreur sont déjà sorties, le reste n'a jamais été gardé
+    body = urlset([url_entry(f"https://x/2024/01/01/chronique-{n}") for n in range(2000)])
+    body = body[:len(body) // 2] + "<url><loc>"
+    local_site.serve("/tronque.xml", body, **{"Content-Type": "application/xml"})
+    entries = iter_sitemap(local_site.url("/tronque.xml"))
+    first = next(entries)
+    assert (first.kind, first.loc, first.date) == ("url", "https://x/2024/01/01/chronique-0", "2024-01-01")
+    count = 1
+    with pytest.raises(ParseError):
+        for _ in entries:
+            count += 1
+    assert count == body.count("</url>")
+
+
+def test_walk_keeps_what_a_broken_sitemap_listed(local_site):
+    body = urlset([url_entry(f"https://x/2024/01/01/chronique-{n}") for n in range(100)])
+    local_site.serve("/tronque.xml", body[:-40], **{"Content-Type": "application/xml"})
+    assert len(list(walk([local_site.url("/tronque.xml")]))) == 99